@@ -0,0 +1,127 @@
+"""Per-row memory of the employee list at 100k rows: QTableWidget items vs __slots__ records behind a model.
+
+"Before" is the old load_employees: fetchall() tuples, then a QTableWidgetItem holding a str() copy of
+every field, inserted row by row into a QTableWidget. "After" is DatabaseManager's row factory building
+Employee records that EmployeeTableModel hands to a QTableView in place.
+
+Each side runs in a fresh interpreter and is measured twice: with tracemalloc (Python objects only, so
+the C++ side of each QTableWidgetItem is missing) and as growth of the process's resident set, which
+includes it. Resident set size is read from /proc and is not reported on platforms without it.
+
+Run from the repository root: python benchmarks/record_memory.py [rows]
+"""
+import os
+import sys
+import gc
+import sqlite3
+import subprocess
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+COLUMNS = "id, name, email, role, join_date, last_audit_report, info"
+# Same columns as the main window's employee table
+MODEL_COLUMNS = [("ID", "id"), ("Name", "name"), ("Email", "email"), ("Role", "role"), ("Join Date", "join_date"), ("Info", "info"),
+                 ("Calls vs Goal", "calls_attainment"), ("Tickets vs Goal", "tickets_attainment")]
+
+
+def build_database(rows):
+    connection = sqlite3.connect(":memory:")
+    connection.execute("CREATE TABLE employees (id INTEGER PRIMARY KEY, name TEXT, email TEXT, role TEXT, join_date TEXT, last_audit_report TEXT, info TEXT)")
+    connection.executemany(
+        "INSERT INTO employees VALUES (?, ?, ?, ?, ?, ?, ?)",
+        ((i, f"Employee {i}", f"employee{i}@example.com", "employee", "2020-01-01", "2024-06-01 10:00:00", f"Team {i % 50}")
+         for i in range(1, rows + 1))
+    )
+    return connection
+
+
+def resident_bytes():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def load_table_widget(connection):
+    from PyQt5.QtWidgets import QTableWidget, QTableWidgetItem
+
+    table = QTableWidget(0, 6)
+    for employee in connection.execute(f"SELECT {COLUMNS} FROM employees").fetchall():
+        row = table.rowCount()
+        table.insertRow(row)
+        for i, data in enumerate(employee):
+            table.setItem(row, i, QTableWidgetItem(str(data)))
+    return table
+
+
+def load_records(connection):
+    from PyQt5.QtWidgets import QTableView
+    from teamtrackerpro.models.records import Employee
+    from teamtrackerpro.ui.table_models import EmployeeTableModel
+
+    cursor = connection.cursor()
+    cursor.row_factory = Employee.from_row
+    model = EmployeeTableModel(MODEL_COLUMNS)
+    model.set_employees(cursor.execute(f"SELECT {COLUMNS} FROM employees").fetchall())
+    view = QTableView()
+    view.setModel(model)
+    return model, view
+
+
+LOADERS = {"before": load_table_widget, "after": load_records}
+
+
+def measure(side, rows, method):
+    """Runs in the child process: prints the bytes one load of ``side`` added by ``method``."""
+    from PyQt5.QtWidgets import QApplication
+
+    app = QApplication([])
+    connection = build_database(rows)
+    load = LOADERS[side]
+    load(build_database(10))  # Imports and first-use allocations are not part of the per-row cost
+    gc.collect()
+    if method == "tracemalloc":
+        tracemalloc.start()
+        result = load(connection)
+        gc.collect()
+        used = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+    else:
+        start = resident_bytes()
+        result = load(connection)
+        gc.collect()
+        used = resident_bytes() - start if start is not None else -1
+    print(used)
+    del result, app
+
+
+def run(side, rows, method):
+    output = subprocess.run([sys.executable, os.path.abspath(__file__), "--measure", side, str(rows), method],
+                            check=True, capture_output=True, text=True).stdout
+    used = int(output.split()[-1])
+    return used if used >= 0 else None
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "--measure":
+        measure(sys.argv[2], int(sys.argv[3]), sys.argv[4])
+        return
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+
+    print(f"rows: {rows}")
+    for method, label in (("tracemalloc", "Python objects (tracemalloc)"), ("rss", "resident set growth (includes Qt's C++ side)")):
+        before, after = run("before", rows, method), run("after", rows, method)
+        print(f"{label}:")
+        if before is None or after is None:
+            print("  not available on this platform")
+            continue
+        print(f"  before (QTableWidgetItem per cell): {before / rows:8.1f} bytes/row  {before / 2**20:7.1f} MiB")
+        print(f"  after  (__slots__ records + model): {after / rows:8.1f} bytes/row  {after / 2**20:7.1f} MiB")
+        print(f"  saving: {(1 - after / before) * 100:.0f}%")
+
+
+if __name__ == '__main__':
+    main()
@@ -5,30 +5,38 @@ from PyQt5.QtCore import QSettings
 import qdarkstyle
 
 from teamtrackerpro.models.database_manager import DatabaseManager
+from teamtrackerpro.models.remote_backend import RemoteDatabaseManager
 from teamtrackerpro.ui.dialogs import LoginDialog
 from teamtrackerpro.ui.main_window import EmployeeManagerUI
+from teamtrackerpro.ui.instrumentation import tracer, instrumentation_requested
+from teamtrackerpro.utils.log_pipeline import setup_logging, shutdown_logging
 
 def main() -> None:
-    logging.basicConfig(
-        filename='teamtrackerpro.log',
-        level=logging.INFO,  # Set to INFO for production
-        format='%(asctime)s - %(levelname)s - %(message)s'
-    )
+    # Records are written by a background thread so file I/O never runs on the event loop
+    setup_logging(level=logging.INFO)  # Set to INFO for production
     logging.info("TeamTrackerPro application started.")
 
     app = QApplication(sys.argv)
     settings = QSettings("MyCompany", "TeamTrackerPro")
     dark_mode = settings.value("dark_mode", False, type=bool)
+    if instrumentation_requested(settings):
+        tracer.enable()
 
     if dark_mode:
         app.setStyleSheet(qdarkstyle.load_stylesheet())
     # Light theme is not applied by default anymore. It's up to the user.
 
-    db_manager = DatabaseManager()
+    server_url = settings.value("server_url", "", type=str)
+    db_manager = RemoteDatabaseManager(server_url, settings.value("api_token", "", type=str)) if server_url else DatabaseManager()
+    # Close the database before the log is drained so its final messages are written too
+    app.aboutToQuit.connect(db_manager.close)
+    app.aboutToQuit.connect(shutdown_logging)
     login_dialog = LoginDialog(db_manager, dark_mode)
 
     if login_dialog.exec_() != LoginDialog.Accepted or not login_dialog.user:
         logging.info("Login cancelled or failed.")
+        db_manager.close()
+        shutdown_logging()
         sys.exit(0)
 
     main_window = EmployeeManagerUI(login_dialog.user)
@@ -10,7 +10,8 @@ setup(
         "markdown>=3.3",
         "qdarkstyle",
         "plotly",
-        "beautifulsoup4"
+        "beautifulsoup4",
+        "numpy"
     ],
     entry_points={
         "console_scripts": [
@@ -0,0 +1,275 @@
+import os
+import hmac
+import json
+import time
+import asyncio
+import logging
+import argparse
+import ipaddress
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+from teamtrackerpro.models.database_manager import DatabaseManager
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+WRITE_BATCH_WINDOW = 0.02  # Seconds the writer waits for more writes before committing a batch
+WRITE_BATCH_SIZE = 200
+READER_THREADS = 4
+MAX_BODY_SIZE = 16 * 1024 * 1024
+API_TOKEN_ENV_VAR = "TEAMTRACKERPRO_API_TOKEN"
+
+# DatabaseManager methods exposed over the API
+READ_METHODS = {
+    "authenticate", "get_user_by_id", "get_employees", "get_employee_by_id",
+    "get_notes_for_employee", "get_note_previews", "get_note_body", "get_kpis_for_employee",
+    "get_change_log_bounds", "get_changes_since", "has_rewrites_since",
+    "get_max_kpi_id", "get_kpi_aggregates", "get_kpis_after_id", "get_employee_names",
+    "get_audit_intervals", "get_audits_due", "get_notes_between", "get_kpis_between",
+    "search_employees", "get_goals", "get_attainment", "get_attainment_history",
+    "get_subtree_ids", "get_managers", "get_subtree_kpis", "get_subtree_audits_due",
+}
+WRITE_METHODS = {
+    "add_user", "add_employee", "update_employee", "save_employee_profile", "delete_employee", "add_note", "add_kpi",
+    "set_audit_interval", "add_notes", "add_kpis", "set_goal", "set_manager",
+    "upsert_notes", "upsert_kpis",
+}
+
+HTTP_REASONS = {200: "OK", 400: "Bad Request", 401: "Unauthorized", 404: "Not Found", 405: "Method Not Allowed", 413: "Payload Too Large", 500: "Internal Server Error"}
+
+
+def is_loopback(host: str) -> bool:
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+class ApiServer:
+    """Serves DatabaseManager over a small HTTP/JSON protocol on asyncio.
+
+    POST /rpc with {"method": name, "params": [...]} returns {"result": ...} or {"error": ...}.
+    With a token configured every request must carry "Authorization: Bearer <token>"; without
+    one the server refuses to listen anywhere but the loopback interface.
+    All writes go through a single writer task that commits them in batches on one
+    connection, while reads run concurrently on a pool of per-thread read connections.
+    The database is switched to WAL mode so readers never wait on the writer.
+    """
+
+    def __init__(self, db_path: str, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, reader_threads: int = READER_THREADS,
+                 token: Optional[str] = None):
+        if not token and not is_loopback(host):
+            raise ValueError(f"Refusing to serve on {host} without an API token; set {API_TOKEN_ENV_VAR} or pass --token.")
+        self.db_path = db_path
+        self.host = host
+        self.port = port
+        self.token = token
+        self.write_queue: Optional[asyncio.Queue] = None
+        self.writer_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="db-writer")
+        self.reader_executor = ThreadPoolExecutor(max_workers=reader_threads, thread_name_prefix="db-reader")
+        self._local = threading.local()
+        self._reader_dbs: List[DatabaseManager] = []  # Every per-thread reader connection, closed by stop()
+        self._reader_dbs_lock = threading.Lock()
+        self._writer_db: Optional[DatabaseManager] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._writer_task: Optional[asyncio.Task] = None
+
+    # Database access, always on executor threads since sqlite3 connections are bound to their thread
+    def _open_writer(self):
+        self._writer_db = DatabaseManager(self.db_path)  # Opens the database in WAL mode
+
+    def _reader_db(self) -> DatabaseManager:
+        if not hasattr(self._local, "db"):
+            # Not bound to the thread so stop() can close it once the reader pool has shut down
+            self._local.db = DatabaseManager(self.db_path, check_same_thread=False)
+            with self._reader_dbs_lock:
+                self._reader_dbs.append(self._local.db)
+        return self._local.db
+
+    def _run_read(self, method: str, params: List[Any]) -> Any:
+        return getattr(self._reader_db(), method)(*params)
+
+    def _run_write_batch(self, batch: List[Tuple[str, List[Any], asyncio.Future]]) -> List[Tuple[bool, Any]]:
+        # One commit for the whole batch; each write runs in its own savepoint so a failing one is undone alone
+        outcomes = []
+        with self._writer_db.transaction():
+            for method, params, _ in batch:
+                try:
+                    with self._writer_db.transaction():
+                        outcomes.append((True, getattr(self._writer_db, method)(*params)))
+                except Exception as e:
+                    logging.exception(f"API write {method} failed.")
+                    outcomes.append((False, str(e)))
+        return outcomes
+
+    async def _writer_loop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.write_queue.get()]
+            deadline = loop.time() + WRITE_BATCH_WINDOW
+            while len(batch) < WRITE_BATCH_SIZE:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.write_queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            try:
+                outcomes = await loop.run_in_executor(self.writer_executor, self._run_write_batch, batch)
+            except Exception as e:  # The commit itself failed, so none of the batch was stored
+                logging.exception("API write batch failed to commit.")
+                outcomes = [(False, str(e))] * len(batch)
+            for (_, _, future), outcome in zip(batch, outcomes):
+                if not future.done():
+                    future.set_result(outcome)
+
+    async def call(self, method: str, params: List[Any]) -> Tuple[bool, Any]:
+        loop = asyncio.get_running_loop()
+        if method in WRITE_METHODS:
+            future = loop.create_future()
+            await self.write_queue.put((method, params, future))
+            return await future
+        if method in READ_METHODS:
+            try:
+                return True, await loop.run_in_executor(self.reader_executor, self._run_read, method, params)
+            except Exception as e:
+                logging.exception(f"API read {method} failed.")
+                return False, str(e)
+        return False, f"Unknown method: {method}"
+
+    # HTTP handling
+    async def _read_request(self, reader: asyncio.StreamReader):
+        request_line = await reader.readline()
+        if not request_line:
+            return None
+        parts = request_line.decode("latin-1").split()
+        if len(parts) != 3:
+            raise ValueError("Malformed request line")
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        length = int(headers.get("content-length", 0))
+        if not 0 <= length <= MAX_BODY_SIZE:
+            raise ValueError(f"Content-Length must be between 0 and {MAX_BODY_SIZE}")
+        body = await reader.readexactly(length) if length else b""
+        return parts[0], parts[1], parts[2], headers, body
+
+    def _authorized(self, headers: Dict[str, str]) -> bool:
+        if not self.token:
+            return True
+        scheme, _, credentials = headers.get("authorization", "").partition(" ")
+        return scheme.lower() == "bearer" and hmac.compare_digest(credentials.strip().encode("utf-8"), self.token.encode("utf-8"))
+
+    async def _handle_request(self, method: str, path: str, headers: Dict[str, str], body: bytes) -> Tuple[int, Any]:
+        if not self._authorized(headers):
+            return 401, {"error": "Missing or invalid API token"}
+        if path == "/health":
+            return 200, {"status": "ok"}
+        if path != "/rpc":
+            return 404, {"error": "Not found"}
+        if method != "POST":
+            return 405, {"error": "Use POST"}
+        try:
+            request = json.loads(body)
+            ok, result = await self.call(request["method"], list(request.get("params", [])))
+        except (ValueError, KeyError, TypeError) as e:
+            return 400, {"error": f"Bad request: {e}"}
+        return (200, {"result": result}) if ok else (200, {"error": result})
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:  # HTTP/1.1 keep-alive: serve requests until the client closes
+                try:
+                    request = await self._read_request(reader)
+                except (ValueError, asyncio.IncompleteReadError) as e:
+                    await self._send(writer, 400, {"error": str(e)}, keep_alive=False)
+                    break
+                if request is None:
+                    break
+                method, path, version, headers, body = request
+                keep_alive = headers.get("connection", "").lower() != "close" and version == "HTTP/1.1"
+                started = time.perf_counter()
+                status, payload = await self._handle_request(method, path, headers, body)
+                logging.debug(f"{method} {path} -> {status} in {(time.perf_counter() - started) * 1000:.1f}ms")
+                await self._send(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def _send(writer: asyncio.StreamWriter, status: int, payload: Any, keep_alive: bool):
+        data = json.dumps(payload, default=list).encode("utf-8")  # Records serialise as lists in __slots__ order
+        head = (f"HTTP/1.1 {status} {HTTP_REASONS.get(status, '')}\r\n"
+                f"Content-Type: application/json\r\n"
+                f"Content-Length: {len(data)}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+        writer.write(head.encode("latin-1") + data)
+        await writer.drain()
+
+    async def start(self):
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self.writer_executor, self._open_writer)
+        self.write_queue = asyncio.Queue()
+        self._writer_task = asyncio.create_task(self._writer_loop())
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]  # Resolves port 0 to the bound port
+        logging.info(f"TeamTrackerPro API server listening on http://{self.host}:{self.port}")
+
+    async def stop(self):
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+        if self._writer_task:
+            self._writer_task.cancel()
+            try:
+                await self._writer_task
+            except asyncio.CancelledError:
+                pass
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self.writer_executor, self._writer_db.close)
+        self.writer_executor.shutdown()
+        self.reader_executor.shutdown()  # Waits for running reads, so no reader connection is in use below
+        with self._reader_dbs_lock:
+            for db_manager in self._reader_dbs:
+                db_manager.close()
+            self._reader_dbs.clear()
+
+    async def serve_forever(self):
+        await self.start()
+        try:
+            await self._server.serve_forever()
+        finally:
+            await self.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serve a TeamTrackerPro database to several desktop clients.")
+    parser.add_argument("--db", default="teamtracker.db")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--token", default=os.environ.get(API_TOKEN_ENV_VAR, ""),
+                        help=f"Shared secret clients must send (defaults to ${API_TOKEN_ENV_VAR}); required unless --host is loopback")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    try:
+        asyncio.run(ApiServer(args.db, args.host, args.port, token=args.token or None).serve_forever())
+    except ValueError as e:
+        parser.error(str(e))
+    except KeyboardInterrupt:
+        logging.info("API server stopped.")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,326 @@
+import os
+import time
+import heapq
+import sqlite3
+import logging
+import argparse
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from itertools import islice
+from typing import Any, List, Optional, Tuple
+
+from teamtrackerpro.models.database_manager import DatabaseManager, decode_note_body, kpi_rollup_sql
+from teamtrackerpro.models.records import Note, Kpi
+from teamtrackerpro.utils.log_pipeline import log_perf
+
+ARCHIVE_DIR = "archives"
+DEFAULT_ARCHIVE_HORIZON_DAYS = 730  # Rows older than this move out of the hot database
+ARCHIVED_TABLES = ("notes", "performance")
+ARCHIVE_BATCH_SIZE = 5000  # Rows moved per transaction
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def history_order(record) -> Tuple[bool, str, int]:
+    """Sort key matching ORDER BY timestamp, id, where SQLite sorts NULL timestamps first."""
+    return record.timestamp is not None, record.timestamp or "", record.id
+
+
+class ArchiveManager:
+    """Moves old notes and KPIs into per-year archive databases and reads across hot and cold data.
+
+    archive() copies every notes/performance row older than the horizon into
+    ``<archive_dir>/<hot name>_<year>.db`` in bounded batches, deleting each batch from the hot file
+    once its copy is committed and recording the year's row count and timestamp range in archive_catalog. The query methods mirror
+    their DatabaseManager namesakes: they answer from the hot database alone unless the requested
+    range (or page) reaches archived data, and only then ATTACH the archive years that overlap it.
+    """
+
+    def __init__(self, db_manager: DatabaseManager, archive_dir: str = ARCHIVE_DIR, horizon_days: int = DEFAULT_ARCHIVE_HORIZON_DAYS):
+        self.db_manager = db_manager
+        self.archive_dir = archive_dir
+        self.horizon_days = horizon_days
+        self.db_manager.cursor.execute("""
+            CREATE TABLE IF NOT EXISTS archive_catalog (
+                table_name TEXT NOT NULL,
+                year TEXT NOT NULL,
+                row_count INTEGER NOT NULL,
+                min_timestamp TEXT NOT NULL,
+                max_timestamp TEXT NOT NULL,
+                PRIMARY KEY (table_name, year)
+            ) WITHOUT ROWID
+        """)
+        if "keys_recorded" not in self.db_manager._get_columns("archive_catalog"):
+            # Set once the year's import keys are in archived_keys; years archived before that existed are backfilled
+            self.db_manager.cursor.execute("ALTER TABLE archive_catalog ADD COLUMN keys_recorded INTEGER NOT NULL DEFAULT 0")
+        self.db_manager._commit()
+        self._backfill_archived_keys()
+
+    def archive_path(self, year: str) -> str:
+        name = os.path.splitext(os.path.basename(self.db_manager.db_name))[0]
+        return os.path.join(self.archive_dir, f"{name}_{year}.db")
+
+    # Moving rows
+    def _ensure_archive_schema(self, alias: str, table: str) -> List[str]:
+        cursor = self.db_manager.cursor
+        cursor.execute(f"PRAGMA main.table_info({table})")
+        columns = [(name, column_type) for _, name, column_type, _, _, _ in cursor.fetchall()]
+        definitions = ", ".join("id INTEGER PRIMARY KEY" if name == "id" else f"{name} {column_type}" for name, column_type in columns)
+        cursor.execute(f"CREATE TABLE IF NOT EXISTS {alias}.{table} ({definitions})")
+        # Columns added to the hot table after the archive was created
+        cursor.execute(f"PRAGMA {alias}.table_info({table})")
+        archived = {row[1] for row in cursor.fetchall()}
+        for name, column_type in columns:
+            if name not in archived:
+                cursor.execute(f"ALTER TABLE {alias}.{table} ADD COLUMN {name} {column_type}")
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS {alias}.idx_{table}_employee_timestamp ON {table} (employee_id, timestamp)")
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS {alias}.idx_{table}_timestamp ON {table} (timestamp)")
+        # Same natural keys as the hot table, so a row can't be archived twice under different ids
+        try:
+            cursor.execute(f"CREATE UNIQUE INDEX IF NOT EXISTS {alias}.idx_{table}_source_id ON {table} (source_id) WHERE source_id IS NOT NULL")
+            cursor.execute(f"""
+                CREATE UNIQUE INDEX IF NOT EXISTS {alias}.idx_{table}_content_hash ON {table} (content_hash)
+                WHERE content_hash IS NOT NULL AND source_id IS NULL
+            """)
+        except sqlite3.IntegrityError:
+            logging.warning(f"{alias}.{table} already holds rows imported twice; archiving it without unique import keys.")
+        return [name for name, _ in columns]
+
+    def _record_archived_keys(self, source: str, table: str, where: str = "", params: Tuple[Any, ...] = ()) -> None:
+        self.db_manager.cursor.execute(f"""
+            INSERT OR IGNORE INTO main.archived_keys (table_name, key)
+            SELECT ?, COALESCE(source_id, content_hash) FROM {source}.{table}
+            WHERE COALESCE(source_id, content_hash) IS NOT NULL {where}
+        """, (table, *params))
+
+    def _backfill_archived_keys(self) -> None:
+        cursor = self.db_manager.cursor
+        cursor.execute("SELECT table_name, year FROM archive_catalog WHERE keys_recorded = 0")
+        pending = [(table, year) for table, year in cursor.fetchall() if os.path.exists(self.archive_path(year))]
+        for table, year in pending:
+            self.db_manager.flush()  # ATTACH is not allowed inside a transaction
+            cursor.execute("ATTACH DATABASE ? AS archive", (self.archive_path(year),))
+            try:
+                cursor.execute(f"PRAGMA archive.table_info({table})")
+                has_keys = {"source_id", "content_hash"} <= {row[1] for row in cursor.fetchall()}
+                with self.db_manager.transaction():
+                    if has_keys:
+                        self._record_archived_keys("archive", table)
+                    cursor.execute("UPDATE archive_catalog SET keys_recorded = 1 WHERE table_name = ? AND year = ?", (table, year))
+            finally:
+                self.db_manager.flush()
+                cursor.execute("DETACH DATABASE archive")
+        if pending:
+            logging.info(f"Recorded import keys of {len(pending)} archived table years.")
+
+    def archive(self, horizon_days: Optional[int] = None, vacuum: bool = False, stop: Optional[threading.Event] = None) -> int:
+        """Moves rows older than the horizon into the per-year archives and returns how many were moved.
+
+        Rows move in batches of ARCHIVE_BATCH_SIZE, each committed on its own, so other connections
+        only ever wait for one batch. Setting `stop` ends the pass after the current batch.
+        """
+        started = time.perf_counter()
+        horizon_days = self.horizon_days if horizon_days is None else horizon_days
+        cutoff = (datetime.now() - timedelta(days=horizon_days)).strftime(TIMESTAMP_FORMAT)
+        if not os.path.exists(self.archive_dir):
+            os.makedirs(self.archive_dir)
+        cursor = self.db_manager.cursor
+        self.db_manager.flush()  # ATTACH is not allowed inside a transaction
+
+        moved = 0
+        for table in ARCHIVED_TABLES:
+            cursor.execute(f"SELECT DISTINCT substr(timestamp, 1, 4) FROM {table} WHERE timestamp < ?", (cutoff,))
+            for (year,) in cursor.fetchall():
+                if stop is not None and stop.is_set():
+                    break
+                start, end = f"{year}-01-01 00:00:00", min(f"{int(year) + 1}-01-01 00:00:00", cutoff)
+                cursor.execute("ATTACH DATABASE ? AS archive", (self.archive_path(year),))
+                count = 0
+                try:
+                    columns = ", ".join(self._ensure_archive_schema("archive", table))
+                    while stop is None or not stop.is_set():
+                        cursor.execute(f"""
+                            SELECT MAX(id), COUNT(*), MIN(timestamp), MAX(timestamp) FROM (
+                                SELECT id, timestamp FROM main.{table} WHERE timestamp >= ? AND timestamp < ? ORDER BY id LIMIT ?
+                            )
+                        """, (start, end, ARCHIVE_BATCH_SIZE))
+                        last_id, batch_count, min_timestamp, max_timestamp = cursor.fetchone()
+                        if not batch_count:
+                            break
+                        batch = (start, end, last_id)
+                        # With the hot file in WAL mode a transaction spanning both files is not atomic across them,
+                        # so the copy commits first; a crash before the delete leaves a copy the next pass replaces
+                        with self.db_manager.transaction():
+                            cursor.execute(f"""
+                                INSERT OR REPLACE INTO archive.{table} ({columns})
+                                SELECT {columns} FROM main.{table} WHERE timestamp >= ? AND timestamp < ? AND id <= ?
+                            """, batch)
+                        self.db_manager.flush()
+                        with self.db_manager.transaction():
+                            if table == "performance":
+                                # The delete trigger subtracts these rows from kpi_rollups; archived periods keep their totals
+                                cursor.execute(kpi_rollup_sql(f"""
+                                    SELECT employee_id, timestamp, calls_handled, tickets_triaged FROM main.performance
+                                    WHERE timestamp >= ? AND timestamp < ? AND id <= ?
+                                """), batch)
+                            # Importing these rows again must not bring them back into the hot tables
+                            self._record_archived_keys("main", table, "AND timestamp >= ? AND timestamp < ? AND id <= ?", batch)
+                            cursor.execute(f"DELETE FROM main.{table} WHERE timestamp >= ? AND timestamp < ? AND id <= ?", batch)
+                            self._update_catalog(table, year, batch_count, min_timestamp, max_timestamp)
+                        self.db_manager.flush()
+                        count += batch_count
+                    if count:
+                        # Exact count once per year, in case an interrupted pass left the running total off
+                        cursor.execute(f"SELECT COUNT(*) FROM archive.{table}")
+                        cursor.execute("UPDATE archive_catalog SET row_count = ? WHERE table_name = ? AND year = ?",
+                                       (cursor.fetchone()[0], table, year))
+                finally:
+                    self.db_manager.flush()
+                    cursor.execute("DETACH DATABASE archive")
+                moved += count
+                if count:
+                    logging.info(f"Archived {count} {table} rows from {year} to {self.archive_path(year)}.")
+
+        if vacuum and moved and (stop is None or not stop.is_set()):
+            cursor.execute("VACUUM")
+        elapsed = time.perf_counter() - started
+        log_perf("archive", rows=moved, seconds=round(elapsed, 3), rows_per_second=round(moved / elapsed, 1) if elapsed else None)
+        return moved
+
+    def _update_catalog(self, table: str, year: str, row_count: int, min_timestamp: str, max_timestamp: str) -> None:
+        self.db_manager.cursor.execute("""
+            INSERT INTO archive_catalog (table_name, year, row_count, min_timestamp, max_timestamp, keys_recorded) VALUES (?, ?, ?, ?, ?, 1)
+            ON CONFLICT (table_name, year) DO UPDATE SET
+                row_count = row_count + excluded.row_count,
+                min_timestamp = min(min_timestamp, excluded.min_timestamp),
+                max_timestamp = max(max_timestamp, excluded.max_timestamp)
+        """, (table, year, row_count, min_timestamp, max_timestamp))
+
+    # Unified reads
+    def archived_years(self, table: str, start: Optional[str] = None, end: Optional[str] = None) -> List[str]:
+        """Archive years of `table` holding rows in [start, end), newest first."""
+        self.db_manager.cursor.execute("""
+            SELECT year FROM archive_catalog
+            WHERE table_name = ? AND row_count > 0 AND (? IS NULL OR max_timestamp >= ?) AND (? IS NULL OR min_timestamp < ?)
+            ORDER BY year DESC
+        """, (table, start, start, end, end))
+        return [year for (year,) in self.db_manager.cursor.fetchall() if os.path.exists(self.archive_path(year))]
+
+    @contextmanager
+    def _archives(self, years: List[str]):
+        # A separate read-only connection, so the hot connection's transaction state is never touched
+        connection = sqlite3.connect("file::memory:", uri=True)
+        try:
+            aliases = []
+            for year in years:
+                alias = f"archive_{year}"
+                connection.execute(f"ATTACH DATABASE ? AS {alias}", (f"file:{self.archive_path(year)}?mode=ro",))
+                aliases.append(alias)
+            yield connection, aliases
+        finally:
+            connection.close()
+
+    def get_kpis_between(self, start: str, end: str) -> List[Tuple[Any, ...]]:
+        rows = self.db_manager.get_kpis_between(start, end)
+        years = self.archived_years("performance", start, end)
+        if not years:
+            return rows
+        with self._archives(years) as (connection, aliases):
+            selects = " UNION ALL ".join(
+                f"SELECT employee_id, timestamp, calls_handled, tickets_triaged, sentiment_score FROM {alias}.performance "
+                f"WHERE timestamp >= ? AND timestamp < ? AND employee_id IS NOT NULL" for alias in aliases)
+            rows = connection.execute(selects, (start, end) * len(aliases)).fetchall() + rows
+        rows.sort(key=lambda row: (row[0], row[1]))
+        return rows
+
+    def get_notes_between(self, start: str, end: str, note_types=None) -> List[Tuple[Any, ...]]:
+        rows = self.db_manager.get_notes_between(start, end, note_types)
+        years = self.archived_years("notes", start, end)
+        if not years:
+            return rows
+        type_filter = f" AND note_type IN ({', '.join('?' for _ in note_types)})" if note_types else ""
+        params = (start, end, *(note_types or ()))
+        with self._archives(years) as (connection, aliases):
+            selects = " UNION ALL ".join(
+                f"SELECT employee_id, timestamp, note_type, note, compressed FROM {alias}.notes "
+                f"WHERE timestamp >= ? AND timestamp < ?{type_filter}" for alias in aliases)
+            archived = [(employee_id, timestamp, note_type, decode_note_body(body, compressed))
+                        for employee_id, timestamp, note_type, body, compressed in connection.execute(selects, params * len(aliases))]
+        rows = archived + rows
+        rows.sort(key=lambda row: (row[0], row[1]))
+        return rows
+
+    def _paged_history(self, table: str, employee_id: int, limit: int, offset: int, hot_page, select: str, record_type):
+        # Merged by (timestamp, id) rather than hot rows first: a row edited to an earlier date or imported with
+        # an old timestamp can be older than archived ones. Each side only needs its first offset + limit rows.
+        years = self.archived_years(table)
+        if not years:
+            return hot_page(employee_id, limit, offset)
+        window = -1 if limit < 0 else offset + limit
+        hot = hot_page(employee_id, window, 0)
+        with self._archives(years) as (connection, aliases):
+            cursor = connection.cursor()
+            cursor.row_factory = record_type.from_row
+            union = " UNION ALL ".join(select.format(alias=alias) for alias in aliases)
+            cursor.execute(f"SELECT * FROM ({union}) ORDER BY timestamp DESC, id DESC LIMIT ?", (employee_id,) * len(aliases) + (window,))
+            archived = cursor.fetchall()
+        merged = heapq.merge(hot, archived, key=history_order, reverse=True)
+        return list(islice(merged, offset, None if limit < 0 else offset + limit))
+
+    def get_kpis_for_employee(self, employee_id: int, limit: int = -1, offset: int = 0) -> List[Kpi]:
+        return self._paged_history(
+            "performance", employee_id, limit, offset, self.db_manager.get_kpis_for_employee,
+            "SELECT id, timestamp, calls_handled, tickets_triaged, sentiment_score, summary FROM {alias}.performance WHERE employee_id = ?",
+            Kpi
+        )
+
+    def get_note_previews(self, employee_id: int, limit: int, offset: int = 0) -> List[Note]:
+        # Archived notes can't join the hot users table here, so their creator is resolved separately
+        notes = self._paged_history(
+            "notes", employee_id, limit, offset, self.db_manager.get_note_previews,
+            "SELECT id, timestamp, note_type, preview, created_by, NULL AS created_by_name FROM {alias}.notes WHERE employee_id = ?",
+            Note
+        )
+        for note in notes:
+            if note.created_by_name is None:
+                user = self.db_manager.get_user_by_id(note.created_by) if note.created_by is not None else None
+                note.created_by_name = user.username if user else "Unknown"
+        return notes
+
+    def get_note_body(self, note_id: int) -> Optional[str]:
+        body = self.db_manager.get_note_body(note_id)
+        if body is not None:
+            return body
+        with self._archives(self.archived_years("notes")) as (connection, aliases):
+            for alias in aliases:
+                row = connection.execute(f"SELECT note, compressed FROM {alias}.notes WHERE id = ?", (note_id,)).fetchone()
+                if row is not None:
+                    return decode_note_body(row[0], row[1])
+        return None
+
+
+def archive_database(db_path: str, horizon_days: int = DEFAULT_ARCHIVE_HORIZON_DAYS, archive_dir: str = ARCHIVE_DIR,
+                     vacuum: bool = False, stop: Optional[threading.Event] = None) -> int:
+    """Runs one archival pass on its own connection, so it can be called from a worker thread."""
+    db_manager = DatabaseManager(db_path)
+    try:
+        return ArchiveManager(db_manager, archive_dir, horizon_days).archive(vacuum=vacuum, stop=stop)
+    finally:
+        db_manager.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Move old notes and KPIs from the TeamTrackerPro database into per-year archives.")
+    parser.add_argument("--db", default="teamtracker.db")
+    parser.add_argument("--archive-dir", default=ARCHIVE_DIR)
+    parser.add_argument("--horizon-days", type=int, default=DEFAULT_ARCHIVE_HORIZON_DAYS, help="Archive rows older than this many days")
+    parser.add_argument("--vacuum", action="store_true", help="Reclaim the freed space in the hot database afterwards")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    moved = archive_database(args.db, args.horizon_days, args.archive_dir, args.vacuum)
+    print(f"Archived {moved} rows.")
+
+
+if __name__ == '__main__':
+    main()
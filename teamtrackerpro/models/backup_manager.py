@@ -0,0 +1,184 @@
+import os
+import time
+import sqlite3
+import logging
+import argparse
+from datetime import datetime
+from typing import Callable, List, Optional
+
+BACKUP_DIR = "backups"
+BACKUP_PAGES_PER_STEP = 256  # Pages copied per step; the source is only locked while a step runs
+BACKUP_STEP_SLEEP = 0.01  # Seconds to yield to writers between steps
+# A write from another connection restarts a paged copy; past either limit the copy is redone in one step
+BACKUP_MAX_RESTARTS = 3
+BACKUP_MAX_SECONDS = 120
+SNAPSHOT_TIME_FORMAT = "%Y%m%d-%H%M%S"
+
+
+class _PagedCopyAbandoned(Exception):
+    pass
+
+
+class BackupManager:
+    """Takes consistent snapshots of a live database using SQLite's online backup API.
+
+    Snapshots are written as <backup_dir>/<db name>-<timestamp>.db, checked with
+    PRAGMA integrity_check, and pruned by retention rules afterwards.
+
+    Args:
+        db_path: Path of the database to back up.
+        backup_dir: Directory where snapshots are kept.
+        keep_last: Number of most recent snapshots that are always kept.
+        keep_daily: Number of days for which the newest snapshot of each day is kept.
+        keep_weekly: Number of weeks for which the newest snapshot of each ISO week is kept.
+    """
+
+    def __init__(self, db_path: str, backup_dir: str = BACKUP_DIR, keep_last: int = 5, keep_daily: int = 7, keep_weekly: int = 4):
+        self.db_path = db_path
+        self.backup_dir = backup_dir
+        self.keep_last = keep_last
+        self.keep_daily = keep_daily
+        self.keep_weekly = keep_weekly
+        self.prefix = os.path.splitext(os.path.basename(db_path))[0] + "-"
+        if not os.path.exists(backup_dir):
+            os.makedirs(backup_dir)
+
+    def create_snapshot(self, progress: Optional[Callable[[int, int], None]] = None) -> str:
+        """Copies the database in paged steps and returns the verified snapshot path.
+
+        Writes from other connections make SQLite restart a paged copy, so under steady writes it might never
+        finish. After BACKUP_MAX_RESTARTS restarts or BACKUP_MAX_SECONDS the copy is taken again in a
+        single step, which holds one read transaction for the whole copy but cannot be restarted.
+
+        Raises:
+            sqlite3.DatabaseError: If the copy fails or the snapshot does not pass the integrity check.
+        """
+        snapshot_path = os.path.join(self.backup_dir, self.prefix + datetime.now().strftime(SNAPSHOT_TIME_FORMAT) + ".db")
+        partial_path = snapshot_path + ".partial"
+        started = time.perf_counter()
+
+        # A private source connection keeps the copy independent of the UI's connection and thread
+        source = sqlite3.connect(self.db_path)
+        target = sqlite3.connect(partial_path)
+        copied = {"pages": 0, "restarts": 0}
+        try:
+            def on_step(status, remaining, total):
+                if total - remaining <= copied["pages"]:  # No progress past the last step: the copy started over
+                    copied["restarts"] += 1
+                copied["pages"] = total - remaining
+                if progress:
+                    progress(total - remaining, total)
+                if copied["restarts"] > BACKUP_MAX_RESTARTS or time.perf_counter() - started > BACKUP_MAX_SECONDS:
+                    raise _PagedCopyAbandoned()
+                time.sleep(BACKUP_STEP_SLEEP)
+
+            try:
+                source.backup(target, pages=BACKUP_PAGES_PER_STEP, progress=on_step)
+            except _PagedCopyAbandoned:
+                logging.warning(f"Paged backup of {self.db_path} restarted {copied['restarts']} times in "
+                                f"{time.perf_counter() - started:.1f}s under concurrent writes, copying it in a single step instead.")
+                source.backup(target, pages=-1)
+        finally:
+            target.close()
+            source.close()
+
+        if not self.verify_snapshot(partial_path):
+            os.remove(partial_path)
+            raise sqlite3.DatabaseError(f"Snapshot failed integrity check: {snapshot_path}")
+        os.replace(partial_path, snapshot_path)  # Only complete, verified snapshots get the final name
+
+        logging.info(f"Database snapshot written to {snapshot_path} in {time.perf_counter() - started:.2f}s.")
+        self.prune_snapshots()
+        return snapshot_path
+
+    @staticmethod
+    def verify_snapshot(snapshot_path: str) -> bool:
+        connection = sqlite3.connect(snapshot_path)
+        try:
+            result = connection.execute("PRAGMA integrity_check").fetchall()
+        except sqlite3.DatabaseError as e:
+            logging.error(f"Integrity check could not run on {snapshot_path}: {e}")
+            return False
+        finally:
+            connection.close()
+        if result != [("ok",)]:
+            logging.error(f"Integrity check failed for {snapshot_path}: {result[:5]}")
+            return False
+        return True
+
+    def list_snapshots(self) -> List[str]:
+        """Returns snapshot paths, newest first."""
+        names = [name for name in os.listdir(self.backup_dir) if name.startswith(self.prefix) and name.endswith(".db")]
+        return [os.path.join(self.backup_dir, name) for name in sorted(names, reverse=True)]
+
+    def _snapshot_time(self, snapshot_path: str) -> Optional[datetime]:
+        stamp = os.path.basename(snapshot_path)[len(self.prefix):-len(".db")]
+        try:
+            return datetime.strptime(stamp, SNAPSHOT_TIME_FORMAT)
+        except ValueError:
+            return None
+
+    def prune_snapshots(self) -> List[str]:
+        """Deletes snapshots not covered by any retention rule and returns their paths."""
+        snapshots = [(path, self._snapshot_time(path)) for path in self.list_snapshots()]
+        snapshots = [(path, taken) for path, taken in snapshots if taken is not None]
+        now = datetime.now()
+        keep = {path for path, _ in snapshots[:self.keep_last]}
+
+        seen_days, seen_weeks = set(), set()
+        for path, taken in snapshots:  # Newest first, so the first hit per bucket is the newest
+            age_days = (now - taken).days
+            if age_days < self.keep_daily and taken.date() not in seen_days:
+                seen_days.add(taken.date())
+                keep.add(path)
+            week = taken.isocalendar()[:2]
+            if age_days < self.keep_weekly * 7 and week not in seen_weeks:
+                seen_weeks.add(week)
+                keep.add(path)
+
+        removed = []
+        for path, _ in snapshots:
+            if path not in keep:
+                os.remove(path)
+                removed.append(path)
+        if removed:
+            logging.info(f"Pruned {len(removed)} old database snapshots.")
+        return removed
+
+    def restore_snapshot(self, snapshot_path: str, target_path: str) -> None:
+        """Copies a snapshot into target_path using the backup API, so open readers see a consistent file."""
+        if not self.verify_snapshot(snapshot_path):
+            raise sqlite3.DatabaseError(f"Refusing to restore corrupt snapshot: {snapshot_path}")
+        source = sqlite3.connect(snapshot_path)
+        target = sqlite3.connect(target_path)
+        try:
+            source.backup(target, pages=BACKUP_PAGES_PER_STEP)
+        finally:
+            target.close()
+            source.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Take rotating, verified snapshots of the TeamTrackerPro database.")
+    parser.add_argument("--db", default="teamtracker.db", help="Database file to back up")
+    parser.add_argument("--backup-dir", default=BACKUP_DIR)
+    parser.add_argument("--interval", type=int, default=0, help="Seconds between snapshots; 0 takes a single snapshot and exits")
+    parser.add_argument("--keep-last", type=int, default=5)
+    parser.add_argument("--keep-daily", type=int, default=7)
+    parser.add_argument("--keep-weekly", type=int, default=4)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    manager = BackupManager(args.db, args.backup_dir, args.keep_last, args.keep_daily, args.keep_weekly)
+    while True:
+        try:
+            manager.create_snapshot()
+        except sqlite3.Error as e:
+            logging.error(f"Backup failed: {e}")
+        if args.interval <= 0:
+            break
+        time.sleep(args.interval)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+import logging
+from typing import Optional, Set
+
+CHANGE_FEED_PAGE_SIZE = 1000
+
+
+class ChangeSet:
+    """Changes seen by one ChangeFeed.poll(), grouped by what a client has to refresh."""
+
+    def __init__(self):
+        self.full_reload = False  # The log no longer covers our last sequence; everything must be refetched
+        self.employees_changed: Set[int] = set()  # Inserted or updated employee ids
+        self.employees_deleted: Set[int] = set()
+        self.notes_changed: Set[int] = set()  # Employee ids whose notes changed
+        self.kpis_changed: Set[int] = set()  # Employee ids whose KPIs changed
+        self.goals_changed: Set[int] = set()  # Employee ids whose goals changed
+
+    def __bool__(self):
+        return bool(self.full_reload or self.employees_changed or self.employees_deleted or self.notes_changed or self.kpis_changed
+                    or self.goals_changed)
+
+    def touches_employee(self, employee_id: int) -> bool:
+        return self.full_reload or any(employee_id in ids for ids in (
+            self.employees_changed, self.employees_deleted, self.notes_changed, self.kpis_changed, self.goals_changed))
+
+
+class ChangeFeed:
+    """Tracks a client's position in the change_log table and returns what changed since then.
+
+    An idle poll costs a single MIN/MAX lookup on the change log's primary key.
+    """
+
+    def __init__(self, db_manager, last_seq: Optional[int] = None):
+        self.db_manager = db_manager
+        self.last_seq = db_manager.get_change_log_bounds()[1] if last_seq is None else last_seq
+
+    def poll(self) -> ChangeSet:
+        changes = ChangeSet()
+        oldest, newest = self.db_manager.get_change_log_bounds()
+        if newest <= self.last_seq:
+            if newest < self.last_seq:  # The database was replaced or restored from a snapshot
+                changes.full_reload = True
+                self.last_seq = newest
+            return changes
+        if oldest > self.last_seq + 1:  # Entries we have not seen were already pruned
+            logging.info(f"Change log starts at {oldest}, client is at {self.last_seq}; doing a full reload.")
+            changes.full_reload = True
+            self.last_seq = newest
+            return changes
+
+        while self.last_seq < newest:
+            rows = self.db_manager.get_changes_since(self.last_seq, CHANGE_FEED_PAGE_SIZE)
+            if not rows:
+                break
+            for seq, table_name, row_id, employee_id, operation in rows:
+                if table_name == "employees":
+                    if operation == "delete":
+                        changes.employees_deleted.add(row_id)
+                        changes.employees_changed.discard(row_id)
+                    else:
+                        changes.employees_changed.add(row_id)
+                        changes.employees_deleted.discard(row_id)
+                elif table_name == "notes":
+                    changes.notes_changed.add(employee_id)
+                elif table_name == "performance":
+                    changes.kpis_changed.add(employee_id)
+                elif table_name == "goals":
+                    changes.goals_changed.add(employee_id)
+            self.last_seq = rows[-1][0]
+        return changes
@@ -0,0 +1,154 @@
+import os
+import json
+import time
+import logging
+import argparse
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from teamtrackerpro.models.database_manager import DatabaseManager
+from teamtrackerpro.utils.log_pipeline import log_perf
+
+SNAPSHOT_SUFFIX = ".snapshot"  # The snapshot directory sits next to its database
+SNAPSHOT_FORMAT_VERSION = 2
+# Column name -> little-endian fixed-width dtype; one <name>.bin file per column
+SNAPSHOT_COLUMNS = {
+    "employee_id": np.dtype("<i4"),
+    "epoch": np.dtype("<i8"),  # The stored (local time) timestamp as Unix seconds
+    "calls": np.dtype("<i4"),  # NULL is stored as 0
+    "tickets": np.dtype("<i4"),  # NULL is stored as 0
+    "sentiment": np.dtype("<f4"),  # NULL is stored as NaN
+}
+FETCH_BATCH_SIZE = 100000
+
+
+class ColumnarSnapshot:
+    """Column-per-file binary copy of the performance table for scans over millions of rows.
+
+    Each column is a flat array of fixed-width values in performance.id order, so readers map the
+    files with numpy.memmap and never build Python objects per row. meta.json records how many rows
+    the files hold, the highest performance id copied and the change_log position. refresh() then
+    appends only rows with a higher id; if an already-copied row was updated or deleted since (or
+    that part of the change log was pruned) the snapshot is rebuilt from scratch.
+    KpiForecaster reads its KPI history from here when one is configured.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    @classmethod
+    def for_database(cls, db_path: str) -> "ColumnarSnapshot":
+        return cls(db_path + SNAPSHOT_SUFFIX)
+
+    def _column_path(self, name: str) -> str:
+        return os.path.join(self.directory, f"{name}.bin")
+
+    def _meta_path(self) -> str:
+        return os.path.join(self.directory, "meta.json")
+
+    def read_meta(self) -> Optional[dict]:
+        try:
+            with open(self._meta_path(), "r", encoding="utf-8") as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return meta if meta.get("version") == SNAPSHOT_FORMAT_VERSION else None
+
+    def _write_meta(self, meta: dict) -> None:
+        # Written after the column data and swapped in atomically, so readers never see rows that aren't there yet
+        partial_path = self._meta_path() + ".partial"
+        with open(partial_path, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(partial_path, self._meta_path())
+
+    def refresh(self, db_manager) -> int:
+        """Brings the snapshot up to date and returns the number of rows appended."""
+        started = time.perf_counter()
+        if not os.path.exists(self.directory):
+            os.makedirs(self.directory)
+        meta = self.read_meta()
+        oldest_seq, latest_seq = db_manager.get_change_log_bounds()
+        if meta is not None:
+            if oldest_seq > meta["change_seq"] + 1 or db_manager.has_rewrites_since(meta["change_seq"], "performance", meta["max_id"]):
+                logging.info("Performance rows in the columnar snapshot changed, rebuilding it.")
+                meta = None
+        if meta is None:
+            meta = {"version": SNAPSHOT_FORMAT_VERSION, "row_count": 0, "max_id": 0, "change_seq": 0}
+
+        # Drop anything an interrupted refresh appended past the committed row count
+        for name, dtype in SNAPSHOT_COLUMNS.items():
+            with open(self._column_path(name), "ab") as f:
+                f.truncate(meta["row_count"] * dtype.itemsize)
+
+        appended = 0
+        while True:
+            rows = db_manager.get_performance_columns_after(meta["max_id"], FETCH_BATCH_SIZE)
+            if not rows:
+                break
+            columns = list(zip(*rows))
+            values = {
+                "employee_id": np.array(columns[1], dtype=np.float64),
+                "epoch": np.array(columns[2], dtype=np.float64),
+                "calls": np.array(columns[3], dtype=np.float64),
+                "tickets": np.array(columns[4], dtype=np.float64),
+                "sentiment": np.array(columns[5], dtype=np.float64),  # None becomes NaN
+            }
+            for name, dtype in SNAPSHOT_COLUMNS.items():
+                column = values[name] if dtype.kind == "f" else np.nan_to_num(values[name])
+                with open(self._column_path(name), "ab") as f:
+                    column.astype(dtype).tofile(f)
+            meta["row_count"] += len(rows)
+            meta["max_id"] = rows[-1][0]
+            appended += len(rows)
+        meta["change_seq"] = latest_seq
+        self._write_meta(meta)
+        elapsed = time.perf_counter() - started
+        logging.info(f"Columnar snapshot refreshed: {appended} rows appended, {meta['row_count']} total, in {elapsed:.2f}s.")
+        log_perf("snapshot_refresh", rows=appended, total_rows=meta["row_count"], seconds=round(elapsed, 3),
+                 rows_per_second=round(appended / elapsed, 1) if elapsed else None)
+        return appended
+
+    def open(self) -> Dict[str, np.ndarray]:
+        """Maps every column read-only; arrays are views of the files, nothing is copied into memory."""
+        meta = self.read_meta()
+        row_count = meta["row_count"] if meta else 0
+        if not row_count:
+            return {name: np.empty(0, dtype=dtype) for name, dtype in SNAPSHOT_COLUMNS.items()}
+        return {name: np.memmap(self._column_path(name), dtype=dtype, mode="r", shape=(row_count,))
+                for name, dtype in SNAPSHOT_COLUMNS.items()}
+
+    def totals_by_employee(self, start_epoch: Optional[int] = None, end_epoch: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(employee_ids, calls, tickets) summed over [start_epoch, end_epoch) in one pass over the mapped columns.
+
+        Bounds are Unix seconds; for a local date or time use datetime(...).timestamp(), as the stored times are local.
+        """
+        columns = self.open()
+        mask = np.ones(len(columns["epoch"]), dtype=bool)
+        if start_epoch is not None:
+            mask &= columns["epoch"] >= start_epoch
+        if end_epoch is not None:
+            mask &= columns["epoch"] < end_epoch
+        employee_ids, rows_of = np.unique(columns["employee_id"][mask], return_inverse=True)
+        calls = np.bincount(rows_of, weights=columns["calls"][mask], minlength=len(employee_ids))
+        tickets = np.bincount(rows_of, weights=columns["tickets"][mask], minlength=len(employee_ids))
+        return employee_ids, calls, tickets
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Write or refresh the columnar snapshot of the performance table.")
+    parser.add_argument("--db", default="teamtracker.db")
+    parser.add_argument("--dir", default=None, help=f"Snapshot directory (default: the database path plus {SNAPSHOT_SUFFIX})")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    db_manager = DatabaseManager(args.db)
+    try:
+        snapshot = ColumnarSnapshot(args.dir) if args.dir else ColumnarSnapshot.for_database(args.db)
+        snapshot.refresh(db_manager)
+    finally:
+        db_manager.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,20 +1,132 @@
 import os
+import re
+import csv
+import time
+import zlib
+import hmac
+import hashlib
 import sqlite3
 import logging
+from contextlib import contextmanager
 from datetime import datetime
-from typing import Any, List, Tuple, Optional
+from typing import Any, Dict, List, Tuple, Optional
+
+from teamtrackerpro.models.records import Record, User, Employee, Note, Kpi
 
 UPLOADS_DIR = "uploads"
 if not os.path.exists(UPLOADS_DIR):
     os.makedirs(UPLOADS_DIR)
 
 AUDIT_NOTE_TYPES = {"Ticket Audit", "Call Audit"}
+DEFAULT_AUDIT_INTERVAL_DAYS = 30
+
+DURABILITY_LEVELS = ("OFF", "NORMAL", "FULL", "EXTRA")  # Values of PRAGMA synchronous
+BUSY_TIMEOUT_MS = 30000  # How long a write waits for another connection's write lock before "database is locked"
+
+CHANGE_LOG_RETENTION_DAYS = 7  # Clients that were offline longer than this fall back to a full reload
+# Tables whose writes are recorded in change_log, with the expression giving the affected employee
+CHANGE_TRACKED_TABLES = {"employees": "id", "notes": "employee_id", "performance": "employee_id", "goals": "employee_id"}
+
+FUZZY_MIN_SIMILARITY = 0.3
+FUZZY_FIELDS = ("name", "email")
+
+# Goal metric -> performance column it is measured on
+GOAL_METRICS = {"calls": "calls_handled", "tickets": "tickets_triaged"}
+GOAL_PERIODS = ("week", "month", "quarter")  # Periods kpi_rollups keeps totals for
+# SQL giving the start of the period containing a timestamp, formatted like leaderboard.period_bounds
+PERIOD_START_SQL = {
+    "week": "datetime({ts}, 'start of day', 'weekday 0', '-6 days')",
+    "month": "datetime({ts}, 'start of month')",
+    "quarter": "datetime({ts}, 'start of month', '-' || ((CAST(strftime('%m', {ts}) AS INTEGER) - 1) % 3) || ' months')",
+}
+
+NOTE_PREVIEW_LENGTH = 50
+NOTE_COMPRESSION_THRESHOLD = 4096  # Note bodies larger than this (in bytes) are stored zlib-compressed
+
+
+def make_note_preview(note: str) -> str:
+    return note[:NOTE_PREVIEW_LENGTH] + "..." if len(note) > NOTE_PREVIEW_LENGTH else note
+
+
+def encode_note_body(note: str) -> Tuple[Any, int]:
+    """Returns the value to store in notes.note and the matching compressed flag."""
+    raw = note.encode("utf-8")
+    if len(raw) > NOTE_COMPRESSION_THRESHOLD:
+        return sqlite3.Binary(zlib.compress(raw)), 1
+    return note, 0
+
+
+def decode_note_body(body: Any, compressed: int) -> str:
+    if compressed:
+        return zlib.decompress(body).decode("utf-8")
+    return body
+
+def make_trigrams(text: str) -> set:
+    """Trigrams of each word, padded like pg_trgm ("jon" -> "  j", " jo", "jon", "on "), so word starts weigh more."""
+    trigrams = set()
+    for word in re.findall(r"[a-z0-9]+", (text or "").lower()):
+        padded = f"  {word} "
+        trigrams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return trigrams
+
+
+def employee_search_text(field: str, value: str) -> str:
+    # The domain is shared by most of the team and would make every email look alike
+    return (value or "").split("@")[0] if field == "email" else value
+
+
+def content_hash(*fields: Any) -> bytes:
+    """16-byte key identifying an imported row by its values, for rows without a source id."""
+    return hashlib.blake2b("\x1f".join("" if field is None else str(field) for field in fields).encode("utf-8"), digest_size=16).digest()
+
+
+def not_archived_sql(table: str, width: int) -> str:
+    """Row source for the upserts: `width` bound values, unless the row's natural key is in archived_keys.
+
+    The last two values must be source_id and content_hash. The WHERE also lets SQLite parse an
+    ON CONFLICT clause after the SELECT.
+    """
+    return f"""
+        SELECT * FROM (VALUES ({", ".join("?" * width)})) AS row
+        WHERE NOT EXISTS (SELECT 1 FROM archived_keys WHERE table_name = '{table}' AND key = COALESCE(row.column{width - 1}, row.column{width}))
+    """
+
+
+def kpi_rollup_sql(rows_sql: str, sign: int = 1) -> str:
+    """Statement adding (or with sign=-1, subtracting) the KPI rows selected by `rows_sql` to kpi_rollups.
+
+    `rows_sql` must yield employee_id, timestamp, calls_handled and tickets_triaged columns.
+    """
+    periods = " UNION ALL ".join(f"SELECT '{period}' AS period" for period in GOAL_PERIODS)
+    starts = " ".join(f"WHEN '{period}' THEN {PERIOD_START_SQL[period].format(ts='kpi.timestamp')}" for period in GOAL_PERIODS)
+    return f"""
+        INSERT INTO kpi_rollups (employee_id, period, period_start, calls, tickets)
+        SELECT kpi.employee_id, periods.period, CASE periods.period {starts} END,
+               {sign} * SUM(COALESCE(kpi.calls_handled, 0)), {sign} * SUM(COALESCE(kpi.tickets_triaged, 0))
+        FROM ({rows_sql}) AS kpi CROSS JOIN ({periods}) AS periods
+        WHERE kpi.employee_id IS NOT NULL AND datetime(kpi.timestamp) IS NOT NULL
+        GROUP BY 1, 2, 3
+        ON CONFLICT (employee_id, period, period_start) DO UPDATE SET
+            calls = kpi_rollups.calls + excluded.calls, tickets = kpi_rollups.tickets + excluded.tickets
+    """
+
 
 class DatabaseManager:
-    def __init__(self, db_name="teamtracker.db"):
-        self.connection = sqlite3.connect(db_name)
+    def __init__(self, db_name="teamtracker.db", durability=None, group_commit_window=0.0, check_same_thread=True):
+        self.db_name = db_name
+        self.connection = sqlite3.connect(db_name, check_same_thread=check_same_thread)
         self.cursor = self.connection.cursor()
+        # The GUI, archival, ingestion and backup threads each have a connection to the same file. WAL lets
+        # readers run during a write, and the busy timeout makes a second writer wait its turn instead of failing
+        self.cursor.execute(f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}")
+        self.cursor.execute("PRAGMA journal_mode = WAL")
+        self._transaction_depth = 0
+        self.group_commit_window = group_commit_window  # Seconds; 0 commits every write immediately
+        self._pending_since = None  # When the oldest uncommitted grouped write was made
+        self.closed = False
         self._create_tables()
+        if durability:
+            self.set_durability(durability)
 
     def _create_tables(self):
         self.cursor.execute("""
@@ -35,7 +147,9 @@ class DatabaseManager:
                 role TEXT NOT NULL DEFAULT 'employee', -- 'employee', 'team_leader'
                 join_date TEXT,
                 last_audit_report TEXT,
-                info TEXT
+                info TEXT,
+                manager_id INTEGER,  -- Who the employee reports to, NULL at the top of the org
+                FOREIGN KEY (manager_id) REFERENCES employees(id)
             )
         """)
 
@@ -45,8 +159,13 @@ class DatabaseManager:
                 employee_id INTEGER,
                 timestamp TEXT,
                 note_type TEXT,
-                note TEXT,
+                note TEXT,  -- Full body; zlib-compressed BLOB when compressed = 1
                 created_by INTEGER,  -- ID of the user who created the note
+                preview TEXT,  -- First NOTE_PREVIEW_LENGTH characters, used by list views
+                compressed INTEGER NOT NULL DEFAULT 0,
+                sentiment_score REAL,  -- Filled in by the sentiment engine
+                source_id TEXT,  -- Id of the row in the system it was imported from
+                content_hash BLOB,  -- content_hash() of imported rows
                 FOREIGN KEY (employee_id) REFERENCES employees(id),
                 FOREIGN KEY (created_by) REFERENCES users(id)
             )
@@ -61,76 +180,903 @@ class DatabaseManager:
                 tickets_triaged INTEGER,
                 sentiment_score REAL,
                 summary TEXT,
+                source_id TEXT,  -- Id of the row in the system it was imported from
+                content_hash BLOB,  -- content_hash() of imported rows
+                FOREIGN KEY (employee_id) REFERENCES employees(id)
+            )
+        """)
+
+        self.cursor.execute("""
+            CREATE TABLE IF NOT EXISTS goals (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                employee_id INTEGER NOT NULL,
+                metric TEXT NOT NULL,  -- A key of GOAL_METRICS
+                period TEXT NOT NULL,  -- One of GOAL_PERIODS
+                target REAL NOT NULL,
+                UNIQUE (employee_id, metric, period),
                 FOREIGN KEY (employee_id) REFERENCES employees(id)
             )
         """)
 
+        self._migrate_notes()
+        self._create_import_keys()
+        if "manager_id" not in self._get_columns("employees"):
+            self.cursor.execute("ALTER TABLE employees ADD COLUMN manager_id INTEGER REFERENCES employees(id)")
+        self.cursor.execute("CREATE INDEX IF NOT EXISTS idx_employees_manager ON employees (manager_id)")
+        self.cursor.execute("CREATE INDEX IF NOT EXISTS idx_notes_employee_timestamp ON notes (employee_id, timestamp)")
+        self.cursor.execute("CREATE INDEX IF NOT EXISTS idx_performance_employee_timestamp ON performance (employee_id, timestamp)")
+        self.cursor.execute("CREATE INDEX IF NOT EXISTS idx_performance_timestamp ON performance (timestamp)")
+        self._create_change_log()
+        self._create_audit_schedule()
+        self._create_kpi_rollups()
+        self._create_org_closure()
+
+        self._create_trigram_index()
+
+        self.cursor.execute("""
+            CREATE TABLE IF NOT EXISTS sentiment_cache (
+                text_hash TEXT PRIMARY KEY,  -- sha1 of the scored text
+                score REAL NOT NULL
+            ) WITHOUT ROWID
+        """)
         self.connection.commit()
 
+    def _create_change_log(self):
+        # Every insert/update/delete on a tracked table appends one row here, so running clients
+        # can fetch only what changed since the last sequence number they saw
+        self.cursor.execute("""
+            CREATE TABLE IF NOT EXISTS change_log (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                table_name TEXT NOT NULL,
+                row_id INTEGER NOT NULL,
+                employee_id INTEGER,
+                operation TEXT NOT NULL,  -- 'insert', 'update', 'delete'
+                changed_at TEXT NOT NULL DEFAULT (datetime('now'))
+            )
+        """)
+        for table, employee_column in CHANGE_TRACKED_TABLES.items():
+            for operation, row in (("insert", "NEW"), ("update", "NEW"), ("delete", "OLD")):
+                self.cursor.execute(f"""
+                    CREATE TRIGGER IF NOT EXISTS trg_{table}_{operation}_log AFTER {operation.upper()} ON {table}
+                    BEGIN
+                        INSERT INTO change_log (table_name, row_id, employee_id, operation)
+                        VALUES ('{table}', {row}.id, {row}.{employee_column}, '{operation}');
+                    END
+                """)
+        self.cursor.execute("DELETE FROM change_log WHERE changed_at < datetime('now', ?)", (f"-{CHANGE_LOG_RETENTION_DAYS} days",))
+
+    def _create_audit_schedule(self):
+        # audit_schedule holds each employee's last audit and next due date per audit type. Triggers keep it
+        # current on every note insert, so the due queue is a range scan over idx_audit_schedule_next_due.
+        self.cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'audit_schedule'")
+        is_new = self.cursor.fetchone() is None
+        self.cursor.execute("""
+            CREATE TABLE IF NOT EXISTS audit_intervals (
+                audit_type TEXT PRIMARY KEY,
+                interval_days INTEGER NOT NULL
+            )
+        """)
+        self.cursor.executemany("INSERT OR IGNORE INTO audit_intervals (audit_type, interval_days) VALUES (?, ?)",
+                                [(audit_type, DEFAULT_AUDIT_INTERVAL_DAYS) for audit_type in AUDIT_NOTE_TYPES])
+        self.cursor.execute("""
+            CREATE TABLE IF NOT EXISTS audit_schedule (
+                employee_id INTEGER NOT NULL,
+                audit_type TEXT NOT NULL,
+                last_audit TEXT,  -- Timestamp of the latest audit note, NULL if never audited
+                next_due TEXT NOT NULL,
+                PRIMARY KEY (employee_id, audit_type),
+                FOREIGN KEY (employee_id) REFERENCES employees(id)
+            ) WITHOUT ROWID
+        """)
+        self.cursor.execute("CREATE INDEX IF NOT EXISTS idx_audit_schedule_next_due ON audit_schedule (next_due)")
+
+        # Employees that were never audited are due from their join date
+        self.cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS trg_employees_insert_audit AFTER INSERT ON employees
+            BEGIN
+                INSERT OR IGNORE INTO audit_schedule (employee_id, audit_type, last_audit, next_due)
+                SELECT NEW.id, audit_type, NULL, COALESCE(datetime(NEW.join_date), datetime('now', 'localtime')) FROM audit_intervals;
+            END
+        """)
+        self.cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS trg_employees_delete_audit AFTER DELETE ON employees
+            BEGIN
+                DELETE FROM audit_schedule WHERE employee_id = OLD.id;
+            END
+        """)
+        self.cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS trg_notes_insert_audit AFTER INSERT ON notes
+            WHEN NEW.note_type IN (SELECT audit_type FROM audit_intervals)
+            BEGIN
+                INSERT INTO audit_schedule (employee_id, audit_type, last_audit, next_due)
+                VALUES (NEW.employee_id, NEW.note_type, NEW.timestamp, datetime(NEW.timestamp,
+                        '+' || (SELECT interval_days FROM audit_intervals WHERE audit_type = NEW.note_type) || ' days'))
+                ON CONFLICT (employee_id, audit_type) DO UPDATE SET last_audit = excluded.last_audit, next_due = excluded.next_due
+                WHERE audit_schedule.last_audit IS NULL OR excluded.last_audit > audit_schedule.last_audit;
+                UPDATE employees SET last_audit_report = NEW.timestamp
+                WHERE id = NEW.employee_id AND (last_audit_report IS NULL OR last_audit_report < NEW.timestamp);
+            END
+        """)
+        if is_new:
+            self.rebuild_audit_schedule()
+
+    def _create_kpi_rollups(self):
+        # Per-employee calls/tickets totals for every week, month and quarter, kept current by triggers on
+        # performance, so goal attainment is a primary key lookup instead of a scan of the KPI history
+        self.cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'kpi_rollups'")
+        is_new = self.cursor.fetchone() is None
+        self.cursor.execute("""
+            CREATE TABLE IF NOT EXISTS kpi_rollups (
+                employee_id INTEGER NOT NULL,
+                period TEXT NOT NULL,
+                period_start TEXT NOT NULL,
+                calls REAL NOT NULL,
+                tickets REAL NOT NULL,
+                PRIMARY KEY (employee_id, period, period_start)
+            ) WITHOUT ROWID
+        """)
+        self.cursor.execute("CREATE INDEX IF NOT EXISTS idx_kpi_rollups_period ON kpi_rollups (period, period_start)")
+        def row_sql(row):
+            return ", ".join(f"{row}.{column} AS {column}" for column in ("employee_id", "timestamp", "calls_handled", "tickets_triaged"))
+
+        for operation, statements in (
+            ("insert", [kpi_rollup_sql(f"SELECT {row_sql('NEW')}")]),
+            ("delete", [kpi_rollup_sql(f"SELECT {row_sql('OLD')}", -1)]),
+            ("update", [kpi_rollup_sql(f"SELECT {row_sql('OLD')}", -1), kpi_rollup_sql(f"SELECT {row_sql('NEW')}")]),
+        ):
+            body = ";\n".join(statements)
+            # Sentiment scoring rewrites rows without touching the totals, so updates only fire on the rolled-up columns
+            event = "UPDATE OF employee_id, timestamp, calls_handled, tickets_triaged" if operation == "update" else operation.upper()
+            self.cursor.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS trg_performance_{operation}_rollup AFTER {event} ON performance
+                BEGIN
+                    {body};
+                END
+            """)
+        if is_new:
+            self.rebuild_kpi_rollups()
+
+    def _create_org_closure(self):
+        # employee_closure holds one row per (manager, anyone below them at any depth), plus (employee, employee) at
+        # depth 0, so "everyone under X" is a primary key range scan. Triggers keep it in step with manager_id.
+        self.cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'employee_closure'")
+        is_new = self.cursor.fetchone() is None
+        self.cursor.execute("""
+            CREATE TABLE IF NOT EXISTS employee_closure (
+                ancestor_id INTEGER NOT NULL,
+                descendant_id INTEGER NOT NULL,
+                depth INTEGER NOT NULL,  -- Reporting levels between the two, 0 for the employee themselves
+                PRIMARY KEY (ancestor_id, descendant_id)
+            ) WITHOUT ROWID
+        """)
+        self.cursor.execute("CREATE INDEX IF NOT EXISTS idx_employee_closure_descendant ON employee_closure (descendant_id, depth)")
+        self.cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS trg_employees_insert_closure AFTER INSERT ON employees
+            BEGIN
+                INSERT INTO employee_closure (ancestor_id, descendant_id, depth) VALUES (NEW.id, NEW.id, 0);
+                INSERT INTO employee_closure (ancestor_id, descendant_id, depth)
+                SELECT ancestor_id, NEW.id, depth + 1 FROM employee_closure WHERE descendant_id = NEW.manager_id;
+            END
+        """)
+        # A manager may not report to anyone in their own subtree (including themselves)
+        self.cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS trg_employees_manager_cycle BEFORE UPDATE OF manager_id ON employees
+            WHEN NEW.manager_id IS NOT NULL
+                 AND EXISTS (SELECT 1 FROM employee_closure WHERE ancestor_id = NEW.id AND descendant_id = NEW.manager_id)
+            BEGIN
+                SELECT RAISE(ABORT, 'manager_id would create a reporting cycle');
+            END
+        """)
+        # Moving an employee moves their whole subtree: drop its links to the old managers, link it to the new ones
+        self.cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS trg_employees_move_closure AFTER UPDATE OF manager_id ON employees
+            WHEN OLD.manager_id IS NOT NEW.manager_id
+            BEGIN
+                DELETE FROM employee_closure
+                WHERE descendant_id IN (SELECT descendant_id FROM employee_closure WHERE ancestor_id = NEW.id)
+                  AND ancestor_id IN (SELECT ancestor_id FROM employee_closure WHERE descendant_id = NEW.id AND depth > 0);
+                INSERT INTO employee_closure (ancestor_id, descendant_id, depth)
+                SELECT above.ancestor_id, below.descendant_id, above.depth + below.depth + 1
+                FROM employee_closure AS above CROSS JOIN employee_closure AS below
+                WHERE above.descendant_id = NEW.manager_id AND below.ancestor_id = NEW.id;
+            END
+        """)
+        # Direct reports of a removed employee move up to that employee's manager
+        self.cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS trg_employees_delete_closure AFTER DELETE ON employees
+            BEGIN
+                UPDATE employees SET manager_id = OLD.manager_id WHERE manager_id = OLD.id;
+                DELETE FROM employee_closure WHERE ancestor_id = OLD.id OR descendant_id = OLD.id;
+            END
+        """)
+        if is_new:
+            self.rebuild_org_closure()
+
+    def _create_trigram_index(self):
+        # Posting lists for fuzzy employee search: a lookup reads only the lists of the query's trigrams
+        self.cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'employee_trigrams'")
+        is_new = self.cursor.fetchone() is None
+        self.cursor.execute("""
+            CREATE TABLE IF NOT EXISTS employee_trigrams (
+                trigram TEXT NOT NULL,
+                field TEXT NOT NULL,  -- 'name' or 'email'
+                employee_id INTEGER NOT NULL,
+                PRIMARY KEY (trigram, field, employee_id)
+            ) WITHOUT ROWID
+        """)
+        self.cursor.execute("""
+            CREATE TABLE IF NOT EXISTS employee_trigram_sizes (
+                employee_id INTEGER NOT NULL,
+                field TEXT NOT NULL,
+                size INTEGER NOT NULL,  -- Distinct trigrams in the field, the denominator of the similarity
+                PRIMARY KEY (employee_id, field)
+            ) WITHOUT ROWID
+        """)
+        self.cursor.execute("CREATE INDEX IF NOT EXISTS idx_employee_trigrams_employee ON employee_trigrams (employee_id)")
+        if is_new:
+            self.rebuild_trigram_index()
+
+    def _insert_trigrams(self, employees: List[Tuple[int, str, str]]) -> None:
+        postings, sizes = [], []
+        for employee_id, name, email in employees:
+            for field, value in zip(FUZZY_FIELDS, (name, email)):
+                trigrams = make_trigrams(employee_search_text(field, value))
+                postings.extend((trigram, field, employee_id) for trigram in trigrams)
+                sizes.append((employee_id, field, len(trigrams)))
+        postings.sort()  # Key order turns the bulk insert into appends instead of random b-tree page writes
+        self.cursor.executemany("INSERT INTO employee_trigrams (trigram, field, employee_id) VALUES (?, ?, ?)", postings)
+        self.cursor.executemany("INSERT INTO employee_trigram_sizes (employee_id, field, size) VALUES (?, ?, ?)", sizes)
+
+    def _index_employee(self, employee_id: int, name: str, email: str) -> None:
+        self.cursor.execute("DELETE FROM employee_trigrams WHERE employee_id = ?", (employee_id,))
+        self.cursor.execute("DELETE FROM employee_trigram_sizes WHERE employee_id = ?", (employee_id,))
+        self._insert_trigrams([(employee_id, name, email)])
+
+    def rebuild_trigram_index(self) -> None:
+        self.cursor.execute("DELETE FROM employee_trigrams")
+        self.cursor.execute("DELETE FROM employee_trigram_sizes")
+        # Building the secondary index once at the end is cheaper than maintaining it row by row
+        self.cursor.execute("DROP INDEX IF EXISTS idx_employee_trigrams_employee")
+        self.cursor.execute("SELECT id, name, email FROM employees")
+        self._insert_trigrams(self.cursor.fetchall())
+        self.cursor.execute("CREATE INDEX idx_employee_trigrams_employee ON employee_trigrams (employee_id)")
+
+    # Transactions
+    def _commit(self):
+        # Inside transaction() the commit happens when the outermost block finishes
+        if self._transaction_depth:
+            return
+        if self.group_commit_window <= 0:
+            self.connection.commit()
+            return
+        # Group commit: writes made within the window share one commit (and one fsync)
+        now = time.monotonic()
+        if self._pending_since is None:
+            self._pending_since = now
+        if now - self._pending_since >= self.group_commit_window:
+            self.flush()
+
+    @contextmanager
+    def transaction(self):
+        """Unit of work: every write in the block is committed together or rolled back together.
+
+        Blocks may be nested; an inner block that raises only undoes its own writes (it runs
+        in a savepoint), and the exception still propagates to the caller.
+        """
+        savepoint = f"uow_{self._transaction_depth}"
+        # A savepoint outside a transaction would start its own and commit on release; opening it with BEGIN
+        # leaves the commit to _commit(), so grouped writes and units of work follow the same policy
+        began = not self._transaction_depth and not self.connection.in_transaction
+        if began:
+            self.cursor.execute("BEGIN")
+        self.cursor.execute(f"SAVEPOINT {savepoint}")
+        self._transaction_depth += 1
+        try:
+            yield self
+        except BaseException:
+            self._transaction_depth -= 1
+            self.cursor.execute(f"ROLLBACK TO {savepoint}")
+            self.cursor.execute(f"RELEASE {savepoint}")
+            if began:
+                self.connection.commit()  # Nothing of the block is left in it, this only closes the transaction
+            raise
+        self._transaction_depth -= 1
+        self.cursor.execute(f"RELEASE {savepoint}")
+        self._commit()
+
+    def set_group_commit(self, window: float) -> None:
+        """Coalesces writes made within `window` seconds into one commit; 0 turns grouping off.
+
+        Callers using a window must call flush_if_due() periodically so the last writes of a
+        burst are not left uncommitted.
+        """
+        self.group_commit_window = window
+        if window <= 0:
+            self.flush()
+
+    def flush_if_due(self) -> None:
+        if self._pending_since is not None and time.monotonic() - self._pending_since >= self.group_commit_window:
+            self.flush()
+
+    def flush(self) -> None:
+        if self._transaction_depth:
+            return
+        if self.connection.in_transaction:
+            self.connection.commit()
+        self._pending_since = None
+
+    def set_durability(self, level: str) -> None:
+        """Sets PRAGMA synchronous: OFF and NORMAL trade crash durability of the latest commits for speed."""
+        level = level.upper()
+        if level not in DURABILITY_LEVELS:
+            raise ValueError(f"Unknown durability level: {level}")
+        self.flush()  # synchronous cannot change inside a transaction
+        self.cursor.execute(f"PRAGMA synchronous = {level}")
+
+    def _query(self, record_type, sql: str, params: Tuple[Any, ...] = ()) -> sqlite3.Cursor:
+        # Rows are built straight into record objects by the row factory, without an intermediate tuple list
+        cursor = self.connection.cursor()
+        cursor.row_factory = record_type.from_row
+        return cursor.execute(sql, params)
+
+    def _get_columns(self, table: str) -> List[str]:
+        self.cursor.execute(f"PRAGMA table_info({table})")
+        return [row[1] for row in self.cursor.fetchall()]
+
+    def _migrate_notes(self):
+        # Databases created before previews/compression existed only have the plain note column
+        columns = self._get_columns("notes")
+        if "preview" not in columns:
+            self.cursor.execute("ALTER TABLE notes ADD COLUMN preview TEXT")
+        if "compressed" not in columns:
+            self.cursor.execute("ALTER TABLE notes ADD COLUMN compressed INTEGER NOT NULL DEFAULT 0")
+        if "sentiment_score" not in columns:
+            self.cursor.execute("ALTER TABLE notes ADD COLUMN sentiment_score REAL")
+
+        self.cursor.execute("SELECT id, note FROM notes WHERE preview IS NULL AND compressed = 0")
+        rows = self.cursor.fetchall()
+        for note_id, note in rows:
+            note = note or ""
+            body, compressed = encode_note_body(note)
+            self.cursor.execute("UPDATE notes SET note = ?, preview = ?, compressed = ? WHERE id = ?",
+                                (body, make_note_preview(note), compressed, note_id))
+        if rows:
+            logging.info(f"Migrated {len(rows)} notes to preview/compressed storage.")
+
+    def _create_import_keys(self):
+        # Imported rows are unique by their source id, or by their content when the source has no ids.
+        # Rows entered by hand have neither and are never deduplicated.
+        for table in ("notes", "performance"):
+            columns = self._get_columns(table)
+            if "source_id" not in columns:
+                self.cursor.execute(f"ALTER TABLE {table} ADD COLUMN source_id TEXT")
+            if "content_hash" not in columns:
+                self.cursor.execute(f"ALTER TABLE {table} ADD COLUMN content_hash BLOB")
+            self.cursor.execute(f"CREATE UNIQUE INDEX IF NOT EXISTS idx_{table}_source_id ON {table} (source_id) WHERE source_id IS NOT NULL")
+            self.cursor.execute(f"""
+                CREATE UNIQUE INDEX IF NOT EXISTS idx_{table}_content_hash ON {table} (content_hash)
+                WHERE content_hash IS NOT NULL AND source_id IS NULL
+            """)
+        # Keys of imported rows that were moved to the archives, so importing them again doesn't bring them back.
+        # `key` is the TEXT source_id, or the BLOB content_hash for rows without one; SQLite never treats the two as equal
+        self.cursor.execute("""
+            CREATE TABLE IF NOT EXISTS archived_keys (
+                table_name TEXT NOT NULL,
+                key BLOB NOT NULL,
+                PRIMARY KEY (table_name, key)
+            ) WITHOUT ROWID
+        """)
+
     # User Management
     def add_user(self, username, password, email, role):  # Password should be hashed
         try:
             self.cursor.execute("INSERT INTO users (username, password, email, role) VALUES (?, ?, ?, ?)", (username, password, email, role))
-            self.connection.commit()
+            self._commit()
             return True
         except sqlite3.IntegrityError: # username already exists
             return False
 
-    def get_user_by_username(self, username: str) -> Optional[Tuple[Any, ...]]:
-        self.cursor.execute("SELECT id, username, password, email, role FROM users WHERE username = ?", (username,))
-        return self.cursor.fetchone()
+    def get_user_by_username(self, username: str) -> Optional[User]:
+        return self._query(User, "SELECT id, username, email, role FROM users WHERE username = ?", (username,)).fetchone()
 
-    def get_user_by_id(self, user_id: int) -> Optional[Tuple[Any, ...]]:
-        self.cursor.execute("SELECT id, username, email, role FROM users WHERE id = ?", (user_id,))
-        return self.cursor.fetchone()
+    def authenticate(self, username: str, password: str) -> Optional[Dict[str, Any]]:
+        """Checks a login and returns {"id", "username", "role"} on success, otherwise None. The stored password never leaves this method."""
+        self.cursor.execute("SELECT id, username, role, password FROM users WHERE username = ?", (username,))
+        row = self.cursor.fetchone()
+        if row is None or not hmac.compare_digest(str(row[3]).encode("utf-8"), str(password).encode("utf-8")):
+            return None
+        return {"id": row[0], "username": row[1], "role": row[2]}
+
+    def get_user_by_id(self, user_id: int) -> Optional[User]:
+        return self._query(User, "SELECT id, username, email, role FROM users WHERE id = ?", (user_id,)).fetchone()
 
     # Employee Management
     def add_employee(self, name, email, role, join_date, info):
         try:
-            self.cursor.execute("INSERT INTO employees (name, email, role, join_date, info) VALUES (?, ?, ?, ?, ?)", (name, email, role, join_date, info))
-            self.connection.commit()
+            with self.transaction():
+                self.cursor.execute("INSERT INTO employees (name, email, role, join_date, info) VALUES (?, ?, ?, ?, ?)", (name, email, role, join_date, info))
+                self._index_employee(self.cursor.lastrowid, name, email)
             return True
         except sqlite3.IntegrityError:
             return False
 
-    def get_employees(self) -> List[Tuple[Any, ...]]:
-        self.cursor.execute("SELECT id, name, email, role, join_date, last_audit_report, info FROM employees")
-        return self.cursor.fetchall()
+    def get_employees(self) -> List[Employee]:
+        return self._query(Employee, "SELECT id, name, email, role, join_date, last_audit_report, info, manager_id FROM employees").fetchall()
 
     def update_employee(self, employee_id, name, email, role, join_date, info):
-        self.cursor.execute("""
-            UPDATE employees SET name=?, email=?, role=?, join_date=?, info=? WHERE id=?
-        """, (name, email, role, join_date, info, employee_id))
-        self.connection.commit()
+        with self.transaction():
+            self.cursor.execute("""
+                UPDATE employees SET name=?, email=?, role=?, join_date=?, info=? WHERE id=?
+            """, (name, email, role, join_date, info, employee_id))
+            self._index_employee(employee_id, name, email)
+
+    def save_employee_profile(self, employee_id, name, email, role, join_date, info, manager_id, goals) -> None:
+        """Saves the edit employee dialog in one unit of work: details, manager and (metric, period, target) goals.
+
+        If the manager change is rejected (see set_manager) nothing is saved.
+        """
+        with self.transaction():
+            self.update_employee(employee_id, name, email, role, join_date, info)
+            self.set_manager(employee_id, manager_id)
+            for metric, period, target in goals:
+                self.set_goal(employee_id, metric, period, target)
 
     def delete_employee(self, employee_id):
-        self.cursor.execute("DELETE FROM employees WHERE id=?", (employee_id,))
-        self.connection.commit()
+        # The employee's notes and KPIs go with them, all or nothing
+        with self.transaction():
+            self.cursor.execute("DELETE FROM notes WHERE employee_id=?", (employee_id,))
+            self.cursor.execute("DELETE FROM performance WHERE employee_id=?", (employee_id,))
+            self.cursor.execute("DELETE FROM employees WHERE id=?", (employee_id,))
+            self.cursor.execute("DELETE FROM goals WHERE employee_id=?", (employee_id,))
+            self.cursor.execute("DELETE FROM kpi_rollups WHERE employee_id=?", (employee_id,))
+            self.cursor.execute("DELETE FROM employee_trigrams WHERE employee_id=?", (employee_id,))
+            self.cursor.execute("DELETE FROM employee_trigram_sizes WHERE employee_id=?", (employee_id,))
+
+    def get_employee_by_id(self, employee_id: int) -> Optional[Employee]:
+        return self._query(Employee, "SELECT id, name, email, role, join_date, last_audit_report, info, manager_id FROM employees WHERE id = ?", (employee_id,)).fetchone()
+
+    def search_employees(self, query: str, limit: int = 20, min_similarity: float = FUZZY_MIN_SIMILARITY) -> List[Tuple[int, str, float]]:
+        """(employee_id, name, similarity) of the closest name or email matches, best first.
+
+        Similarity is the Jaccard index of the query's and the field's trigram sets, so typos
+        and swapped letters ("Jon Smtih") still score well against the intended name.
+        """
+        trigrams = make_trigrams(query)
+        if not trigrams:
+            return []
+        placeholders = ", ".join("?" for _ in trigrams)
+        self.cursor.execute(f"""
+            SELECT matches.employee_id, employees.name,
+                   MAX(matches.shared * 1.0 / (? + sizes.size - matches.shared)) AS similarity
+            FROM (
+                SELECT employee_id, field, COUNT(*) AS shared FROM employee_trigrams
+                WHERE trigram IN ({placeholders}) GROUP BY employee_id, field
+            ) AS matches
+            JOIN employee_trigram_sizes AS sizes ON sizes.employee_id = matches.employee_id AND sizes.field = matches.field
+            JOIN employees ON employees.id = matches.employee_id
+            GROUP BY matches.employee_id
+            HAVING similarity >= ?
+            ORDER BY similarity DESC, employees.name
+            LIMIT ?
+        """, (len(trigrams), *trigrams, min_similarity, limit))
+        return self.cursor.fetchall()
+
+    # Org Hierarchy
+    def rebuild_org_closure(self) -> None:
+        """Recomputes employee_closure from employees.manager_id."""
+        self.cursor.execute("DELETE FROM employee_closure")
+        self.cursor.execute("""
+            WITH RECURSIVE tree (ancestor_id, descendant_id, depth) AS (
+                SELECT id, id, 0 FROM employees
+                UNION ALL
+                SELECT tree.ancestor_id, employees.id, tree.depth + 1
+                FROM tree JOIN employees ON employees.manager_id = tree.descendant_id
+            )
+            INSERT INTO employee_closure (ancestor_id, descendant_id, depth) SELECT ancestor_id, descendant_id, depth FROM tree
+        """)
+        self._commit()
+
+    def set_manager(self, employee_id: int, manager_id: Optional[int]) -> None:
+        """Makes the employee (and everyone under them) report to manager_id; None makes them top-level.
+
+        Raises ValueError if the manager is the employee or someone in their subtree.
+        """
+        try:
+            self.cursor.execute("UPDATE employees SET manager_id = ? WHERE id = ?", (manager_id, employee_id))
+        except sqlite3.IntegrityError:
+            raise ValueError("An employee cannot report to themselves or to someone who reports to them.")
+        self._commit()
+
+    def get_subtree_ids(self, manager_id: int, include_self: bool = True) -> List[int]:
+        """Ids of everyone under manager_id at any depth."""
+        self.cursor.execute("SELECT descendant_id FROM employee_closure WHERE ancestor_id = ? AND depth >= ?",
+                            (manager_id, 0 if include_self else 1))
+        return [employee_id for (employee_id,) in self.cursor.fetchall()]
+
+    def get_managers(self) -> List[Tuple[int, str, int]]:
+        """(employee_id, name, subtree size) of everyone with at least one report, largest org first."""
+        self.cursor.execute("""
+            SELECT employees.id, employees.name, COUNT(*) - 1 AS reports
+            FROM employee_closure JOIN employees ON employees.id = employee_closure.ancestor_id
+            WHERE employee_closure.ancestor_id IN (SELECT manager_id FROM employees WHERE manager_id IS NOT NULL)
+            GROUP BY employees.id ORDER BY reports DESC, employees.name
+        """)
+        return self.cursor.fetchall()
 
-    def get_employee_by_id(self, employee_id: int) -> Optional[Tuple[Any, ...]]:
-        self.cursor.execute("SELECT id, name, email, role, join_date, last_audit_report, info FROM employees WHERE id = ?", (employee_id,))
+    def get_subtree_kpis(self, manager_id: int, start: str, end: str) -> Tuple[Any, ...]:
+        """(employees, calls, tickets, average sentiment) summed over manager_id's whole subtree for start <= timestamp < end."""
+        self.cursor.execute("""
+            SELECT COUNT(DISTINCT performance.employee_id), COALESCE(SUM(performance.calls_handled), 0),
+                   COALESCE(SUM(performance.tickets_triaged), 0), AVG(performance.sentiment_score)
+            FROM employee_closure JOIN performance ON performance.employee_id = employee_closure.descendant_id
+            WHERE employee_closure.ancestor_id = ? AND performance.timestamp >= ? AND performance.timestamp < ?
+        """, (manager_id, start, end))
         return self.cursor.fetchone()
 
+    def get_subtree_audits_due(self, manager_id: int, as_of: Optional[str] = None, limit: int = 100) -> List[Tuple[Any, ...]]:
+        """get_audits_due restricted to manager_id's subtree."""
+        as_of = as_of or datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        self.cursor.execute("""
+            SELECT audit_schedule.employee_id, employees.name, audit_schedule.audit_type, audit_schedule.last_audit, audit_schedule.next_due
+            FROM employee_closure
+            JOIN audit_schedule ON audit_schedule.employee_id = employee_closure.descendant_id
+            JOIN employees ON employees.id = audit_schedule.employee_id
+            WHERE employee_closure.ancestor_id = ? AND audit_schedule.next_due <= ?
+            ORDER BY audit_schedule.next_due LIMIT ?
+        """, (manager_id, as_of, limit))
+        return self.cursor.fetchall()
+
     # Notes Management
-    def add_note(self, employee_id, note_type, note, created_by):
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        self.cursor.execute("INSERT INTO notes (employee_id, timestamp, note_type, note, created_by) VALUES (?, ?, ?, ?, ?)", (employee_id, timestamp, note_type, note, created_by))
-        self.connection.commit()
+    def add_note(self, employee_id, note_type, note, created_by, timestamp=None, sentiment_score=None):
+        timestamp = timestamp or datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        body, compressed = encode_note_body(note)
+        self.cursor.execute("INSERT INTO notes (employee_id, timestamp, note_type, note, created_by, preview, compressed, sentiment_score) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                            (employee_id, timestamp, note_type, body, created_by, make_note_preview(note), compressed, sentiment_score))
+        self._commit()
 
-    def get_notes_for_employee(self, employee_id: int) -> List[Tuple[Any, ...]]:
-        self.cursor.execute("SELECT timestamp, note_type, note, created_by FROM notes WHERE employee_id = ? ORDER BY timestamp DESC", (employee_id,))
-        return self.cursor.fetchall()
+    def add_notes(self, notes: List[Tuple[Any, ...]]) -> None:
+        """Adds (employee_id, note_type, note, created_by, timestamp) rows in one transaction."""
+        rows = []
+        for employee_id, note_type, note, created_by, timestamp in notes:
+            body, compressed = encode_note_body(note)
+            rows.append((employee_id, timestamp or datetime.now().strftime("%Y-%m-%d %H:%M:%S"), note_type, body, created_by,
+                         make_note_preview(note), compressed))
+        with self.transaction():
+            self.cursor.executemany("INSERT INTO notes (employee_id, timestamp, note_type, note, created_by, preview, compressed) VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+
+    def upsert_notes(self, notes: List[Tuple[Any, ...]]) -> int:
+        """Imports (employee_id, note_type, note, created_by, timestamp, source_id) rows and returns how many were written.
+
+        Safe to repeat: a row whose source_id is already stored replaces that note only if its content changed,
+        and a row without a source_id is skipped if an imported note with identical content exists.
+        Rows whose key belongs to an archived note are skipped too; archived rows are never rewritten.
+        """
+        keyed, unkeyed = [], []
+        for employee_id, note_type, note, created_by, timestamp, source_id in notes:
+            # Hashed before the timestamp is defaulted, so a row without one gets the same key on every import
+            key = content_hash(employee_id, timestamp, note_type, note, created_by)
+            timestamp = timestamp or datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            body, compressed = encode_note_body(note)
+            row = (employee_id, timestamp, note_type, body, created_by, make_note_preview(note), compressed, source_id, key)
+            (keyed if source_id is not None else unkeyed).append(row)
+        columns = "employee_id, timestamp, note_type, note, created_by, preview, compressed, source_id, content_hash"
+        written = 0
+        with self.transaction():
+            if keyed:
+                self.cursor.executemany(f"""
+                    INSERT INTO notes ({columns}) {not_archived_sql("notes", 9)}
+                    ON CONFLICT (source_id) WHERE source_id IS NOT NULL DO UPDATE SET
+                        employee_id = excluded.employee_id, timestamp = excluded.timestamp, note_type = excluded.note_type,
+                        note = excluded.note, created_by = excluded.created_by, preview = excluded.preview,
+                        compressed = excluded.compressed, content_hash = excluded.content_hash,
+                        sentiment_score = NULL  -- Scored again by the sentiment engine
+                    WHERE notes.content_hash IS NOT excluded.content_hash
+                """, keyed)
+                written += self.cursor.rowcount
+            if unkeyed:
+                self.cursor.executemany(f"""
+                    INSERT INTO notes ({columns}) {not_archived_sql("notes", 9)} ON CONFLICT DO NOTHING
+                """, unkeyed)
+                written += self.cursor.rowcount
+        return written
+
+    def get_notes_for_employee(self, employee_id: int) -> List[Note]:
+        # Only previews are read here; use get_note_body to fetch the full text of a single note
+        return self._query(Note, "SELECT id, timestamp, note_type, preview, created_by FROM notes WHERE employee_id = ? ORDER BY timestamp DESC", (employee_id,)).fetchall()
+
+    def get_note_previews(self, employee_id: int, limit: int, offset: int = 0) -> List[Note]:
+        # One page of previews with the creator's username resolved, for paged list views
+        return self._query(Note, """
+            SELECT notes.id, notes.timestamp, notes.note_type, notes.preview, notes.created_by, COALESCE(users.username, 'Unknown')
+            FROM notes LEFT JOIN users ON users.id = notes.created_by
+            WHERE notes.employee_id = ? ORDER BY notes.timestamp DESC, notes.id DESC LIMIT ? OFFSET ?
+        """, (employee_id, limit, offset)).fetchall()
+
+    def get_note_body(self, note_id: int) -> Optional[str]:
+        self.cursor.execute("SELECT note, compressed FROM notes WHERE id = ?", (note_id,))
+        row = self.cursor.fetchone()
+        if row is None:
+            return None
+        return decode_note_body(row[0], row[1])
 
     # Performance Data (KPIs)
-    def add_kpi(self, employee_id, calls, tickets, sentiment, summary):
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    def add_kpi(self, employee_id, calls, tickets, sentiment, summary, timestamp=None):
+        timestamp = timestamp or datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         self.cursor.execute("INSERT INTO performance (employee_id, timestamp, calls_handled, tickets_triaged, sentiment_score, summary) VALUES (?, ?, ?, ?, ?, ?)", (employee_id, timestamp, calls, tickets, sentiment, summary))
-        self.connection.commit()
+        self._commit()
+
+    def add_kpis(self, kpis: List[Tuple[Any, ...]]) -> None:
+        """Adds (employee_id, calls, tickets, sentiment, summary, timestamp) rows in one transaction."""
+        rows = [(employee_id, timestamp or datetime.now().strftime("%Y-%m-%d %H:%M:%S"), calls, tickets, sentiment, summary)
+                for employee_id, calls, tickets, sentiment, summary, timestamp in kpis]
+        with self.transaction():
+            self.cursor.executemany("INSERT INTO performance (employee_id, timestamp, calls_handled, tickets_triaged, sentiment_score, summary) VALUES (?, ?, ?, ?, ?, ?)", rows)
+
+    def upsert_kpis(self, kpis: List[Tuple[Any, ...]]) -> int:
+        """Imports (employee_id, calls, tickets, sentiment, summary, timestamp, source_id) rows and returns how many were written.
+
+        Safe to repeat, like upsert_notes: known source_ids are only rewritten when their values changed and
+        rows without one are skipped when an identical imported row exists or either key was archived. Duplicates
+        are rejected by the unique indexes inside SQLite, so nothing is looked up row by row from Python.
+        """
+        keyed, unkeyed = [], []
+        for employee_id, calls, tickets, sentiment, summary, timestamp, source_id in kpis:
+            # Hashed before the timestamp is defaulted, as in upsert_notes
+            key = content_hash(employee_id, timestamp, calls, tickets, sentiment, summary)
+            timestamp = timestamp or datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            row = (employee_id, timestamp, calls, tickets, sentiment, summary, source_id, key)
+            (keyed if source_id is not None else unkeyed).append(row)
+        columns = "employee_id, timestamp, calls_handled, tickets_triaged, sentiment_score, summary, source_id, content_hash"
+        written = 0
+        with self.transaction():
+            if keyed:
+                self.cursor.executemany(f"""
+                    INSERT INTO performance ({columns}) {not_archived_sql("performance", 8)}
+                    ON CONFLICT (source_id) WHERE source_id IS NOT NULL DO UPDATE SET
+                        employee_id = excluded.employee_id, timestamp = excluded.timestamp, calls_handled = excluded.calls_handled,
+                        tickets_triaged = excluded.tickets_triaged, sentiment_score = excluded.sentiment_score,
+                        summary = excluded.summary, content_hash = excluded.content_hash
+                    WHERE performance.content_hash IS NOT excluded.content_hash
+                """, keyed)
+                written += self.cursor.rowcount
+            if unkeyed:
+                self.cursor.executemany(f"""
+                    INSERT INTO performance ({columns}) {not_archived_sql("performance", 8)} ON CONFLICT DO NOTHING
+                """, unkeyed)
+                written += self.cursor.rowcount
+        return written
+
+    def get_kpis_for_employee(self, employee_id: int, limit: int = -1, offset: int = 0) -> List[Kpi]:
+        # A negative limit returns the full history
+        return self._query(Kpi, "SELECT id, timestamp, calls_handled, tickets_triaged, sentiment_score, summary FROM performance WHERE employee_id = ? ORDER BY timestamp DESC, id DESC LIMIT ? OFFSET ?", (employee_id, limit, offset)).fetchall()
 
-    def get_kpis_for_employee(self, employee_id: int) -> List[Tuple[Any, ...]]:
-        self.cursor.execute("SELECT timestamp, calls_handled, tickets_triaged, sentiment_score, summary FROM performance WHERE employee_id = ? ORDER BY timestamp DESC", (employee_id,))
+    def get_max_kpi_id(self) -> int:
+        self.cursor.execute("SELECT COALESCE(MAX(id), 0) FROM performance")
+        return self.cursor.fetchone()[0]
+
+    def get_kpi_aggregates(self, start: str, end: str, max_id: int) -> List[Tuple[Any, ...]]:
+        """Per-employee (employee_id, calls, tickets, sentiment sum, sentiment count) for start <= timestamp < end."""
+        self.cursor.execute("""
+            SELECT employee_id, SUM(calls_handled), SUM(tickets_triaged), SUM(sentiment_score), COUNT(sentiment_score)
+            FROM performance WHERE timestamp >= ? AND timestamp < ? AND id <= ?
+            GROUP BY employee_id
+        """, (start, end, max_id))
+        return self.cursor.fetchall()
+
+    def get_kpis_after_id(self, after_id: int) -> List[Tuple[Any, ...]]:
+        self.cursor.execute("SELECT id, employee_id, timestamp, calls_handled, tickets_triaged, sentiment_score FROM performance WHERE id > ? ORDER BY id", (after_id,))
+        return self.cursor.fetchall()
+
+    def get_performance_columns_after(self, after_id: int, limit: int = 100000) -> List[Tuple[Any, ...]]:
+        """(id, employee_id, epoch, calls, tickets, sentiment) in id order, with the timestamp as Unix seconds."""
+        # Timestamps are stored in local time; 'utc' converts from that before taking the epoch
+        self.cursor.execute("""
+            SELECT id, employee_id, CAST(strftime('%s', timestamp, 'utc') AS INTEGER), calls_handled, tickets_triaged, sentiment_score
+            FROM performance WHERE id > ? ORDER BY id LIMIT ?
+        """, (after_id, limit))
         return self.cursor.fetchall()
 
+    def get_employee_names(self, employee_ids: List[int]) -> dict:
+        if not employee_ids:
+            return {}
+        placeholders = ", ".join("?" for _ in employee_ids)
+        self.cursor.execute(f"SELECT id, name FROM employees WHERE id IN ({placeholders})", list(employee_ids))
+        return dict(self.cursor.fetchall())
+
+    # Goals
+    def rebuild_kpi_rollups(self) -> None:
+        """Recomputes kpi_rollups from the performance table."""
+        self.cursor.execute("DELETE FROM kpi_rollups")
+        self.cursor.execute(kpi_rollup_sql("SELECT employee_id, timestamp, calls_handled, tickets_triaged FROM performance"))
+        self._commit()
+
+    def set_goal(self, employee_id: int, metric: str, period: str, target: Optional[float]) -> None:
+        """Sets an employee's goal for one metric and period; a target of None removes it."""
+        if metric not in GOAL_METRICS or period not in GOAL_PERIODS:
+            raise ValueError(f"Unknown goal: {metric} per {period}")
+        if target is None:
+            self.cursor.execute("DELETE FROM goals WHERE employee_id = ? AND metric = ? AND period = ?", (employee_id, metric, period))
+        else:
+            self.cursor.execute("""
+                INSERT INTO goals (employee_id, metric, period, target) VALUES (?, ?, ?, ?)
+                ON CONFLICT (employee_id, metric, period) DO UPDATE SET target = excluded.target
+            """, (employee_id, metric, period, float(target)))
+        self._commit()
+
+    def get_goals(self, employee_id: int, period: str = "month") -> dict:
+        """{metric: target} of the employee's goals for `period`."""
+        self.cursor.execute("SELECT metric, target FROM goals WHERE employee_id = ? AND period = ?", (employee_id, period))
+        return dict(self.cursor.fetchall())
+
+    def get_attainment(self, period: str, period_start: str, employee_ids: Optional[List[int]] = None,
+                       default_goals: Optional[dict] = None) -> List[Tuple[Any, ...]]:
+        """(employee_id, calls, call goal, tickets, ticket goal) for the period starting at period_start.
+
+        Totals come from kpi_rollups, so this is one indexed lookup per employee. Employees without
+        a stored goal get the one from ``default_goals`` ({metric: target}), or None.
+        """
+        default_goals = default_goals or {}
+        sql = """
+            SELECT employees.id, COALESCE(rollups.calls, 0), COALESCE(call_goals.target, ?),
+                   COALESCE(rollups.tickets, 0), COALESCE(ticket_goals.target, ?)
+            FROM employees
+            LEFT JOIN kpi_rollups AS rollups
+                ON rollups.employee_id = employees.id AND rollups.period = ? AND rollups.period_start = ?
+            LEFT JOIN goals AS call_goals
+                ON call_goals.employee_id = employees.id AND call_goals.metric = 'calls' AND call_goals.period = ?
+            LEFT JOIN goals AS ticket_goals
+                ON ticket_goals.employee_id = employees.id AND ticket_goals.metric = 'tickets' AND ticket_goals.period = ?
+        """
+        params = [default_goals.get("calls"), default_goals.get("tickets"), period, period_start, period, period]
+        if employee_ids is None:
+            self.cursor.execute(sql, params)
+            return self.cursor.fetchall()
+        rows = []
+        for start in range(0, len(employee_ids), 500):  # Stay below SQLite's bound parameter limit
+            chunk = list(employee_ids)[start:start + 500]
+            self.cursor.execute(sql + f" WHERE employees.id IN ({', '.join('?' for _ in chunk)})", params + chunk)
+            rows.extend(self.cursor.fetchall())
+        return rows
+
+    def get_attainment_history(self, employee_id: int, metric: str, period: str, limit: int = 12) -> List[Tuple[Any, ...]]:
+        """(period_start, total, current goal) for the employee's most recent periods, newest first."""
+        if metric not in GOAL_METRICS:
+            raise ValueError(f"Unknown goal metric: {metric}")
+        # kpi_rollups names its total columns after the metrics
+        self.cursor.execute(f"""
+            SELECT rollups.period_start, rollups.{metric}, goals.target FROM kpi_rollups AS rollups
+            LEFT JOIN goals ON goals.employee_id = rollups.employee_id AND goals.metric = ? AND goals.period = rollups.period
+            WHERE rollups.employee_id = ? AND rollups.period = ? ORDER BY rollups.period_start DESC LIMIT ?
+        """, (metric, employee_id, period, limit))
+        return self.cursor.fetchall()
+
+    # Audit Scheduling
+    def rebuild_audit_schedule(self) -> None:
+        """Recomputes audit_schedule and employees.last_audit_report from the notes table."""
+        self.cursor.execute("DELETE FROM audit_schedule")
+        self.cursor.execute("""
+            INSERT INTO audit_schedule (employee_id, audit_type, last_audit, next_due)
+            SELECT employees.id, audit_intervals.audit_type, latest.last_audit,
+                   COALESCE(datetime(latest.last_audit, '+' || audit_intervals.interval_days || ' days'),
+                            datetime(employees.join_date), datetime('now', 'localtime'))
+            FROM employees CROSS JOIN audit_intervals
+            LEFT JOIN (
+                SELECT employee_id, note_type, MAX(timestamp) AS last_audit FROM notes GROUP BY employee_id, note_type
+            ) AS latest ON latest.employee_id = employees.id AND latest.note_type = audit_intervals.audit_type
+        """)
+        self.cursor.execute("""
+            UPDATE employees SET last_audit_report = (
+                SELECT MAX(last_audit) FROM audit_schedule WHERE audit_schedule.employee_id = employees.id
+            )
+        """)
+        self._commit()
+
+    def get_audit_intervals(self) -> dict:
+        self.cursor.execute("SELECT audit_type, interval_days FROM audit_intervals")
+        return dict(self.cursor.fetchall())
+
+    def set_audit_interval(self, audit_type: str, interval_days: int) -> None:
+        self.cursor.execute("INSERT OR REPLACE INTO audit_intervals (audit_type, interval_days) VALUES (?, ?)", (audit_type, interval_days))
+        self.cursor.execute("""
+            UPDATE audit_schedule SET next_due = datetime(last_audit, '+' || ? || ' days')
+            WHERE audit_type = ? AND last_audit IS NOT NULL
+        """, (interval_days, audit_type))
+        self._commit()
+
+    def get_audits_due(self, as_of: Optional[str] = None, limit: int = 100) -> List[Tuple[Any, ...]]:
+        """(employee_id, name, audit_type, last_audit, next_due) for audits due by as_of, most overdue first."""
+        as_of = as_of or datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        self.cursor.execute("""
+            SELECT audit_schedule.employee_id, employees.name, audit_schedule.audit_type, audit_schedule.last_audit, audit_schedule.next_due
+            FROM audit_schedule JOIN employees ON employees.id = audit_schedule.employee_id
+            WHERE audit_schedule.next_due <= ? ORDER BY audit_schedule.next_due LIMIT ?
+        """, (as_of, limit))
+        return self.cursor.fetchall()
+
+    # Reporting
+    def get_notes_between(self, start: str, end: str, note_types=None) -> List[Tuple[Any, ...]]:
+        """(employee_id, timestamp, note_type, body) for every note in [start, end), bodies decompressed."""
+        sql = "SELECT employee_id, timestamp, note_type, note, compressed FROM notes WHERE timestamp >= ? AND timestamp < ?"
+        params: List[Any] = [start, end]
+        if note_types:
+            sql += f" AND note_type IN ({', '.join('?' for _ in note_types)})"
+            params.extend(note_types)
+        self.cursor.execute(sql + " ORDER BY employee_id, timestamp", params)
+        return [(employee_id, timestamp, note_type, decode_note_body(body, compressed))
+                for employee_id, timestamp, note_type, body, compressed in self.cursor.fetchall()]
+
+    def get_kpis_between(self, start: str, end: str) -> List[Tuple[Any, ...]]:
+        """(employee_id, timestamp, calls, tickets, sentiment) for every KPI row in [start, end) that belongs to an employee."""
+        self.cursor.execute("""
+            SELECT employee_id, timestamp, calls_handled, tickets_triaged, sentiment_score FROM performance
+            WHERE timestamp >= ? AND timestamp < ? AND employee_id IS NOT NULL ORDER BY employee_id, timestamp
+        """, (start, end))
+        return self.cursor.fetchall()
+
+    # Sentiment Scoring
+    def get_unscored_kpis(self, after_id: int, limit: int, overwrite: bool = False) -> List[Tuple[Any, ...]]:
+        # Manually entered scores are kept unless overwrite is set
+        condition = "" if overwrite else "AND (sentiment_score IS NULL OR sentiment_score = '')"
+        self.cursor.execute(f"SELECT id, summary FROM performance WHERE id > ? {condition} ORDER BY id LIMIT ?", (after_id, limit))
+        return self.cursor.fetchall()
+
+    def get_unscored_notes(self, after_id: int, limit: int, overwrite: bool = False) -> List[Tuple[Any, ...]]:
+        condition = "" if overwrite else "AND sentiment_score IS NULL"
+        self.cursor.execute(f"SELECT id, note, compressed FROM notes WHERE id > ? {condition} ORDER BY id LIMIT ?", (after_id, limit))
+        return [(note_id, decode_note_body(body, compressed) or "") for note_id, body, compressed in self.cursor.fetchall()]
+
+    def set_kpi_sentiments(self, scores: List[Tuple[float, int]]) -> None:
+        """Takes (score, kpi id) pairs."""
+        self.cursor.executemany("UPDATE performance SET sentiment_score = ? WHERE id = ?", scores)
+        self._commit()
+
+    def set_note_sentiments(self, scores: List[Tuple[float, int]]) -> None:
+        self.cursor.executemany("UPDATE notes SET sentiment_score = ? WHERE id = ?", scores)
+        self._commit()
+
+    def get_cached_sentiments(self, text_hashes: List[str]) -> dict:
+        found = {}
+        for start in range(0, len(text_hashes), 500):  # Stay below SQLite's bound parameter limit
+            chunk = text_hashes[start:start + 500]
+            placeholders = ", ".join("?" for _ in chunk)
+            self.cursor.execute(f"SELECT text_hash, score FROM sentiment_cache WHERE text_hash IN ({placeholders})", chunk)
+            found.update(self.cursor.fetchall())
+        return found
+
+    def cache_sentiments(self, scores: List[Tuple[str, float]]) -> None:
+        self.cursor.executemany("INSERT OR REPLACE INTO sentiment_cache (text_hash, score) VALUES (?, ?)", scores)
+        self._commit()
+
+    # Change Log
+    def get_change_log_bounds(self) -> Tuple[int, int]:
+        """Returns (oldest, newest) sequence numbers still in the change log, or (0, 0) if it is empty."""
+        # Separate subqueries so each bound is a single primary key seek rather than a scan
+        self.cursor.execute("SELECT COALESCE((SELECT MIN(seq) FROM change_log), 0), COALESCE((SELECT MAX(seq) FROM change_log), 0)")
+        return self.cursor.fetchone()
+
+    def has_rewrites_since(self, seq: int, table: str, max_row_id: int) -> bool:
+        """Whether any row up to max_row_id of `table` was updated or deleted after change `seq`."""
+        self.cursor.execute("""
+            SELECT EXISTS (SELECT 1 FROM change_log WHERE seq > ? AND table_name = ? AND operation != 'insert' AND row_id <= ?)
+        """, (seq, table, max_row_id))
+        return bool(self.cursor.fetchone()[0])
+
+    def get_changes_since(self, seq: int, limit: int = 1000) -> List[Tuple[Any, ...]]:
+        self.cursor.execute("SELECT seq, table_name, row_id, employee_id, operation FROM change_log WHERE seq > ? ORDER BY seq LIMIT ?", (seq, limit))
+        return self.cursor.fetchall()
+
+    # Export
+    def export_data(self, file_path: str) -> None:
+        with open(file_path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["ID", "Name", "Email", "Role", "Join Date", "Last Audit Report", "Info", "Manager ID"])
+            writer.writerows(self.get_employees())
+        logging.info(f"Exported employees to {file_path}.")
+
     def close(self) -> None:
+        if self.closed:
+            return
+        self.flush()  # sqlite3 does not commit on close, so grouped writes would otherwise be lost
         self.connection.close()
+        self.closed = True
         logging.info("Database connection closed.")
\ No newline at end of file
@@ -0,0 +1,286 @@
+import os
+import csv
+import json
+import time
+import hashlib
+import logging
+import argparse
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from teamtrackerpro.models.database_manager import DatabaseManager
+from teamtrackerpro.utils.log_pipeline import log_perf
+
+DROP_DIR = "dropbox"
+INGEST_EXTENSIONS = (".csv", ".jsonl")
+INGEST_BATCH_SIZE = 5000  # Rows committed together with their checkpoint
+READ_BLOCK_SIZE = 1024 * 1024
+FINGERPRINT_BYTES = 1024  # Leading bytes hashed to recognise a file that was replaced under the same name
+DEFAULT_POLL_INTERVAL = 5.0
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Accepted field names -> canonical name
+FIELD_ALIASES = {
+    "employee_id": "employee_id", "email": "email", "employee_email": "email",
+    "timestamp": "timestamp", "date": "timestamp",
+    "calls": "calls", "calls_handled": "calls", "tickets": "tickets", "tickets_triaged": "tickets",
+    "sentiment": "sentiment", "sentiment_score": "sentiment", "summary": "summary",
+    "note_type": "note_type", "note": "note", "created_by": "created_by",
+    "source_id": "source_id", "record_id": "source_id",
+}
+
+
+class IngestStats:
+    """Outcome of one DropFolderIngester.poll()."""
+
+    __slots__ = ("rows", "rejected", "duplicates", "files", "seconds", "lag_seconds", "lag_bytes")
+
+    def __init__(self):
+        self.rows = 0
+        self.rejected = 0
+        self.duplicates = 0  # Valid rows that were already loaded and left as they were
+        self.files = 0  # Files that had new data
+        self.seconds = 0.0
+        self.lag_seconds = 0.0  # Longest time between a file's last write and its rows being committed
+        self.lag_bytes = 0  # Bytes left unread, i.e. a partly written last line
+
+    @property
+    def rows_per_second(self) -> Optional[float]:
+        return self.rows / self.seconds if self.seconds else None
+
+
+class DropFolderIngester:
+    """Loads KPI and note rows from CSV/JSONL files that other systems drop into a folder.
+
+    Every poll() looks for new or grown files and reads only the bytes past the offset recorded
+    for that file in ingest_checkpoints. Complete lines are parsed into KPI rows (records with
+    calls/tickets) or notes (records with a note) and loaded with upsert_kpis/upsert_notes in batches,
+    so rows carrying a source_id (or identical to an already imported row) are never loaded twice.
+    The checkpoint moves in the same transaction as each batch, so a crash or restart resumes
+    exactly after the last committed row. A partly written last line waits for the next poll.
+
+    Both formats hold one record per line: CSV files start with a header row, JSONL lines are JSON
+    objects. Employees are given by employee_id or email; rows naming an employee that doesn't exist are
+    rejected. A file that shrinks or whose first bytes change is read again from the start.
+    """
+
+    def __init__(self, db_manager: DatabaseManager, directory: str = DROP_DIR, batch_size: int = INGEST_BATCH_SIZE):
+        self.db_manager = db_manager
+        self.directory = directory
+        self.batch_size = batch_size
+        self._employee_ids: Dict[str, int] = {}
+        self.db_manager.cursor.execute("""
+            CREATE TABLE IF NOT EXISTS ingest_checkpoints (
+                path TEXT PRIMARY KEY,
+                fingerprint TEXT NOT NULL,  -- sha1 of the first fingerprint_length bytes
+                fingerprint_length INTEGER NOT NULL,
+                offset INTEGER NOT NULL,  -- Bytes consumed, always at a line boundary
+                header TEXT,  -- CSV header line, needed to parse lines after a restart
+                row_count INTEGER NOT NULL DEFAULT 0,
+                rejected INTEGER NOT NULL DEFAULT 0,
+                updated_at TEXT NOT NULL
+            ) WITHOUT ROWID
+        """)
+        self.db_manager._commit()
+
+    # Checkpoints
+    def _get_checkpoint(self, path: str) -> Optional[Dict[str, Any]]:
+        self.db_manager.cursor.execute("""
+            SELECT fingerprint, fingerprint_length, offset, header, row_count, rejected FROM ingest_checkpoints WHERE path = ?
+        """, (path,))
+        row = self.db_manager.cursor.fetchone()
+        if row is None:
+            return None
+        return dict(zip(("fingerprint", "fingerprint_length", "offset", "header", "row_count", "rejected"), row))
+
+    def _save_checkpoint(self, path: str, checkpoint: Dict[str, Any]) -> None:
+        self.db_manager.cursor.execute("""
+            INSERT OR REPLACE INTO ingest_checkpoints (path, fingerprint, fingerprint_length, offset, header, row_count, rejected, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """, (path, checkpoint["fingerprint"], checkpoint["fingerprint_length"], checkpoint["offset"], checkpoint["header"],
+              checkpoint["row_count"], checkpoint["rejected"], datetime.now().strftime(TIMESTAMP_FORMAT)))
+
+    @staticmethod
+    def _fingerprint(path: str, length: int) -> str:
+        with open(path, "rb") as f:
+            return hashlib.sha1(f.read(length)).hexdigest()
+
+    # Polling
+    def pending_files(self) -> List[str]:
+        if not os.path.isdir(self.directory):
+            return []
+        return sorted(os.path.join(self.directory, name) for name in os.listdir(self.directory)
+                      if name.lower().endswith(INGEST_EXTENSIONS))
+
+    def poll(self) -> IngestStats:
+        """Ingests everything appended since the last poll."""
+        stats = IngestStats()
+        started = time.perf_counter()
+        for path in self.pending_files():
+            try:
+                self._ingest_file(path, stats)
+            except OSError as e:
+                logging.warning(f"Could not read {path}: {e}")
+        stats.seconds = time.perf_counter() - started
+        if stats.files:
+            logging.info(f"Ingested {stats.rows} rows ({stats.rejected} rejected, {stats.duplicates} already loaded) "
+                         f"from {stats.files} files in {stats.seconds:.2f}s.")
+            log_perf("ingest", rows=stats.rows, rejected=stats.rejected, duplicates=stats.duplicates, files=stats.files, seconds=round(stats.seconds, 3),
+                     rows_per_second=round(stats.rows_per_second, 1) if stats.rows_per_second else None,
+                     lag_seconds=round(stats.lag_seconds, 3), lag_bytes=stats.lag_bytes)
+        return stats
+
+    def _ingest_file(self, path: str, stats: IngestStats) -> None:
+        size = os.path.getsize(path)
+        modified = os.path.getmtime(path)
+        checkpoint = self._get_checkpoint(path)
+        if checkpoint is not None and (size < checkpoint["offset"] or
+                                       self._fingerprint(path, checkpoint["fingerprint_length"]) != checkpoint["fingerprint"]):
+            logging.info(f"{path} was replaced or truncated, reading it again from the start.")
+            checkpoint = None
+        if checkpoint is not None and size == checkpoint["offset"]:
+            return
+        if checkpoint is None:
+            checkpoint = {"offset": 0, "header": None, "row_count": 0, "rejected": 0}
+        if size < FINGERPRINT_BYTES or checkpoint.get("fingerprint_length") != FINGERPRINT_BYTES:
+            checkpoint["fingerprint_length"] = min(size, FINGERPRINT_BYTES)
+            checkpoint["fingerprint"] = self._fingerprint(path, checkpoint["fingerprint_length"])
+
+        is_csv = path.lower().endswith(".csv")
+        kpis, notes, rows, rejected = [], [], 0, 0
+        for line, end_offset in self._read_lines(path, checkpoint["offset"]):
+            if is_csv and checkpoint["header"] is None:
+                checkpoint["header"] = line.decode("utf-8-sig").rstrip("\r")
+            elif line.strip():
+                try:
+                    record = self._decode(line.decode("utf-8").rstrip("\r"), checkpoint["header"] if is_csv else None)
+                    kind, row = self._parse_record(record)
+                except (ValueError, KeyError, TypeError) as e:
+                    logging.warning(f"Skipping line ending at byte {end_offset} of {path}: {e}")
+                    rejected += 1
+                else:
+                    (kpis if kind == "kpi" else notes).append(row)
+                    rows += 1
+            checkpoint["offset"] = end_offset
+            if rows + rejected >= self.batch_size:
+                self._commit_batch(path, checkpoint, kpis, notes, rows, rejected, stats)
+                kpis, notes, rows, rejected = [], [], 0, 0
+        self._commit_batch(path, checkpoint, kpis, notes, rows, rejected, stats)
+        stats.files += 1
+        stats.lag_seconds = max(stats.lag_seconds, time.time() - modified)
+        stats.lag_bytes += max(0, size - checkpoint["offset"])  # The file may have grown while it was read
+
+    def _commit_batch(self, path: str, checkpoint: Dict[str, Any], kpis: List[tuple], notes: List[tuple], rows: int, rejected: int,
+                      stats: IngestStats) -> None:
+        """Commits a batch with the checkpoint past it and adds its outcome to `stats`."""
+        written = 0
+        # Rows and the offset past them are committed together, so a batch is never loaded twice or skipped
+        with self.db_manager.transaction():
+            # Checked inside the transaction, so an employee can't be deleted between the check and the insert
+            self.db_manager.cursor.execute("SELECT id FROM employees")
+            known = {employee_id for (employee_id,) in self.db_manager.cursor.fetchall()}
+            unknown = sorted({row[0] for row in kpis + notes if row[0] not in known})
+            if unknown:
+                kpis = [row for row in kpis if row[0] in known]
+                notes = [row for row in notes if row[0] in known]
+                skipped = rows - len(kpis) - len(notes)
+                logging.warning(f"Skipping {skipped} rows of {path} for unknown employee ids: {', '.join(map(str, unknown[:20]))}"
+                                + (" ..." if len(unknown) > 20 else ""))
+                rows -= skipped
+                rejected += skipped
+            checkpoint["row_count"] += rows
+            checkpoint["rejected"] += rejected
+            if kpis:
+                written += self.db_manager.upsert_kpis(kpis)
+            if notes:
+                written += self.db_manager.upsert_notes(notes)
+            self._save_checkpoint(path, checkpoint)
+        stats.rows += written
+        stats.duplicates += rows - written
+        stats.rejected += rejected
+
+    @staticmethod
+    def _read_lines(path: str, offset: int) -> Iterator[Tuple[bytes, int]]:
+        """Yields (line, byte offset just past it) for every complete line after `offset`."""
+        with open(path, "rb") as f:
+            f.seek(offset)
+            pending = b""
+            while True:
+                block = f.read(READ_BLOCK_SIZE)
+                if not block:
+                    return
+                data = pending + block
+                end = data.rfind(b"\n") + 1
+                pending = data[end:]
+                if not end:
+                    continue
+                for line in data[:end - 1].split(b"\n"):
+                    offset += len(line) + 1
+                    yield line, offset
+
+    @staticmethod
+    def _decode(line: str, header: Optional[str]) -> Dict[str, Any]:
+        if header is None:
+            record = json.loads(line)
+            if not isinstance(record, dict):
+                raise ValueError("expected a JSON object")
+            return record
+        return dict(zip(next(csv.reader([header])), next(csv.reader([line]))))
+
+    def _employee_id(self, record: Dict[str, Any]) -> int:
+        if record.get("employee_id") not in (None, ""):
+            return int(record["employee_id"])
+        email = (record.get("email") or "").strip().lower()
+        if not email:
+            raise ValueError("no employee_id or email")
+        if email not in self._employee_ids:
+            # Reloaded on a miss so employees added while the ingester runs are found
+            self._employee_ids = {employee.email.lower(): employee.id for employee in self.db_manager.get_employees() if employee.email}
+        if email not in self._employee_ids:
+            raise ValueError(f"unknown employee {email}")
+        return self._employee_ids[email]
+
+    def _parse_record(self, raw: Dict[str, Any]) -> Tuple[str, tuple]:
+        """Returns ("kpi", upsert_kpis row) or ("note", upsert_notes row)."""
+        record = {FIELD_ALIASES[key.strip().lower()]: value for key, value in raw.items()
+                  if key and key.strip().lower() in FIELD_ALIASES}
+        employee_id = self._employee_id(record)
+        timestamp = record.get("timestamp")
+        timestamp = datetime.fromisoformat(str(timestamp).strip()).strftime(TIMESTAMP_FORMAT) if timestamp else None
+        source_id = str(record["source_id"]).strip() if record.get("source_id") not in (None, "") else None
+        if record.get("note") not in (None, ""):
+            created_by = record.get("created_by")
+            return "note", (employee_id, record.get("note_type") or "General", str(record["note"]),
+                            int(created_by) if created_by not in (None, "") else None, timestamp, source_id)
+        if record.get("calls") in (None, "") and record.get("tickets") in (None, ""):
+            raise ValueError("neither KPI values nor a note")
+        calls, tickets, sentiment = (record.get(key) for key in ("calls", "tickets", "sentiment"))
+        return "kpi", (employee_id, int(calls) if calls not in (None, "") else None, int(tickets) if tickets not in (None, "") else None,
+                       float(sentiment) if sentiment not in (None, "") else None, record.get("summary") or "", timestamp, source_id)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Load KPI and note files dropped into a folder, resuming where the last run stopped.")
+    parser.add_argument("--db", default="teamtracker.db")
+    parser.add_argument("--dir", default=DROP_DIR)
+    parser.add_argument("--interval", type=float, default=DEFAULT_POLL_INTERVAL, help="Seconds between polls")
+    parser.add_argument("--once", action="store_true", help="Ingest what is there now and exit")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    db_manager = DatabaseManager(args.db)
+    try:
+        ingester = DropFolderIngester(db_manager, args.dir)
+        while True:
+            ingester.poll()
+            if args.once:
+                break
+            time.sleep(args.interval)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        db_manager.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,10 +1,19 @@
+from typing import Optional
+
 from bs4 import BeautifulSoup
 
 class EmailGenerator:
     @staticmethod
-    def generate_followup(employee: dict, summary_text: str, calls: int, tickets: int, call_goal: str, ticket_goal: str) -> str:
+    def generate_followup(employee: dict, summary_text: str, calls: int, tickets: int, call_goal: str, ticket_goal: str,
+                          forecast: Optional[dict] = None) -> str:
         call_result = f"{calls} / {call_goal}"
         ticket_result = f"{tickets} / {ticket_goal}"
+        # forecast maps "calls"/"tickets" to a KpiForecaster Forecast for the current period
+        if forecast:
+            if "calls" in forecast:
+                call_result += f" ({forecast['calls'].describe()})"
+            if "tickets" in forecast:
+                ticket_result += f" ({forecast['tickets'].describe()})"
 
         email_template = f"""
         <html>
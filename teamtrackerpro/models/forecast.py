@@ -0,0 +1,207 @@
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+from teamtrackerpro.models.leaderboard import period_bounds, TIMESTAMP_FORMAT
+
+# Metric name -> column of the daily totals matrix
+FORECAST_METRICS = {"calls": 0, "tickets": 1}
+DEFAULT_HISTORY_DAYS = 90
+
+
+class Forecast:
+    """One employee's projected end-of-period total for one metric."""
+
+    __slots__ = ("employee_id", "metric", "current", "projected", "daily_trend", "goal", "period_end")
+
+    def __init__(self, employee_id: int, metric: str, current: float, projected: float, daily_trend: float,
+                 goal: Optional[float], period_end: str):
+        self.employee_id = employee_id
+        self.metric = metric
+        self.current = current
+        self.projected = projected
+        self.daily_trend = daily_trend
+        self.goal = goal
+        self.period_end = period_end
+
+    @property
+    def attainment(self) -> Optional[float]:
+        """Projected total as a fraction of the goal, or None when there is no goal."""
+        return self.projected / self.goal if self.goal else None
+
+    @property
+    def will_miss(self) -> bool:
+        return bool(self.goal) and self.projected < self.goal
+
+    def describe(self) -> str:
+        text = f"projected {self.projected:,.0f} by {self.period_end[:10]}"
+        if self.goal:
+            text += f" of {self.goal:,.0f} ({self.attainment:.0%}, {'at risk' if self.will_miss else 'on track'})"
+        return text
+
+
+class FittedPeriod:
+    """Vectorized fit for every employee at once, reused until the data version or the day changes."""
+
+    __slots__ = ("version", "day", "period_end", "employee_ids", "current", "projected", "slope")
+
+    def __init__(self, version, day, period_end, employee_ids, current, projected, slope):
+        self.version = version
+        self.day = day
+        self.period_end = period_end
+        self.employee_ids = employee_ids  # employee_id -> row in the arrays below
+        self.current = current  # (employees, metrics) totals so far this period
+        self.projected = projected  # (employees, metrics) projected end-of-period totals
+        self.slope = slope  # (employees, metrics) change in the daily total per day
+
+
+def fit_daily_trends(daily: np.ndarray, observed: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Least-squares line through every employee's daily totals in one pass.
+
+    ``daily`` is (employees, days, metrics); ``observed`` is an (employees, days) 0/1 weight that masks
+    out the days before an employee's first KPI entry. Returns (intercept, slope), each (employees, metrics).
+    """
+    t = np.arange(daily.shape[1], dtype=np.float64)
+    n = observed.sum(axis=1)[:, None]
+    sum_t = (observed @ t)[:, None]
+    sum_tt = (observed @ (t * t))[:, None]
+    weighted = daily * observed[:, :, None]
+    sum_y = weighted.sum(axis=1)
+    sum_ty = np.einsum("d,edm->em", t, weighted)
+    denominator = n * sum_tt - sum_t * sum_t
+    with np.errstate(divide="ignore", invalid="ignore"):
+        slope = np.where(denominator > 0, (n * sum_ty - sum_t * sum_y) / denominator, 0.0)
+        intercept = np.where(n > 0, (sum_y - slope * sum_t) / n, 0.0)
+    return intercept, slope
+
+
+class KpiForecaster:
+    """Projects each employee's calls and tickets to the end of the current period.
+
+    KPI history is binned into daily totals per employee with a single bincount, and a least-squares
+    trend is fitted for all employees together. The remaining days of the period are filled in from
+    each trend (never below zero) and added to what has been logged so far. Fits are cached against
+    the newest change_log sequence number, so repeated lookups are free until the data changes.
+    With a ColumnarSnapshot the history is read from its mapped columns instead of queried row by row.
+    """
+
+    def __init__(self, db_manager, history_days: int = DEFAULT_HISTORY_DAYS, snapshot=None):
+        self.db_manager = db_manager
+        self.history_days = history_days
+        self.snapshot = snapshot
+        self._fits: Dict[str, FittedPeriod] = {}
+
+    def _data_version(self) -> int:
+        return self.db_manager.get_change_log_bounds()[1]
+
+    def _fit(self, period: str) -> FittedPeriod:
+        version = self._data_version()
+        today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        fitted = self._fits.get(period)
+        if fitted is not None and fitted.version == version and fitted.day == today:
+            return fitted
+
+        period_start, period_end = period_bounds(period, today)
+        history_start = min(datetime.strptime(period_start, TIMESTAMP_FORMAT), today - timedelta(days=self.history_days))
+        tomorrow = today + timedelta(days=1)
+        days = (tomorrow - history_start).days
+        employee_column, day_index, values = (self._snapshot_history if self.snapshot else self._query_history)(history_start, days)
+        if len(employee_column):
+            unique_ids, rows_of = np.unique(employee_column, return_inverse=True)
+            cells = rows_of * days + day_index
+            size = len(unique_ids) * days
+            daily = np.stack([np.bincount(cells, weights=values[:, m], minlength=size) for m in range(values.shape[1])], axis=-1)
+            daily = daily.reshape(len(unique_ids), days, len(FORECAST_METRICS))
+            first_day = np.full(len(unique_ids), days, dtype=np.int64)
+            np.minimum.at(first_day, rows_of, day_index)
+        else:
+            unique_ids = np.empty(0, dtype=np.int64)
+            daily = np.zeros((0, days, len(FORECAST_METRICS)))
+            first_day = np.empty(0, dtype=np.int64)
+
+        observed = (np.arange(days)[None, :] >= first_day[:, None]).astype(np.float64)
+        intercept, slope = fit_daily_trends(daily, observed)
+
+        period_offset = (datetime.strptime(period_start, TIMESTAMP_FORMAT) - history_start).days
+        end_offset = (datetime.strptime(period_end, TIMESTAMP_FORMAT) - history_start).days
+        future = np.arange(days, end_offset, dtype=np.float64)
+        remaining = np.clip(intercept[:, None, :] + slope[:, None, :] * future[None, :, None], 0, None).sum(axis=1)
+        current = daily[:, period_offset:, :].sum(axis=1)
+
+        fitted = self._fits[period] = FittedPeriod(
+            version, today, period_end, {int(employee_id): row for row, employee_id in enumerate(unique_ids)},
+            current, current + remaining, slope
+        )
+        return fitted
+
+    def _query_history(self, history_start: datetime, days: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(employee ids, day offsets from history_start, (rows, metrics) values) for every KPI row in the window."""
+        end = history_start + timedelta(days=days)
+        rows = self.db_manager.get_kpis_between(history_start.strftime(TIMESTAMP_FORMAT), end.strftime(TIMESTAMP_FORMAT))
+        if not rows:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), np.empty((0, len(FORECAST_METRICS)))
+        employee_column, timestamps, calls, tickets, _ = zip(*rows)
+        # A U10 array keeps only the date part of each timestamp
+        day_index = (np.array(timestamps, dtype="U10").astype("datetime64[D]")
+                     - np.datetime64(history_start.date(), "D")).astype(np.int64)
+        values = np.nan_to_num(np.column_stack([np.array(calls, dtype=np.float64), np.array(tickets, dtype=np.float64)]))
+        return np.array(employee_column, dtype=np.int64), day_index, values
+
+    def _snapshot_history(self, history_start: datetime, days: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Same as _query_history, read from the columnar snapshot after bringing it up to date."""
+        self.snapshot.refresh(self.db_manager)
+        columns = self.snapshot.open()
+        # Local midnights as epochs, so days follow the local calendar (including DST changes) like the stored timestamps
+        midnights = np.array([(history_start + timedelta(days=day)).timestamp() for day in range(days + 1)])
+        epochs = columns["epoch"]
+        # employee_id 0 is a KPI row whose employee was deleted, which the query skips too
+        mask = (epochs >= midnights[0]) & (epochs < midnights[-1]) & (columns["employee_id"] > 0)
+        day_index = np.searchsorted(midnights, epochs[mask], side="right") - 1
+        values = np.column_stack([columns["calls"][mask], columns["tickets"][mask]]).astype(np.float64)
+        return columns["employee_id"][mask].astype(np.int64), day_index, values
+
+    def invalidate(self) -> None:
+        self._fits.clear()
+
+    def forecast(self, employee_id: int, default_goals: Optional[Dict[str, Any]] = None, period: str = "month",
+                 goals: Optional[Dict[str, Any]] = None) -> Dict[str, Forecast]:
+        """Returns {metric: Forecast} for one employee.
+
+        Goals are the employee's stored goals for the period, falling back to ``default_goals`` ({metric: goal})
+        for metrics without one. Pass ``goals`` to skip the lookup.
+        """
+        fitted = self._fit(period)
+        if goals is None:
+            goals = {**(default_goals or {}), **self.db_manager.get_goals(employee_id, period)}
+        row = fitted.employee_ids.get(employee_id)
+        result = {}
+        for metric, column in FORECAST_METRICS.items():
+            current = projected = slope = 0.0
+            if row is not None:
+                current, projected, slope = (float(fitted.current[row, column]), float(fitted.projected[row, column]),
+                                             float(fitted.slope[row, column]))
+            result[metric] = Forecast(employee_id, metric, current, projected, slope, parse_goal(goals.get(metric)), fitted.period_end)
+        return result
+
+    def at_risk(self, default_goals: Optional[Dict[str, Any]] = None, period: str = "month") -> Dict[int, Dict[str, Forecast]]:
+        """Every employee projected to miss at least one goal, as {employee_id: {metric: Forecast}}."""
+        default_goals = {metric: parse_goal(goal) for metric, goal in (default_goals or {}).items()}
+        period_start, _ = period_bounds(period)
+        missing = {}
+        # Employees without any KPI history project to zero, so every employee is checked; one query reads all their goals
+        for employee_id, _, call_goal, _, ticket_goal in self.db_manager.get_attainment(period, period_start, default_goals=default_goals):
+            forecasts = self.forecast(employee_id, period=period, goals={"calls": call_goal, "tickets": ticket_goal})
+            if any(forecast.will_miss for forecast in forecasts.values()):
+                missing[employee_id] = forecasts
+        return missing
+
+
+def parse_goal(goal: Any) -> Optional[float]:
+    # Default goals are typed into the settings as free text
+    if goal in (None, ""):
+        return None
+    try:
+        return float(str(goal).replace(",", ""))
+    except ValueError:
+        return None
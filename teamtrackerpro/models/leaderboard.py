@@ -0,0 +1,144 @@
+import heapq
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Metric name -> (index into a KPI aggregate, averaged?)
+LEADERBOARD_METRICS = {
+    "calls": (0, False),
+    "tickets": (1, False),
+    "sentiment": (2, True),
+}
+LEADERBOARD_PERIODS = ("day", "week", "month", "quarter", "year")
+
+
+def period_bounds(period: str, when: Optional[datetime] = None) -> Tuple[str, str]:
+    """Returns the [start, end) timestamps of the period containing `when`."""
+    when = when or datetime.now()
+    day = when.replace(hour=0, minute=0, second=0, microsecond=0)
+    if period == "day":
+        start, end = day, day + timedelta(days=1)
+    elif period == "week":
+        start = day - timedelta(days=day.weekday())
+        end = start + timedelta(days=7)
+    elif period == "month":
+        start = day.replace(day=1)
+        end = start.replace(year=start.year + 1, month=1) if start.month == 12 else start.replace(month=start.month + 1)
+    elif period == "quarter":
+        start = day.replace(day=1, month=(day.month - 1) // 3 * 3 + 1)
+        end = start.replace(year=start.year + 1, month=1) if start.month == 10 else start.replace(month=start.month + 3)
+    elif period == "year":
+        start = day.replace(day=1, month=1)
+        end = start.replace(year=start.year + 1)
+    else:
+        raise ValueError(f"Unknown period: {period}")
+    return start.strftime(TIMESTAMP_FORMAT), end.strftime(TIMESTAMP_FORMAT)
+
+
+class PeriodAggregate:
+    """Per-employee KPI totals for one period, kept current by folding in KPI rows newer than max_id."""
+
+    __slots__ = ("start", "end", "max_id", "change_seq", "totals")
+
+    def __init__(self, start: str, end: str, max_id: int, change_seq: int, totals: Dict[int, List[float]]):
+        self.start = start
+        self.end = end
+        self.max_id = max_id
+        self.change_seq = change_seq  # change_log position up to which no counted row was updated or deleted
+        self.totals = totals  # employee_id -> [calls, tickets, sentiment sum, sentiment count]
+
+    def add(self, employee_id, calls, tickets, sentiment):
+        totals = self.totals.setdefault(employee_id, [0, 0, 0.0, 0])
+        totals[0] += calls or 0
+        totals[1] += tickets or 0
+        if sentiment is not None:
+            try:
+                totals[2] += float(sentiment)
+                totals[3] += 1
+            except (TypeError, ValueError):
+                pass
+
+    def value(self, employee_id: int, metric: str) -> Optional[float]:
+        index, averaged = LEADERBOARD_METRICS[metric]
+        totals = self.totals[employee_id]
+        if averaged:
+            return totals[2] / totals[3] if totals[3] else None
+        return totals[index]
+
+
+class Leaderboard:
+    """Top-k / bottom-k rankings per KPI metric and period.
+
+    Each period is aggregated once with a grouped scan over the timestamp index and cached.
+    refresh() then folds in only KPI rows added since (by id), so a new add_kpi costs a single
+    indexed lookup; rankings are taken from the cached totals with a heap. A period whose counted
+    rows were updated or deleted since (upserts, sentiment backfill, archival, deleted employees),
+    as recorded in change_log, is dropped and aggregated again on next use.
+    """
+
+    def __init__(self, db_manager):
+        self.db_manager = db_manager
+        self._periods: Dict[str, PeriodAggregate] = {}
+
+    def _aggregate(self, period: str) -> PeriodAggregate:
+        start, end = period_bounds(period)
+        aggregate = self._periods.get(period)
+        if aggregate is None or aggregate.start != start:
+            # Read first, so a rewrite made while aggregating shows up in the next refresh
+            change_seq = self.db_manager.get_change_log_bounds()[1]
+            max_id = self.db_manager.get_max_kpi_id()
+            totals = {row[0]: [row[1] or 0, row[2] or 0, row[3] or 0.0, row[4]]
+                      for row in self.db_manager.get_kpi_aggregates(start, end, max_id)}
+            aggregate = self._periods[period] = PeriodAggregate(start, end, max_id, change_seq, totals)
+        return aggregate
+
+    def refresh(self) -> None:
+        """Applies KPI rows written since the cached aggregates were built."""
+        if not self._periods:
+            return
+        oldest, newest = self.db_manager.get_change_log_bounds()
+        for period, aggregate in list(self._periods.items()):
+            if oldest > aggregate.change_seq + 1 or self.db_manager.has_rewrites_since(aggregate.change_seq, "performance", aggregate.max_id):
+                del self._periods[period]
+            else:
+                aggregate.change_seq = newest
+        if not self._periods:
+            return
+        after_id = min(aggregate.max_id for aggregate in self._periods.values())
+        for kpi_id, employee_id, timestamp, calls, tickets, sentiment in self.db_manager.get_kpis_after_id(after_id):
+            for aggregate in self._periods.values():
+                if kpi_id > aggregate.max_id and aggregate.start <= timestamp < aggregate.end:
+                    aggregate.add(employee_id, calls, tickets, sentiment)
+                aggregate.max_id = max(aggregate.max_id, kpi_id)
+
+    def invalidate(self) -> None:
+        self._periods.clear()
+
+    def export_periods(self) -> Dict[str, list]:
+        """The cached aggregates as plain lists, for saving between sessions."""
+        return {period: [aggregate.start, aggregate.end, aggregate.max_id, aggregate.change_seq, list(aggregate.totals.items())]
+                for period, aggregate in self._periods.items()}
+
+    def restore_periods(self, periods: Dict[str, list]) -> None:
+        """Seeds the cache from export_periods(); periods that have since rolled over are rebuilt on first use."""
+        for period, (start, end, max_id, change_seq, totals) in periods.items():
+            self._periods[period] = PeriodAggregate(start, end, max_id, change_seq, {employee_id: values for employee_id, values in totals})
+
+    def rank(self, metric: str, period: str, k: int = 10, bottom: bool = False) -> List[Tuple[int, int, str, Any]]:
+        """Returns [(rank, employee_id, name, value)] for the k best (or worst) employees."""
+        if metric not in LEADERBOARD_METRICS:
+            raise ValueError(f"Unknown metric: {metric}")
+        aggregate = self._aggregate(period)
+        values = ((aggregate.value(employee_id, metric), employee_id) for employee_id in aggregate.totals)
+        values = [item for item in values if item[0] is not None]
+        ranked = heapq.nsmallest(k, values) if bottom else heapq.nlargest(k, values)
+        names = self.db_manager.get_employee_names([employee_id for _, employee_id in ranked])
+        return [(position + 1, employee_id, names[employee_id], value)
+                for position, (value, employee_id) in enumerate(ranked) if employee_id in names]
+
+    def top(self, metric: str, period: str, k: int = 10):
+        return self.rank(metric, period, k)
+
+    def bottom(self, metric: str, period: str, k: int = 5):
+        return self.rank(metric, period, k, bottom=True)
@@ -0,0 +1,160 @@
+import sqlite3
+import logging
+import threading
+from typing import Any, Dict, List, Set
+
+from teamtrackerpro.models.database_manager import DatabaseManager, CHANGE_TRACKED_TABLES
+
+# Read-only calls that may be served from the replica
+ANALYTICS_METHODS = {
+    "get_employees", "get_employee_by_id", "get_employee_names",
+    "get_max_kpi_id", "get_kpi_aggregates", "get_kpis_after_id", "get_kpis_between", "get_notes_between", "get_performance_columns_after",
+    "get_audit_intervals", "get_audits_due", "get_change_log_bounds", "get_changes_since", "has_rewrites_since", "search_employees",
+    "get_goals", "get_attainment", "get_attainment_history",
+    "get_subtree_ids", "get_managers", "get_subtree_kpis", "get_subtree_audits_due",
+}
+# Tables filled by triggers on the source rather than by tracked writes; re-copied per affected employee
+DERIVED_EMPLOYEE_TABLES = ("audit_schedule", "employee_trigrams", "employee_trigram_sizes", "kpi_rollups")
+# Tables that are small and not change-tracked, re-copied whole on every sync that applies changes
+COPIED_TABLES = ("audit_intervals",)
+# Derived tables re-copied whole when the given tracked table changed; a move rewrites rows of a whole subtree
+COPIED_ON_CHANGE_TABLES = {"employee_closure": "employees"}
+SYNC_BATCH_SIZE = 5000
+SQLITE_MAX_PARAMS = 500
+
+
+class ReadReplica:
+    """In-memory copy of the database that serves analytical reads.
+
+    The copy is taken with the sqlite3 backup API when the replica is opened and is then kept
+    current from change_log: only rows written since the last applied sequence number are re-read
+    from disk. A background thread syncs every ``refresh_interval`` seconds and callers can force
+    a sync with sync(). Reads never touch the on-disk file, so they cannot block or be blocked by
+    the UI's writes.
+
+    Only the methods in ANALYTICS_METHODS are exposed; everything else must go to the DatabaseManager.
+    """
+
+    def __init__(self, db_path: str, refresh_interval: float = 2.0):
+        self.db_path = db_path
+        self.refresh_interval = refresh_interval
+        self.lock = threading.RLock()
+        self.source = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True, check_same_thread=False)
+        self.replica = DatabaseManager(":memory:", check_same_thread=False)
+        self.synced_seq = 0
+        self.closed = False
+        self._load_snapshot()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._sync_loop, name="read-replica-sync", daemon=True)
+        self._thread.start()
+
+    def _load_snapshot(self):
+        with self.lock:
+            self.source.backup(self.replica.connection)
+            cursor = self.replica.connection.cursor()
+            # Triggers already ran on the source; the replica receives their results through the sync
+            cursor.execute("SELECT name FROM sqlite_master WHERE type = 'trigger'")
+            for (trigger,) in cursor.fetchall():
+                cursor.execute(f"DROP TRIGGER {trigger}")
+            cursor.execute("SELECT COALESCE(MAX(seq), 0) FROM change_log")
+            self.synced_seq = cursor.fetchone()[0]
+            self.replica.connection.commit()
+        logging.info(f"Loaded in-memory replica of {self.db_path} at change {self.synced_seq}.")
+
+    def _sync_loop(self):
+        while not self._stop.wait(self.refresh_interval):
+            try:
+                self.sync()
+            except Exception:
+                logging.exception("Read replica sync failed.")
+
+    def sync(self) -> int:
+        """Applies every change logged since the last sync and returns how many were applied."""
+        applied = 0
+        with self.lock:
+            if self.closed:
+                return 0
+            while True:
+                source_cursor = self.source.cursor()
+                source_cursor.execute("SELECT COALESCE(MIN(seq), 0) FROM change_log")
+                oldest = source_cursor.fetchone()[0]
+                source_cursor.execute("SELECT * FROM change_log WHERE seq > ? ORDER BY seq LIMIT ?", (self.synced_seq, SYNC_BATCH_SIZE))
+                changes = source_cursor.fetchall()
+                if not changes:
+                    return applied
+                if oldest > self.synced_seq + 1:
+                    # Entries we never applied were pruned; start again from a fresh copy
+                    self._load_snapshot()
+                    return applied + len(changes)
+                try:
+                    self._apply(changes)
+                except sqlite3.OperationalError:
+                    # The source schema changed under us (e.g. a migration added a column)
+                    logging.info("Source schema changed, reloading the read replica.")
+                    self.replica.connection.rollback()
+                    self._load_snapshot()
+                    return applied + len(changes)
+                applied += len(changes)
+
+    def _apply(self, changes: List[tuple]):
+        latest: Dict[str, Dict[int, str]] = {}
+        employee_ids: Set[int] = set()
+        for seq, table, row_id, employee_id, operation, changed_at in changes:
+            latest.setdefault(table, {})[row_id] = operation
+            if employee_id is not None:
+                employee_ids.add(employee_id)
+
+        cursor = self.replica.connection.cursor()
+        for table, rows in latest.items():
+            if table not in CHANGE_TRACKED_TABLES:
+                continue
+            cursor.executemany(f"DELETE FROM {table} WHERE id = ?", [(row_id,) for row_id in rows])
+            self._copy_rows(table, "id", [row_id for row_id, operation in rows.items() if operation != "delete"])
+        for table in DERIVED_EMPLOYEE_TABLES:
+            cursor.executemany(f"DELETE FROM {table} WHERE employee_id = ?", [(employee_id,) for employee_id in employee_ids])
+            self._copy_rows(table, "employee_id", list(employee_ids))
+        for table in COPIED_TABLES:
+            cursor.execute(f"DELETE FROM {table}")
+            self._copy_rows(table)
+        for table, source_table in COPIED_ON_CHANGE_TABLES.items():
+            if source_table in latest:
+                cursor.execute(f"DELETE FROM {table}")
+                self._copy_rows(table)
+        cursor.executemany("INSERT OR IGNORE INTO change_log VALUES (?, ?, ?, ?, ?, ?)", changes)
+        self.replica.connection.commit()
+        self.synced_seq = changes[-1][0]
+
+    def _copy_rows(self, table: str, key_column: str = None, keys: List[Any] = None):
+        source_cursor = self.source.cursor()
+        if key_column is None:
+            batches = [source_cursor.execute(f"SELECT * FROM {table}").fetchall()]
+        else:
+            batches = []
+            for start in range(0, len(keys), SQLITE_MAX_PARAMS):
+                chunk = keys[start:start + SQLITE_MAX_PARAMS]
+                placeholders = ", ".join("?" for _ in chunk)
+                batches.append(source_cursor.execute(f"SELECT * FROM {table} WHERE {key_column} IN ({placeholders})", chunk).fetchall())
+        for rows in batches:
+            if rows:
+                placeholders = ", ".join("?" for _ in rows[0])
+                self.replica.connection.executemany(f"INSERT OR REPLACE INTO {table} VALUES ({placeholders})", rows)
+
+    def __getattr__(self, name):
+        if name not in ANALYTICS_METHODS:
+            raise AttributeError(name)
+        method = getattr(self.replica, name)
+
+        def call(*args, **kwargs):
+            with self.lock:
+                return method(*args, **kwargs)
+        return call
+
+    def close(self):
+        if self.closed:
+            return
+        self._stop.set()
+        self._thread.join()
+        with self.lock:
+            self.closed = True
+            self.replica.close()
+            self.source.close()
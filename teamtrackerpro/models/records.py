@@ -0,0 +1,90 @@
+from typing import Any, Optional
+
+
+class Record:
+    """Base for the compact row types returned by DatabaseManager.
+
+    Subclasses only declare __slots__ and __init__; instances have no per-object __dict__,
+    and from_row can be installed directly as a sqlite3 row factory.
+    """
+
+    __slots__ = ()
+
+    @classmethod
+    def from_row(cls, cursor, row):
+        return cls(*row)
+
+    def __iter__(self):
+        # Field order matches __slots__, so a record can be serialised as a plain list
+        for name in self.__slots__:
+            yield getattr(self, name)
+
+    def __eq__(self, other):
+        return type(self) is type(other) and tuple(self) == tuple(other)
+
+    def __repr__(self):
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"{type(self).__name__}({fields})"
+
+
+class User(Record):
+    # Deliberately has no password field, so a stored password can never be serialised with a user
+    __slots__ = ("id", "username", "email", "role")
+
+    def __init__(self, id: int, username: str, email: Optional[str], role: str):
+        self.id = id
+        self.username = username
+        self.email = email
+        self.role = role
+
+
+class Employee(Record):
+    __slots__ = ("id", "name", "email", "role", "join_date", "last_audit_report", "info", "manager_id")
+
+    def __init__(self, id: int, name: str, email: Optional[str], role: str, join_date: Optional[str],
+                 last_audit_report: Optional[str], info: Optional[str], manager_id: Optional[int] = None):
+        self.id = id
+        self.name = name
+        self.email = email
+        self.role = role
+        self.join_date = join_date
+        self.last_audit_report = last_audit_report
+        self.info = info
+        self.manager_id = manager_id
+
+
+class Note(Record):
+    __slots__ = ("id", "timestamp", "note_type", "preview", "created_by", "created_by_name")
+
+    def __init__(self, id: int, timestamp: str, note_type: str, preview: str, created_by: Optional[int],
+                 created_by_name: Optional[str] = None):
+        self.id = id
+        self.timestamp = timestamp
+        self.note_type = note_type
+        self.preview = preview  # The full body is fetched on demand with DatabaseManager.get_note_body
+        self.created_by = created_by
+        self.created_by_name = created_by_name
+
+
+class Kpi(Record):
+    __slots__ = ("id", "timestamp", "calls_handled", "tickets_triaged", "sentiment_score", "summary")
+
+    def __init__(self, id: int, timestamp: str, calls_handled: Any, tickets_triaged: Any, sentiment_score: Any, summary: Optional[str]):
+        self.id = id
+        self.timestamp = timestamp
+        self.calls_handled = calls_handled
+        self.tickets_triaged = tickets_triaged
+        self.sentiment_score = sentiment_score
+        self.summary = summary
+
+
+# DatabaseManager methods that return records, used to rebuild them on the far side of the API.
+# Maps method name -> (record type, returns a list)
+RECORD_METHODS = {
+    "get_user_by_id": (User, False),
+    "get_employees": (Employee, True),
+    "get_employee_by_id": (Employee, False),
+    "get_notes_for_employee": (Note, True),
+    "get_note_previews": (Note, True),
+    "get_kpis_for_employee": (Kpi, True),
+}
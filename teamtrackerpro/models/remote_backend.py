@@ -0,0 +1,80 @@
+import csv
+import json
+import logging
+import http.client
+from typing import Any
+from urllib.parse import urlparse
+
+from teamtrackerpro.models.api_server import READ_METHODS, WRITE_METHODS
+from teamtrackerpro.models.records import RECORD_METHODS
+
+REQUEST_TIMEOUT = 30
+
+
+class RemoteError(Exception):
+    pass
+
+
+class RemoteDatabaseManager:
+    """Drop-in replacement for DatabaseManager that forwards calls to an ApiServer.
+
+    One HTTP/1.1 connection is kept open and reused for every call; it is re-established
+    once if the server has dropped it in the meantime.
+    """
+
+    def __init__(self, base_url: str, token: str = ""):
+        parsed = urlparse(base_url)
+        self.base_url = base_url
+        self.host = parsed.hostname or "127.0.0.1"
+        self.port = parsed.port or 80
+        self.token = token  # Sent as a bearer token; must match the server's --token
+        self._connection = None
+
+    def _connect(self) -> http.client.HTTPConnection:
+        if self._connection is None:
+            self._connection = http.client.HTTPConnection(self.host, self.port, timeout=REQUEST_TIMEOUT)
+        return self._connection
+
+    def call(self, method: str, *params: Any) -> Any:
+        body = json.dumps({"method": method, "params": params})
+        headers = {"Content-Type": "application/json", "Connection": "keep-alive"}
+        if self.token:
+            headers["Authorization"] = f"Bearer {self.token}"
+        for attempt in range(2):
+            connection = self._connect()
+            try:
+                connection.request("POST", "/rpc", body, headers)
+                response = connection.getresponse()
+                payload = json.loads(response.read())
+                break
+            except (http.client.HTTPException, ConnectionError):
+                # The kept-alive socket was closed by the server; retry once on a fresh one
+                connection.close()
+                self._connection = None
+                if attempt or method in WRITE_METHODS:
+                    raise
+        if "error" in payload:
+            raise RemoteError(payload["error"])
+        result = payload["result"]
+        if method in RECORD_METHODS and result is not None:
+            record_type, many = RECORD_METHODS[method]
+            return [record_type(*row) for row in result] if many else record_type(*result)
+        return result
+
+    def __getattr__(self, name: str):
+        if name in READ_METHODS or name in WRITE_METHODS:
+            return lambda *params: self.call(name, *params)
+        raise AttributeError(name)
+
+    def export_data(self, file_path: str) -> None:
+        with open(file_path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["ID", "Name", "Email", "Role", "Join Date", "Last Audit Report", "Info", "Manager ID"])
+            writer.writerows(self.get_employees())
+        logging.info(f"Exported employees from {self.base_url} to {file_path}.")
+
+    def close(self) -> None:
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+        logging.info("Remote database connection closed.")
@@ -0,0 +1,230 @@
+import os
+import html
+import time
+import logging
+import argparse
+from functools import lru_cache
+from string import Template
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Callable, Dict, List, Optional
+
+from teamtrackerpro.models.database_manager import DatabaseManager, AUDIT_NOTE_TYPES
+from teamtrackerpro.models.archive_manager import ArchiveManager
+
+REPORT_DIR = "reports"
+CHART_WIDTH = 640
+CHART_HEIGHT = 220
+
+EMPLOYEE_REPORT_TEMPLATE = """<html>
+<head>
+<meta charset="utf-8">
+<title>$name - Review $start to $end</title>
+<style>
+body { font-family: 'Segoe UI', sans-serif; font-size: 13px; color: #333; margin: 32px; }
+h1 { color: #5865F2; }
+table { border-collapse: collapse; width: 100%; margin-bottom: 24px; }
+th, td { border: 1px solid #CCCCCC; padding: 6px; text-align: left; vertical-align: top; }
+th { background-color: #F4F4F4; }
+</style>
+</head>
+<body>
+<h1>$name</h1>
+<p>$email &middot; $role &middot; Joined $join_date<br>Review period: $start to $end</p>
+<h2>KPI Summary</h2>
+<table>
+<tr><th>Entries</th><th>Calls</th><th>Tickets</th><th>Average Sentiment</th></tr>
+<tr><td>$kpi_count</td><td>$calls</td><td>$tickets</td><td>$sentiment</td></tr>
+</table>
+<h2>KPI Trend</h2>
+$chart
+<h2>Audit Notes</h2>
+$audit_notes
+</body>
+</html>
+"""
+
+TEAM_SUMMARY_TEMPLATE = """<html>
+<head>
+<meta charset="utf-8">
+<title>Team Summary $start to $end</title>
+<style>
+body { font-family: 'Segoe UI', sans-serif; font-size: 13px; color: #333; margin: 32px; }
+h1 { color: #5865F2; }
+table { border-collapse: collapse; width: 100%; }
+th, td { border: 1px solid #CCCCCC; padding: 6px; text-align: left; }
+th { background-color: #F4F4F4; }
+</style>
+</head>
+<body>
+<h1>Team Summary</h1>
+<p>Review period: $start to $end &middot; $employee_count employees &middot; $audit_count audit notes</p>
+<table>
+<tr><th>Name</th><th>Calls</th><th>Tickets</th><th>Average Sentiment</th><th>Audits</th><th>Report</th></tr>
+$rows
+</table>
+</body>
+</html>
+"""
+
+TEMPLATES = {"employee": EMPLOYEE_REPORT_TEMPLATE, "team": TEAM_SUMMARY_TEMPLATE}
+
+
+@lru_cache(maxsize=None)
+def get_template(name: str) -> Template:
+    # Compiled once per process; pool workers keep theirs for every report they render
+    return Template(TEMPLATES[name])
+
+
+def render_chart(kpis: List[List[Any]]) -> str:
+    """Inline SVG line chart of calls and tickets per KPI entry, so reports need no scripts or network."""
+    if len(kpis) < 2:
+        return "<p>Not enough KPI entries for a trend.</p>"
+    series = {"Calls": ([row[1] or 0 for row in kpis], "#5865F2"), "Tickets": ([row[2] or 0 for row in kpis], "#28a745")}
+    peak = max(max(values) for values, _ in series.values()) or 1
+    step = (CHART_WIDTH - 40) / (len(kpis) - 1)
+    parts = [f'<svg width="{CHART_WIDTH}" height="{CHART_HEIGHT}" xmlns="http://www.w3.org/2000/svg">',
+             f'<line x1="30" y1="{CHART_HEIGHT - 20}" x2="{CHART_WIDTH - 10}" y2="{CHART_HEIGHT - 20}" stroke="#CCCCCC"/>',
+             f'<text x="2" y="14" font-size="10">{peak}</text>']
+    for legend_row, (label, (values, color)) in enumerate(series.items()):
+        points = " ".join(f"{30 + i * step:.1f},{CHART_HEIGHT - 20 - value / peak * (CHART_HEIGHT - 40):.1f}" for i, value in enumerate(values))
+        parts.append(f'<polyline fill="none" stroke="{color}" stroke-width="2" points="{points}"/>')
+        parts.append(f'<text x="{CHART_WIDTH - 80}" y="{14 + legend_row * 14}" font-size="11" fill="{color}">{label}</text>')
+    parts.append("</svg>")
+    return "".join(parts)
+
+
+def summarize_kpis(kpis: List[List[Any]]) -> Dict[str, Any]:
+    sentiments = [float(row[3]) for row in kpis if row[3] not in (None, "")]
+    return {
+        "kpi_count": len(kpis),
+        "calls": sum(row[1] or 0 for row in kpis),
+        "tickets": sum(row[2] or 0 for row in kpis),
+        "sentiment": f"{sum(sentiments) / len(sentiments):.2f}" if sentiments else "n/a",
+    }
+
+
+def render_employee_report(job: Dict[str, Any]) -> str:
+    """Renders and writes one employee's report; runs in a pool worker and returns the file path."""
+    employee = job["employee"]
+    notes = job["notes"]
+    if notes:
+        note_rows = "".join(
+            f"<tr><td>{html.escape(timestamp)}</td><td>{html.escape(note_type)}</td><td>{html.escape(body).replace(chr(10), '<br>')}</td></tr>"
+            for timestamp, note_type, body in notes
+        )
+        audit_notes = f"<table><tr><th>Date</th><th>Type</th><th>Note</th></tr>{note_rows}</table>"
+    else:
+        audit_notes = "<p>No audits in this period.</p>"
+    page = get_template("employee").substitute(
+        name=html.escape(employee["name"]), email=html.escape(employee["email"] or ""), role=html.escape(employee["role"] or ""),
+        join_date=html.escape(employee["join_date"] or "unknown"), start=job["start"][:10], end=job["end"][:10],
+        chart=render_chart(job["kpis"]), audit_notes=audit_notes, **summarize_kpis(job["kpis"])
+    )
+    with open(job["path"], "w", encoding="utf-8") as f:
+        f.write(page)
+    return job["path"]
+
+
+class ReportGenerator:
+    """Builds per-employee review reports and a team summary as HTML files.
+
+    All data comes from one bulk pull (employees, audit notes and KPIs for the period), and the
+    per-employee pages are rendered in parallel across a process pool. PDFs are produced from the
+    HTML by teamtrackerpro.ui.pdf_exporter, which needs QtWebEngine.
+    """
+
+    def __init__(self, db_path: str, output_dir: str = REPORT_DIR, max_workers: Optional[int] = None):
+        self.db_path = db_path
+        self.output_dir = output_dir
+        self.max_workers = max_workers
+
+    def _collect_jobs(self, start: str, end: str) -> List[Dict[str, Any]]:
+        # Opened here rather than shared so the generator can run on any thread
+        db_manager = DatabaseManager(self.db_path)
+        try:
+            employees = db_manager.get_employees()
+            # Reads archived years too when the period reaches back that far
+            history = ArchiveManager(db_manager)
+            notes = history.get_notes_between(start, end, sorted(AUDIT_NOTE_TYPES))
+            kpis = history.get_kpis_between(start, end)
+        finally:
+            db_manager.close()
+
+        jobs = {}
+        for employee in employees:
+            jobs[employee.id] = {
+                "employee": {"name": employee.name, "email": employee.email, "role": employee.role, "join_date": employee.join_date},
+                "notes": [], "kpis": [], "start": start, "end": end,
+                "path": os.path.join(self.output_dir, f"employee_{employee.id}.html"),
+            }
+        for employee_id, timestamp, note_type, body in notes:
+            if employee_id in jobs:
+                jobs[employee_id]["notes"].append((timestamp, note_type, body))
+        for employee_id, timestamp, calls, tickets, sentiment in kpis:
+            if employee_id in jobs:
+                jobs[employee_id]["kpis"].append([timestamp, calls, tickets, sentiment])
+        return list(jobs.values())
+
+    def generate(self, start: str, end: str, progress: Optional[Callable[[int, int], None]] = None) -> List[str]:
+        """Writes every employee's report plus team_summary.html and returns the employee report paths."""
+        started = time.perf_counter()
+        if not os.path.exists(self.output_dir):
+            os.makedirs(self.output_dir)
+        jobs = self._collect_jobs(start, end)
+
+        paths = []
+        with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = [executor.submit(render_employee_report, job) for job in jobs]
+            for done, future in enumerate(as_completed(futures), 1):
+                paths.append(future.result())
+                if progress:
+                    progress(done, len(jobs))
+
+        self._write_team_summary(jobs, start, end)
+        logging.info(f"Generated {len(paths)} employee reports in {self.output_dir} in {time.perf_counter() - started:.2f}s.")
+        return sorted(paths)
+
+    def _write_team_summary(self, jobs: List[Dict[str, Any]], start: str, end: str) -> str:
+        rows = []
+        for job in sorted(jobs, key=lambda job: job["employee"]["name"]):
+            summary = summarize_kpis(job["kpis"])
+            rows.append(
+                f"<tr><td>{html.escape(job['employee']['name'])}</td><td>{summary['calls']}</td><td>{summary['tickets']}</td>"
+                f"<td>{summary['sentiment']}</td><td>{len(job['notes'])}</td>"
+                f"<td><a href=\"{os.path.basename(job['path'])}\">View</a></td></tr>"
+            )
+        path = os.path.join(self.output_dir, "team_summary.html")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(get_template("team").substitute(
+                start=start[:10], end=end[:10], employee_count=len(jobs),
+                audit_count=sum(len(job["notes"]) for job in jobs), rows="\n".join(rows)
+            ))
+        return path
+
+
+def main() -> None:
+    from teamtrackerpro.models.leaderboard import period_bounds, LEADERBOARD_PERIODS
+
+    parser = argparse.ArgumentParser(description="Generate TeamTrackerPro review reports without the GUI.")
+    parser.add_argument("--db", default="teamtracker.db")
+    parser.add_argument("--out", default=REPORT_DIR)
+    parser.add_argument("--period", default="quarter", choices=LEADERBOARD_PERIODS, help="Current period to report on")
+    parser.add_argument("--start", help="Start timestamp (YYYY-MM-DD), overrides --period")
+    parser.add_argument("--end", help="End timestamp (YYYY-MM-DD), exclusive")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--pdf", action="store_true", help="Also print every report to PDF (needs PyQtWebEngine)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    start, end = period_bounds(args.period)
+    start, end = args.start or start, args.end or end
+    paths = ReportGenerator(args.db, args.out, args.workers).generate(
+        start, end, lambda done, total: print(f"\r{done}/{total} reports", end="", flush=True))
+    print()
+    if args.pdf:
+        from teamtrackerpro.ui.pdf_exporter import export_pdfs_headless
+        export_pdfs_headless(paths + [os.path.join(args.out, "team_summary.html")])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,197 @@
+import os
+import re
+import math
+import time
+import hashlib
+import logging
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, Optional
+
+from teamtrackerpro.utils.log_pipeline import log_perf
+
+# Word valences from -3 (very negative) to 3 (very positive), tuned for call-centre review language
+LEXICON = {
+    "excellent": 3, "outstanding": 3, "exceptional": 3, "amazing": 3, "fantastic": 3, "superb": 3, "perfect": 3,
+    "great": 2, "good": 2, "strong": 2, "helpful": 2, "polite": 2, "friendly": 2, "professional": 2, "efficient": 2,
+    "thorough": 2, "accurate": 2, "resolved": 2, "improved": 2, "improving": 2, "improvement": 2, "happy": 2,
+    "satisfied": 2, "patient": 2, "clear": 1, "courteous": 2, "proactive": 2, "reliable": 2, "consistent": 1,
+    "exceeded": 3, "exceeds": 3, "exceeding": 3, "praised": 2, "praise": 2, "thanked": 2, "grateful": 2,
+    "positive": 2, "empathetic": 2, "empathy": 2, "knowledgeable": 2, "quick": 1, "fast": 1, "solid": 1,
+    "met": 1, "meets": 1, "fine": 1, "ok": 1, "okay": 1, "adequate": 1, "calm": 1, "organized": 1, "engaged": 1,
+    "bad": -2, "poor": -2, "rude": -3, "unprofessional": -3, "angry": -2, "frustrated": -2, "frustrating": -2,
+    "upset": -2, "complaint": -2, "complaints": -2, "complained": -2, "escalated": -2, "escalation": -2,
+    "slow": -1, "late": -1, "missed": -2, "miss": -1, "missing": -1, "incorrect": -2, "inaccurate": -2, "wrong": -2,
+    "error": -2, "errors": -2, "mistake": -2, "mistakes": -2, "careless": -2, "confusing": -1, "confused": -1,
+    "unresolved": -2, "failed": -2, "fail": -2, "failing": -2, "failure": -2, "issue": -1, "issues": -1,
+    "problem": -1, "problems": -1, "concern": -1, "concerns": -1, "struggling": -2, "struggled": -2,
+    "dissatisfied": -2, "unhappy": -2, "terrible": -3, "awful": -3, "horrible": -3, "worst": -3, "abandoned": -2,
+    "ignored": -2, "dismissive": -2, "impatient": -2, "hostile": -3, "inconsistent": -1, "below": -1,
+    "declined": -1, "decline": -1, "warning": -2, "lacking": -2, "lacks": -2, "weak": -2, "overdue": -1,
+}
+NEGATIONS = {"not", "no", "never", "none", "nobody", "nothing", "neither", "nor", "without", "hardly", "barely",
+             "isn't", "wasn't", "aren't", "weren't", "don't", "doesn't", "didn't", "can't", "couldn't", "won't", "wouldn't"}
+INTENSIFIERS = {"very": 1.3, "really": 1.3, "extremely": 1.5, "incredibly": 1.5, "highly": 1.3, "so": 1.2,
+                "slightly": 0.6, "somewhat": 0.7, "a_bit": 0.7, "quite": 1.1}
+NEGATION_SCOPE = 3  # A negation flips the valence of the next few words
+NORMALIZATION_ALPHA = 15  # Same squashing as VADER: score / sqrt(score^2 + alpha) lands in (-1, 1)
+
+POOL_THRESHOLD = 50000  # One-off batches smaller than this are scored in-process; starting a pool would dominate
+WARM_POOL_THRESHOLD = 4000  # Lower bar once a pool is already running, as it is for a whole backfill
+CHUNK_SIZE = 1000
+BACKFILL_BATCH_SIZE = 20000
+
+TOKEN_PATTERN = re.compile(r"[a-z']+")
+
+
+def score_text(text: Optional[str]) -> float:
+    """Scores one text from -1.0 (negative) to 1.0 (positive) with the built-in lexicon."""
+    if not text:
+        return 0.0
+    tokens = TOKEN_PATTERN.findall(text.lower().replace("a bit", "a_bit"))
+    total = 0.0
+    negate_for = 0
+    boost = 1.0
+    for token in tokens:
+        if token in NEGATIONS:
+            negate_for = NEGATION_SCOPE
+            continue
+        if token in INTENSIFIERS:
+            boost *= INTENSIFIERS[token]
+            continue
+        valence = LEXICON.get(token)
+        if valence is not None:
+            valence *= boost
+            if negate_for:
+                valence *= -0.75  # "not good" is milder than "bad"
+            total += valence
+            boost = 1.0
+        if negate_for:
+            negate_for -= 1
+    return round(total / math.sqrt(total * total + NORMALIZATION_ALPHA), 3)
+
+
+def score_texts(texts: List[str]) -> List[float]:
+    """Scores a chunk text by text with score_text; this is the unit of work sent to pool workers."""
+    return [score_text(text) for text in texts]
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+class SentimentEngine:
+    """Offline sentiment scoring for KPI summaries and notes.
+
+    Scores are cached by text hash in memory and in the sentiment_cache table, so repeated
+    summaries are never scored twice. Scoring is a per-text loop bound by tokenising, so the only
+    speed-up is spreading chunks across a process pool: one-off batches use it past POOL_THRESHOLD,
+    and backfill keeps a single pool open for the whole run rather than starting one per batch.
+    """
+
+    def __init__(self, db_manager=None, max_workers: Optional[int] = None):
+        self.db_manager = db_manager
+        self.max_workers = max_workers
+        self._cache: Dict[str, float] = {}
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def suggest(self, text: str) -> float:
+        """Scores a single text immediately, for suggesting a value while the user types."""
+        key = text_hash(text)
+        if key not in self._cache:
+            self._cache[key] = score_text(text)
+        return self._cache[key]
+
+    def score_batch(self, texts: Iterable[str]) -> List[float]:
+        texts = [text or "" for text in texts]
+        keys = [text_hash(text) for text in texts]
+        missing = list({key for key in keys if key not in self._cache})
+        if missing and self.db_manager is not None:
+            self._cache.update(self.db_manager.get_cached_sentiments(missing))
+
+        pending = {}
+        for key, text in zip(keys, texts):
+            if key not in self._cache:
+                pending[key] = text
+        if pending:
+            pending_keys = list(pending)
+            scores = self._score_uncached([pending[key] for key in pending_keys])
+            new_scores = list(zip(pending_keys, scores))
+            self._cache.update(new_scores)
+            if self.db_manager is not None:
+                self.db_manager.cache_sentiments(new_scores)
+        return [self._cache[key] for key in keys]
+
+    def _worker_count(self) -> int:
+        return self.max_workers or os.cpu_count() or 1
+
+    def _score_uncached(self, texts: List[str]) -> List[float]:
+        threshold = WARM_POOL_THRESHOLD if self._executor is not None else POOL_THRESHOLD
+        if len(texts) < threshold or self._worker_count() < 2:
+            return score_texts(texts)
+        chunks = [texts[start:start + CHUNK_SIZE] for start in range(0, len(texts), CHUNK_SIZE)]
+        if self._executor is not None:
+            return [score for chunk_scores in self._executor.map(score_texts, chunks) for score in chunk_scores]
+        with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+            return [score for chunk_scores in executor.map(score_texts, chunks) for score in chunk_scores]
+
+    def backfill(self, overwrite: bool = False, batch_size: int = BACKFILL_BATCH_SIZE) -> Dict[str, int]:
+        """Scores existing KPI summaries and note bodies that have no sentiment score yet."""
+        if self._worker_count() > 1:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        try:
+            return self._backfill(overwrite, batch_size)
+        finally:
+            if self._executor is not None:
+                self._executor.shutdown()
+                self._executor = None
+
+    def _backfill(self, overwrite: bool, batch_size: int) -> Dict[str, int]:
+        counts = {}
+        for name, fetch, store in (
+            ("kpis", self.db_manager.get_unscored_kpis, self.db_manager.set_kpi_sentiments),
+            ("notes", self.db_manager.get_unscored_notes, self.db_manager.set_note_sentiments),
+        ):
+            counts[name] = 0
+            last_id = 0
+            started = time.perf_counter()
+            while True:
+                rows = fetch(last_id, batch_size, overwrite)
+                if not rows:
+                    break
+                scores = self.score_batch([text for _, text in rows])
+                store([(score, row_id) for score, (row_id, _) in zip(scores, rows)])
+                counts[name] += len(rows)
+                last_id = rows[-1][0]
+            elapsed = time.perf_counter() - started
+            logging.info(f"Sentiment backfill scored {counts[name]} {name}.")
+            log_perf("sentiment_backfill", table=name, rows=counts[name], seconds=round(elapsed, 3),
+                     rows_per_second=round(counts[name] / elapsed, 1) if elapsed else None)
+        return counts
+
+
+def main() -> None:
+    from teamtrackerpro.models.database_manager import DatabaseManager
+
+    parser = argparse.ArgumentParser(description="Score KPI summaries and notes with the offline sentiment engine.")
+    parser.add_argument("--db", default="teamtracker.db")
+    parser.add_argument("--backfill", action="store_true", help="Score existing rows without a sentiment score")
+    parser.add_argument("--overwrite", action="store_true", help="Rescore rows that already have a score")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("text", nargs="*", help="Texts to score and print")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    if args.text:
+        for text, score in zip(args.text, SentimentEngine().score_batch(args.text)):
+            print(f"{score:+.3f}  {text}")
+    if args.backfill:
+        db_manager = DatabaseManager(args.db)
+        try:
+            print(SentimentEngine(db_manager, args.workers).backfill(overwrite=args.overwrite))
+        finally:
+            db_manager.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,112 @@
+import os
+import re
+import csv
+import sqlite3
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+from teamtrackerpro.models.database_manager import DatabaseManager
+
+SHARD_DIR = "shards"
+ATTACH_BATCH_SIZE = 10  # SQLite's default SQLITE_MAX_ATTACHED
+MAX_FAN_OUT_WORKERS = 8
+
+
+class ShardRouter:
+    """Routes each team to its own database file and runs org-wide queries across all of them.
+
+    Shards live in <shard_dir>/<team>.db and share the DatabaseManager schema. Team leads
+    only ever open their own shard; cross-team reads either ATTACH the shards to a scratch
+    connection and UNION ALL them, or fan out one read-only connection per shard.
+    """
+
+    def __init__(self, shard_dir: str = SHARD_DIR):
+        self.shard_dir = shard_dir
+        self._managers: Dict[str, DatabaseManager] = {}
+        if not os.path.exists(shard_dir):
+            os.makedirs(shard_dir)
+
+    def shard_path(self, team: str) -> str:
+        safe_name = re.sub(r"[^A-Za-z0-9_-]+", "_", team.strip()).strip("_").lower()
+        if not safe_name:
+            raise ValueError(f"Invalid team name: {team!r}")
+        return os.path.join(self.shard_dir, safe_name + ".db")
+
+    def get_manager(self, team: str) -> DatabaseManager:
+        """Returns the DatabaseManager for a team's shard, creating the shard on first use."""
+        path = self.shard_path(team)
+        if path not in self._managers:
+            self._managers[path] = DatabaseManager(path)
+        return self._managers[path]
+
+    def teams(self) -> List[str]:
+        return sorted(os.path.splitext(name)[0] for name in os.listdir(self.shard_dir) if name.endswith(".db"))
+
+    def union_query(self, table: str, columns: Sequence[str], where: str = "", params: Tuple[Any, ...] = ()) -> List[Tuple[Any, ...]]:
+        """Runs SELECT <columns> FROM <table> [WHERE ...] against every shard and returns (team, *columns) rows.
+
+        Shards are attached in batches of ATTACH_BATCH_SIZE so any number of teams can be queried.
+        The WHERE clause and its params are applied to each shard's branch of the union.
+        """
+        teams = self.teams()
+        column_list = ", ".join(columns)
+        where_clause = f" WHERE {where}" if where else ""
+        rows: List[Tuple[Any, ...]] = []
+        connection = sqlite3.connect("file::memory:", uri=True)  # uri=True also enables URI filenames in ATTACH
+        try:
+            for start in range(0, len(teams), ATTACH_BATCH_SIZE):
+                batch = teams[start:start + ATTACH_BATCH_SIZE]
+                aliases = [f"shard_{i}" for i in range(len(batch))]
+                for alias, team in zip(aliases, batch):
+                    connection.execute(f"ATTACH DATABASE ? AS {alias}", (f"file:{self.shard_path(team)}?mode=ro",))
+                try:
+                    selects = [f"SELECT ? AS team, {column_list} FROM {alias}.{table}{where_clause}" for alias in aliases]
+                    batch_params: List[Any] = []
+                    for team in batch:
+                        batch_params.append(team)
+                        batch_params.extend(params)
+                    rows.extend(connection.execute(" UNION ALL ".join(selects), batch_params).fetchall())
+                finally:
+                    for alias in aliases:
+                        connection.execute(f"DETACH DATABASE {alias}")
+        finally:
+            connection.close()
+        return rows
+
+    def fan_out(self, query: Callable[[sqlite3.Connection, str], Any]) -> Dict[str, Any]:
+        """Calls query(connection, team) for every shard in parallel, each on its own read-only connection."""
+        def run(team):
+            connection = sqlite3.connect(f"file:{self.shard_path(team)}?mode=ro", uri=True)
+            try:
+                return team, query(connection, team)
+            finally:
+                connection.close()
+
+        teams = self.teams()
+        if not teams:
+            return {}
+        with ThreadPoolExecutor(max_workers=min(MAX_FAN_OUT_WORKERS, len(teams))) as executor:
+            return dict(executor.map(run, teams))
+
+    # Cross-team reports
+    def get_org_employees(self) -> List[Tuple[Any, ...]]:
+        return self.union_query("employees", ["id", "name", "email", "role", "join_date", "last_audit_report", "info"])
+
+    def get_team_kpi_totals(self) -> Dict[str, Tuple[Any, ...]]:
+        """Returns {team: (kpi rows, total calls, total tickets, average sentiment)}."""
+        return self.fan_out(lambda connection, team: connection.execute(
+            "SELECT COUNT(*), COALESCE(SUM(calls_handled), 0), COALESCE(SUM(tickets_triaged), 0), AVG(sentiment_score) FROM performance"
+        ).fetchone())
+
+    def export_org_data(self, file_path: str) -> None:
+        with open(file_path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["Team", "ID", "Name", "Email", "Role", "Join Date", "Last Audit Report", "Info"])
+            writer.writerows(self.get_org_employees())
+        logging.info(f"Exported org-wide employees from {len(self.teams())} shards to {file_path}.")
+
+    def close(self) -> None:
+        for manager in self._managers.values():
+            manager.close()
+        self._managers.clear()
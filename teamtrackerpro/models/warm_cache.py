@@ -0,0 +1,72 @@
+import os
+import json
+import time
+import logging
+from typing import Any, Dict, Optional
+
+from teamtrackerpro.models.records import Employee
+from teamtrackerpro.utils.log_pipeline import log_perf
+
+WARM_CACHE_SUFFIX = ".warmcache"
+WARM_CACHE_FORMAT_VERSION = 2
+
+
+class WarmStartCache:
+    """Sidecar file next to a database holding what the main window derives from it, so the next launch can skip rebuilding it.
+
+    The cache records the change_log sequence the saved state reflects, plus that change log entry
+    itself. load() only accepts it if the log still covers that sequence and the entry is unchanged
+    (a restored or replaced database fails this check); the caller then resumes its ChangeFeed from
+    that sequence, so everything written since is applied as an ordinary incremental update.
+    PRAGMA data_version can't be used for this, it only counts changes seen by one open connection.
+    """
+
+    def __init__(self, db_path: str):
+        self.path = db_path + WARM_CACHE_SUFFIX
+
+    @staticmethod
+    def _change_entry(db_manager, seq: int) -> Optional[list]:
+        rows = db_manager.get_changes_since(seq - 1, 1) if seq else []
+        return list(rows[0]) if rows and rows[0][0] == seq else None
+
+    def load(self, db_manager) -> Optional[Dict[str, Any]]:
+        """Returns the cached state if it is still valid for the database, otherwise None."""
+        started = time.perf_counter()
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(data, dict) or data.get("version") != WARM_CACHE_FORMAT_VERSION:
+            return None
+        oldest, newest = db_manager.get_change_log_bounds()
+        seq = data["change_seq"]
+        if seq > newest or (oldest and oldest > seq + 1) or self._change_entry(db_manager, seq) != data["change_entry"]:
+            logging.info(f"Warm-start cache {self.path} no longer matches the database, ignoring it.")
+            return None
+        data["employees"] = [Employee(*fields) for fields in data["employees"]]
+        elapsed = time.perf_counter() - started
+        log_perf("warm_cache_load", employees=len(data["employees"]), behind=newest - seq, seconds=round(elapsed, 3))
+        return data
+
+    def save(self, db_manager, change_seq: int, employees, attainment_period_start: str, default_goals: Dict[str, Any],
+             attainment, managers, leaderboard: Dict[str, list]) -> None:
+        data = {
+            "version": WARM_CACHE_FORMAT_VERSION,
+            "change_seq": change_seq,
+            "change_entry": self._change_entry(db_manager, change_seq),
+            "employees": [list(employee) for employee in employees],
+            "attainment_period_start": attainment_period_start,
+            "default_goals": default_goals,
+            "attainment": [list(row) for row in attainment],
+            "managers": [list(row) for row in managers],
+            "leaderboard": leaderboard,
+        }
+        # Swapped in atomically so a crash while saving leaves the previous cache (or none), never a partial one
+        partial_path = self.path + ".partial"
+        try:
+            with open(partial_path, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(partial_path, self.path)
+        except OSError as e:
+            logging.warning(f"Could not write warm-start cache {self.path}: {e}")
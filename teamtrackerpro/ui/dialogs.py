@@ -5,8 +5,8 @@ from datetime import datetime
 from PyQt5.QtWidgets import (
     QDialog, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, QTableWidget, QTableWidgetItem,
     QHeaderView, QStackedWidget, QFileDialog, QCheckBox, QTextEdit, QListWidget,
-    QComboBox, QToolBar, QAction, QMessageBox, QWidget, QTabWidget,
-    QApplication, QStyleFactory, QSizePolicy
+    QComboBox, QToolBar, QAction, QMessageBox, QWidget, QTabWidget, QTableView,
+    QApplication, QStyleFactory, QSizePolicy, QProgressBar, QGridLayout
 )
 from PyQt5.QtCore import Qt, QSize, QSettings, QTimer
 from PyQt5.QtGui import QIcon, QPixmap
@@ -15,9 +15,16 @@ import markdown
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 
-from teamtrackerpro.models.database_manager import DatabaseManager, AUDIT_NOTE_TYPES
+from teamtrackerpro.models.database_manager import DatabaseManager, AUDIT_NOTE_TYPES, GOAL_METRICS, GOAL_PERIODS
 from teamtrackerpro.models.email_generator import EmailGenerator
+from teamtrackerpro.models.sentiment import SentimentEngine
+from teamtrackerpro.models.leaderboard import period_bounds
+from teamtrackerpro.models.report_generator import ReportGenerator, REPORT_DIR
+from teamtrackerpro.models.forecast import FORECAST_METRICS
 from teamtrackerpro.ui.base import ThemedDialog, ThemedWidget
+from teamtrackerpro.ui.table_models import PagedTableModel, RecordTableModel
+from teamtrackerpro.ui.pdf_exporter import PdfExporter
+from teamtrackerpro.ui.workers import TaskWorker
 from teamtrackerpro.ui.widgets import AnimatedButton, StyledLineEdit, StyledTextEdit, StyledComboBox
 from teamtrackerpro.ui.themes import get_dark_palette, get_light_palette
 from teamtrackerpro.utils.logo import get_logo_pixmap  # Import the logo function
@@ -25,87 +32,158 @@ from teamtrackerpro.utils.logo import get_logo_pixmap  # Import the logo functio
 UPLOADS_DIR = "uploads"
 
 
+def format_goal(goal) -> str:
+    return f"{goal:,.0f}" if isinstance(goal, (int, float)) else (goal or "")
+
+
 class EmployeeDetailsDialog(ThemedDialog):
-    def __init__(self, employee, db_manager, dark_mode: bool, current_user: dict, parent=None):
+    def __init__(self, employee, db_manager, dark_mode: bool, current_user: dict, parent=None, forecaster=None, goals=None,
+                 history=None):
         super().__init__(dark_mode, parent)
         self.employee = employee
         self.db_manager = db_manager
+        self.history = history or db_manager  # An ArchiveManager pages on into archived notes and KPIs
         self.current_user = current_user
+        self.forecaster = forecaster
+        self.goals = goals or {}
+        self._tab_loaders = {}  # Tab index -> loader, removed once the tab has been loaded
         self.setWindowTitle("Employee Details")
         self.init_ui()
 
     def init_ui(self):
         layout = QVBoxLayout(self)
-        tabs = QTabWidget()
-
-        # Notes Tab
-        notes_tab = QWidget()
-        notes_layout = QVBoxLayout(notes_tab)
-        self.notes_table = QTableWidget(0, 4)
-        self.notes_table.setHorizontalHeaderLabels(["Timestamp", "Note Type", "Note Preview", "Created By"])
-        self.notes_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
-        notes_layout.addWidget(self.notes_table)
-        self.load_notes(self.employee[0])
-        tabs.addTab(notes_tab, "Notes")
-
-        # KPIs Tab
-        kpis_tab = QWidget()
-        kpis_layout = QVBoxLayout(kpis_tab)
-        self.kpis_table = QTableWidget(0, 5)
-        self.kpis_table.setHorizontalHeaderLabels(["Timestamp", "Calls", "Tickets", "Sentiment", "Summary"])
-        self.kpis_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
-        kpis_layout.addWidget(self.kpis_table)
-        self.load_kpis(self.employee[0])
-        tabs.addTab(kpis_tab, "KPIs")
+        self.tabs = QTabWidget()
+
+        # Each tab starts empty and is filled by its loader the first time it is activated
+        self.notes_table = self._create_table_view()
+        self.notes_table.doubleClicked.connect(self.show_note)  # Double click to read the full note
+        self._add_lazy_tab(self.notes_table, "Notes", self.load_notes)
+
+        self.kpis_table = self._create_table_view()
+        self._add_lazy_tab(self.kpis_table, "KPIs", self.load_kpis)
 
         # Timestamps Tab (Example - Adapt as needed)
-        timestamps_tab = QWidget()
-        timestamps_layout = QVBoxLayout(timestamps_tab)
-        self.timestamps_table = QTableWidget(0, 1)  # Example: Join Date
-        self.timestamps_table.setHorizontalHeaderLabels(["Join Date"])
-        self.timestamps_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
-        timestamps_layout.addWidget(self.timestamps_table)
-        self.load_timestamps(self.employee[0])  # Load timestamps
-        tabs.addTab(timestamps_tab, "Timestamps")
-
-        layout.addWidget(tabs)
+        self.timestamps_table = self._create_table_view()
+        self._add_lazy_tab(self.timestamps_table, "Timestamps", self.load_timestamps)
+
+        if self.forecaster:
+            self.forecast_table = QTableWidget(0, 5)
+            self.forecast_table.setHorizontalHeaderLabels(["Metric", "So Far", "Projected", "Goal", "Attainment"])
+            self.forecast_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+            self.forecast_table.setEditTriggers(QTableWidget.NoEditTriggers)
+            self._add_lazy_tab(self.forecast_table, "Forecast", self.load_forecast)
+
+        self.tabs.currentChanged.connect(self._on_tab_changed)
+        layout.addWidget(self.tabs)
         close_btn = AnimatedButton("Close", self)
         close_btn.clicked.connect(self.accept)
         layout.addWidget(close_btn)
 
+        self._on_tab_changed(self.tabs.currentIndex())
+
+    def _create_table_view(self):
+        view = QTableView()
+        view.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        view.setEditTriggers(QTableView.NoEditTriggers)
+        view.setSelectionBehavior(QTableView.SelectRows)
+        return view
+
+    def _add_lazy_tab(self, view, title, loader):
+        tab = QWidget()
+        tab_layout = QVBoxLayout(tab)
+        tab_layout.addWidget(view)
+        index = self.tabs.addTab(tab, title)
+        self._tab_loaders[index] = loader
+
+    def _on_tab_changed(self, index):
+        loader = self._tab_loaders.pop(index, None)
+        if loader:
+            loader(self.employee.id)
+
+    def apply_changes(self, changes):
+        """Refreshes the tabs that have already been loaded when another client or dialog changed this employee."""
+        employee_id = self.employee.id
+        if employee_id in changes.employees_deleted:
+            self.reject()
+            return
+        if changes.full_reload or employee_id in changes.employees_changed:
+            employee = self.db_manager.get_employee_by_id(employee_id)
+            if employee:
+                self.employee = employee
+                if hasattr(self, "timestamps_model"):
+                    self.load_timestamps(employee_id)
+        if (changes.full_reload or employee_id in changes.notes_changed) and hasattr(self, "notes_model"):
+            self.notes_model.reload()
+        if (changes.full_reload or employee_id in changes.kpis_changed) and hasattr(self, "kpis_model"):
+            self.kpis_model.reload()
+        if changes.full_reload or employee_id in changes.kpis_changed or employee_id in changes.goals_changed:
+            if self.forecaster and self.forecast_table.rowCount():
+                self.load_forecast(employee_id)
+
     def load_notes(self, employee_id):
-        self.notes_table.setRowCount(0)
-        notes = self.db_manager.get_notes_for_employee(employee_id)
-        for note in notes:
-            row = self.notes_table.rowCount()
-            self.notes_table.insertRow(row)
-            self.notes_table.setItem(row, 0, QTableWidgetItem(note[0]))  # Timestamp
-            self.notes_table.setItem(row, 1, QTableWidgetItem(note[1]))  # Note Type
-            self.notes_table.setItem(row, 2, QTableWidgetItem(note[2][:50] + "..." if len(note[2]) > 50 else note[2]))  # Note Preview
-            # Get username of the creator
-            creator_id = note[3]
-            creator = self.db_manager.get_user_by_id(creator_id)
-            creator_username = creator[1] if creator else "Unknown"
-            self.notes_table.setItem(row, 3, QTableWidgetItem(creator_username))  # Created By
+        self.notes_model = PagedTableModel(
+            [("Timestamp", "timestamp"), ("Note Type", "note_type"), ("Note Preview", "preview"), ("Created By", "created_by_name")],
+            lambda limit, offset: self.history.get_note_previews(employee_id, limit, offset),
+            parent=self
+        )
+        self.notes_table.setModel(self.notes_model)
+        self.notes_model.fetchMore()
+
+    def show_note(self, index):
+        note = self.notes_model.row_data(index.row())
+        body = self.history.get_note_body(note.id)
+        if body is None:
+            QMessageBox.warning(self, "Warning", "This note no longer exists.")
+            return
+        note_dialog = NoteViewDialog(note.note_type, body, self.dark_mode, self)
+        note_dialog.exec_()
 
     def load_kpis(self, employee_id):
-        self.kpis_table.setRowCount(0)
-        kpis = self.db_manager.get_kpis_for_employee(employee_id)
-        for kpi in kpis:
-            row = self.kpis_table.rowCount()
-            self.kpis_table.insertRow(row)
-            self.kpis_table.setItem(row, 0, QTableWidgetItem(kpi[0]))  # Timestamp
-            self.kpis_table.setItem(row, 1, QTableWidgetItem(str(kpi[1])))  # Calls
-            self.kpis_table.setItem(row, 2, QTableWidgetItem(str(kpi[2])))  # Tickets
-            self.kpis_table.setItem(row, 3, QTableWidgetItem(str(kpi[3])))  # Sentiment
-            self.kpis_table.setItem(row, 4, QTableWidgetItem(kpi[4]))  # Summary
+        self.kpis_model = PagedTableModel(
+            [("Timestamp", "timestamp"), ("Calls", "calls_handled"), ("Tickets", "tickets_triaged"),
+             ("Sentiment", "sentiment_score"), ("Summary", "summary")],
+            lambda limit, offset: self.history.get_kpis_for_employee(employee_id, limit, offset),
+            parent=self
+        )
+        self.kpis_table.setModel(self.kpis_model)
+        self.kpis_model.fetchMore()
+
+    def load_forecast(self, employee_id):
+        forecasts = self.forecaster.forecast(employee_id, self.goals)
+        self.forecast_table.setRowCount(len(forecasts))
+        for row, metric in enumerate(FORECAST_METRICS):
+            forecast = forecasts[metric]
+            attainment = f"{forecast.attainment:.0%}" if forecast.goal else ""
+            if forecast.will_miss:
+                attainment += " (at risk)"
+            cells = [metric.capitalize(), f"{forecast.current:,.0f}", f"{forecast.projected:,.0f}",
+                     f"{forecast.goal:,.0f}" if forecast.goal else "", attainment]
+            for column, text in enumerate(cells):
+                self.forecast_table.setItem(row, column, QTableWidgetItem(text))
 
     def load_timestamps(self, employee_id):
-        join_date = self.employee[4]  # Get the join date from the employee data
-        self.timestamps_table.setRowCount(0)
-        row = self.timestamps_table.rowCount()
-        self.timestamps_table.insertRow(row)
-        self.timestamps_table.setItem(row, 0, QTableWidgetItem(join_date))
+        self.timestamps_model = RecordTableModel([("Join Date", "join_date"), ("Last Audit", "last_audit_report")], parent=self)
+        self.timestamps_model.rows = [self.employee]
+        self.timestamps_table.setModel(self.timestamps_model)
+
+
+class NoteViewDialog(ThemedDialog):
+    def __init__(self, note_type, body, dark_mode: bool, parent=None):
+        super().__init__(dark_mode, parent)
+        self.setWindowTitle(note_type)
+        self.init_ui(body)
+
+    def init_ui(self, body):
+        layout = QVBoxLayout(self)
+
+        self.body_edit = StyledTextEdit(self)
+        self.body_edit.setPlainText(body)
+        self.body_edit.setReadOnly(True)
+        layout.addWidget(self.body_edit)
+
+        close_btn = AnimatedButton("Close", self)
+        close_btn.clicked.connect(self.accept)
+        layout.addWidget(close_btn)
 
 
 class AddEmployeeDialog(ThemedDialog):
@@ -155,8 +233,9 @@ class AddEmployeeDialog(ThemedDialog):
             return
 
         try:
-            # Assuming your db_manager has an add_employee method
-            self.db_manager.add_employee(first_name, last_name, email, join_date)
+            if not self.db_manager.add_employee(f"{first_name} {last_name}", email, "employee", join_date, ""):
+                QMessageBox.warning(self, "Input Error", "An employee with this email already exists.")
+                return
         except Exception as e:
             QMessageBox.critical(self, "Error", str(e))
             return
@@ -166,7 +245,7 @@ class AddEmployeeDialog(ThemedDialog):
 class EditEmployeeDialog(ThemedDialog):
     def __init__(self, employee, db_manager, dark_mode: bool, parent=None):
         super().__init__(dark_mode, parent)
-        self.employee = employee  # Assuming employee is a tuple: (id, first_name, last_name, email, join_date)
+        self.employee = employee
         self.db_manager = db_manager
         self.setWindowTitle("Edit Employee")
         self.init_ui()
@@ -174,22 +253,51 @@ class EditEmployeeDialog(ThemedDialog):
     def init_ui(self):
         layout = QVBoxLayout(self)
 
+        first_name, _, last_name = self.employee.name.partition(" ")
         self.first_name_edit = StyledLineEdit(self)
-        self.first_name_edit.setText(self.employee[1])
+        self.first_name_edit.setText(first_name)
         layout.addWidget(self.first_name_edit)
 
         self.last_name_edit = StyledLineEdit(self)
-        self.last_name_edit.setText(self.employee[2])
+        self.last_name_edit.setText(last_name)
         layout.addWidget(self.last_name_edit)
 
         self.email_edit = StyledLineEdit(self)
-        self.email_edit.setText(self.employee[3])
+        self.email_edit.setText(self.employee.email or "")
         layout.addWidget(self.email_edit)
 
         self.join_date_edit = StyledLineEdit(self)
-        self.join_date_edit.setText(self.employee[4])
+        self.join_date_edit.setText(self.employee.join_date or "")
         layout.addWidget(self.join_date_edit)
 
+        # Anyone outside the employee's own subtree can be their manager
+        layout.addWidget(QLabel("Reports to:"))
+        self.manager_combo = StyledComboBox(self)
+        self.manager_combo.addItem("No manager", None)
+        excluded = set(self.db_manager.get_subtree_ids(self.employee.id))
+        for employee in sorted(self.db_manager.get_employees(), key=lambda employee: employee.name):
+            if employee.id not in excluded:
+                self.manager_combo.addItem(employee.name, employee.id)
+        self.manager_combo.setCurrentIndex(max(self.manager_combo.findData(self.employee.manager_id), 0))
+        layout.addWidget(self.manager_combo)
+
+        # One goal field per metric and period; empty means no goal of the employee's own
+        goals_layout = QGridLayout()
+        self.goal_edits = {}
+        self.stored_goals = {}
+        for column, period in enumerate(GOAL_PERIODS, start=1):
+            goals_layout.addWidget(QLabel(f"{period.capitalize()}ly goal"), 0, column)
+            for metric, target in self.db_manager.get_goals(self.employee.id, period).items():
+                self.stored_goals[(metric, period)] = target
+        for row, metric in enumerate(GOAL_METRICS, start=1):
+            goals_layout.addWidget(QLabel(metric.capitalize()), row, 0)
+            for column, period in enumerate(GOAL_PERIODS, start=1):
+                goal_edit = StyledLineEdit(self)
+                goal_edit.setText(format_goal(self.stored_goals.get((metric, period))).replace(",", ""))
+                goals_layout.addWidget(goal_edit, row, column)
+                self.goal_edits[(metric, period)] = goal_edit
+        layout.addLayout(goals_layout)
+
         btn_layout = QHBoxLayout()
         save_btn = AnimatedButton("Save Changes", self)
         save_btn.clicked.connect(self.save_changes)
@@ -210,9 +318,21 @@ class EditEmployeeDialog(ThemedDialog):
             QMessageBox.warning(self, "Input Error", "All fields are required.")
             return
 
+        goals = {}
+        for key, goal_edit in self.goal_edits.items():
+            text = goal_edit.text().strip().replace(",", "")
+            try:
+                goals[key] = float(text) if text else None
+            except ValueError:
+                QMessageBox.warning(self, "Input Error", "Goals must be numbers.")
+                return
+
+        changed_goals = [(metric, period, target) for (metric, period), target in goals.items()
+                         if target != self.stored_goals.get((metric, period))]
         try:
-            # Assuming your db_manager has an update_employee method
-            self.db_manager.update_employee(self.employee[0], first_name, last_name, email, join_date)
+            # One unit of work (also over the API), so a rejected manager change leaves nothing half saved
+            self.db_manager.save_employee_profile(self.employee.id, f"{first_name} {last_name}", email, self.employee.role, join_date,
+                                                  self.employee.info, self.manager_combo.currentData(), changed_goals)
         except Exception as e:
             QMessageBox.critical(self, "Error", str(e))
             return
@@ -261,8 +381,8 @@ class AddNoteDialog(ThemedDialog):
 
         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         try:
-            # Assuming your db_manager has an add_note method accepting these parameters
-            self.db_manager.add_note(self.employee_id, note_type, note_text, self.current_user["id"], timestamp)
+            sentiment = SentimentEngine().suggest(note_text)
+            self.db_manager.add_note(self.employee_id, note_type, note_text, self.current_user["id"], timestamp, sentiment)
         except Exception as e:
             QMessageBox.critical(self, "Error", str(e))
             return
@@ -274,6 +394,8 @@ class AddKpiDialog(ThemedDialog):
         super().__init__(dark_mode, parent)
         self.employee_id = employee_id
         self.db_manager = db_manager
+        self.sentiment_engine = SentimentEngine()
+        self.sentiment_edited = False  # Once the lead types a score, stop overwriting it with suggestions
         self.setWindowTitle("Add KPI")
         self.init_ui()
 
@@ -290,16 +412,18 @@ class AddKpiDialog(ThemedDialog):
         self.tickets_edit.setPlaceholderText("Tickets")
         layout.addWidget(self.tickets_edit)
 
-        layout.addWidget(QLabel("Sentiment:"))
-        self.sentiment_edit = StyledLineEdit(self)
-        self.sentiment_edit.setPlaceholderText("Sentiment")
-        layout.addWidget(self.sentiment_edit)
-
         layout.addWidget(QLabel("Summary:"))
         self.summary_edit = StyledLineEdit(self)
         self.summary_edit.setPlaceholderText("Summary")
+        self.summary_edit.textChanged.connect(self.suggest_sentiment)
         layout.addWidget(self.summary_edit)
 
+        layout.addWidget(QLabel("Sentiment (-1 to 1, suggested from the summary):"))
+        self.sentiment_edit = StyledLineEdit(self)
+        self.sentiment_edit.setPlaceholderText("Sentiment")
+        self.sentiment_edit.textEdited.connect(self.on_sentiment_edited)
+        layout.addWidget(self.sentiment_edit)
+
         btn_layout = QHBoxLayout()
         add_btn = AnimatedButton("Add KPI", self)
         add_btn.clicked.connect(self.add_kpi)
@@ -310,6 +434,13 @@ class AddKpiDialog(ThemedDialog):
         btn_layout.addWidget(cancel_btn)
         layout.addLayout(btn_layout)
 
+    def on_sentiment_edited(self, text):
+        self.sentiment_edited = bool(text.strip())
+
+    def suggest_sentiment(self, summary):
+        if not self.sentiment_edited:
+            self.sentiment_edit.setText(f"{self.sentiment_engine.suggest(summary.strip()):.2f}" if summary.strip() else "")
+
     def add_kpi(self):
         try:
             calls = int(self.calls_edit.text().strip())
@@ -324,11 +455,17 @@ class AddKpiDialog(ThemedDialog):
         if not sentiment or not summary:
             QMessageBox.warning(self, "Input Error", "Sentiment and Summary cannot be empty.")
             return
+        try:
+            sentiment = float(sentiment)
+        except ValueError:
+            sentiment = None
+        if sentiment is None or not -1 <= sentiment <= 1:
+            QMessageBox.warning(self, "Input Error", "Sentiment must be a number between -1 and 1.")
+            return
 
         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         try:
-            # Assuming your db_manager has an add_kpi method accepting these parameters
-            self.db_manager.add_kpi(self.employee_id, timestamp, calls, tickets, sentiment, summary)
+            self.db_manager.add_kpi(self.employee_id, calls, tickets, sentiment, summary, timestamp)
         except Exception as e:
             QMessageBox.critical(self, "Error", str(e))
             return
@@ -336,17 +473,19 @@ class AddKpiDialog(ThemedDialog):
 
 
 class EmailDialog(ThemedDialog):
-    def __init__(self, employee, db_manager, dark_mode: bool, parent=None):
+    def __init__(self, employee, db_manager, dark_mode: bool, parent=None, forecaster=None, goals=None):
         super().__init__(dark_mode, parent)
-        self.employee = employee  # Assuming employee[3] contains the email address.
+        self.employee = employee
         self.db_manager = db_manager
+        self.forecaster = forecaster
+        self.goals = goals or {}
         self.setWindowTitle("Send Email")
         self.init_ui()
 
     def init_ui(self):
         layout = QVBoxLayout(self)
 
-        self.to_label = QLabel(f"To: {self.employee[3]}")
+        self.to_label = QLabel(f"To: {self.employee.email}")
         layout.addWidget(self.to_label)
 
         self.subject_edit = StyledLineEdit(self)
@@ -358,6 +497,10 @@ class EmailDialog(ThemedDialog):
         layout.addWidget(self.body_edit)
 
         btn_layout = QHBoxLayout()
+        followup_btn = AnimatedButton("Insert Follow-up", self)
+        followup_btn.clicked.connect(self.insert_followup)
+        btn_layout.addWidget(followup_btn)
+
         send_btn = AnimatedButton("Send Email", self)
         send_btn.clicked.connect(self.send_email)
         btn_layout.addWidget(send_btn)
@@ -367,6 +510,24 @@ class EmailDialog(ThemedDialog):
         btn_layout.addWidget(cancel_btn)
         layout.addLayout(btn_layout)
 
+    def insert_followup(self):
+        latest = self.db_manager.get_kpis_for_employee(self.employee.id, 1)
+        summary = latest[0].summary if latest else ""
+        # The employee's stored monthly goals, with the team defaults for metrics they have none for
+        goals = {**self.goals, **self.db_manager.get_goals(self.employee.id, "month")}
+        forecast = self.forecaster.forecast(self.employee.id, goals=goals) if self.forecaster else None
+        if forecast:
+            calls, tickets = int(forecast["calls"].current), int(forecast["tickets"].current)
+        else:
+            calls, tickets = (latest[0].calls_handled, latest[0].tickets_triaged) if latest else (0, 0)
+        html = EmailGenerator.generate_followup(
+            {"name": self.employee.name}, summary or "", calls, tickets,
+            format_goal(goals.get("calls")), format_goal(goals.get("tickets")), forecast
+        )
+        if not self.subject_edit.text().strip():
+            self.subject_edit.setText("One-on-one follow-up")
+        self.body_edit.setHtml(html)
+
     def send_email(self):
         subject = self.subject_edit.text().strip()
         body = self.body_edit.toPlainText().strip()
@@ -378,7 +539,7 @@ class EmailDialog(ThemedDialog):
         try:
             email_gen = EmailGenerator(self.db_manager)
             # Assuming EmailGenerator has a send_email method
-            email_gen.send_email(self.employee[3], subject, body)
+            email_gen.send_email(self.employee.email, subject, body)
         except Exception as e:
             QMessageBox.critical(self, "Error", str(e))
             return
@@ -386,9 +547,10 @@ class EmailDialog(ThemedDialog):
 
 
 class ExportDialog(ThemedDialog):
-    def __init__(self, db_manager, dark_mode: bool, parent=None):
+    def __init__(self, db_manager, dark_mode: bool, parent=None, shard_router=None):
         super().__init__(dark_mode, parent)
         self.db_manager = db_manager
+        self.shard_router = shard_router  # Only given to admins, enables org-wide exports
         self.setWindowTitle("Export Data")
         self.init_ui()
 
@@ -403,6 +565,10 @@ class ExportDialog(ThemedDialog):
         browse_btn.clicked.connect(self.browse_file)
         layout.addWidget(browse_btn)
 
+        self.all_teams_checkbox = QCheckBox("Export all teams")
+        self.all_teams_checkbox.setVisible(self.shard_router is not None)
+        layout.addWidget(self.all_teams_checkbox)
+
         btn_layout = QHBoxLayout()
         export_btn = AnimatedButton("Export", self)
         export_btn.clicked.connect(self.export_data)
@@ -427,14 +593,120 @@ class ExportDialog(ThemedDialog):
             QMessageBox.warning(self, "Input Error", "Please select a file path to export data.")
             return
         try:
-            # Assuming your db_manager has an export_data method accepting a file path
-            self.db_manager.export_data(file_path)
+            if self.shard_router and self.all_teams_checkbox.isChecked():
+                self.shard_router.export_org_data(file_path)
+            else:
+                self.db_manager.export_data(file_path)
         except Exception as e:
             QMessageBox.critical(self, "Error", str(e))
             return
         self.accept()
 
 
+class ReportDialog(ThemedDialog):
+    """Generates the team's review reports on a worker thread, then optionally prints them to PDF."""
+
+    PERIODS = [("This Quarter", "quarter"), ("This Month", "month"), ("This Year", "year")]
+
+    def __init__(self, db_path: str, dark_mode: bool, parent=None):
+        super().__init__(dark_mode, parent)
+        self.db_path = db_path
+        self.worker = None
+        self.pdf_exporter = None
+        self.setWindowTitle("Generate Reports")
+        self.init_ui()
+
+    def init_ui(self):
+        layout = QVBoxLayout(self)
+
+        layout.addWidget(QLabel("Period:"))
+        self.period_combo = StyledComboBox(self)
+        for label, period in self.PERIODS:
+            self.period_combo.addItem(label, period)
+        layout.addWidget(self.period_combo)
+
+        self.output_dir_edit = StyledLineEdit(self)
+        self.output_dir_edit.setText(os.path.abspath(REPORT_DIR))
+        layout.addWidget(self.output_dir_edit)
+
+        browse_btn = AnimatedButton("Browse", self)
+        browse_btn.clicked.connect(self.browse_dir)
+        layout.addWidget(browse_btn)
+
+        self.pdf_checkbox = QCheckBox("Also save as PDF")
+        layout.addWidget(self.pdf_checkbox)
+
+        self.status_label = QLabel("")
+        layout.addWidget(self.status_label)
+        self.progress_bar = QProgressBar(self)
+        self.progress_bar.setValue(0)
+        layout.addWidget(self.progress_bar)
+
+        btn_layout = QHBoxLayout()
+        self.generate_btn = AnimatedButton("Generate", self)
+        self.generate_btn.clicked.connect(self.generate_reports)
+        btn_layout.addWidget(self.generate_btn)
+
+        self.close_btn = AnimatedButton("Close", self)
+        self.close_btn.clicked.connect(self.reject)
+        btn_layout.addWidget(self.close_btn)
+        layout.addLayout(btn_layout)
+
+    def browse_dir(self):
+        directory = QFileDialog.getExistingDirectory(self, "Select Report Folder", self.output_dir_edit.text())
+        if directory:
+            self.output_dir_edit.setText(directory)
+
+    def set_busy(self, busy: bool):
+        self.generate_btn.setEnabled(not busy)
+        self.close_btn.setEnabled(not busy)
+
+    def generate_reports(self):
+        output_dir = self.output_dir_edit.text().strip()
+        if not output_dir:
+            QMessageBox.warning(self, "Input Error", "Please select a folder for the reports.")
+            return
+        start, end = period_bounds(self.period_combo.currentData())
+        generator = ReportGenerator(self.db_path, output_dir)
+        self.set_busy(True)
+        self.status_label.setText("Rendering HTML reports...")
+        self.worker = TaskWorker(lambda: generator.generate(start, end, self.worker.progress.emit), self)
+        self.worker.progress.connect(self.update_progress)
+        self.worker.succeeded.connect(lambda paths: self.on_reports_generated(paths, output_dir))
+        self.worker.failed.connect(self.on_failed)
+        self.worker.start()
+
+    def update_progress(self, done: int, total: int):
+        self.progress_bar.setMaximum(max(total, 1))
+        self.progress_bar.setValue(done)
+
+    def on_reports_generated(self, paths, output_dir):
+        if not self.pdf_checkbox.isChecked():
+            self.on_finished(f"{len(paths)} reports saved to {output_dir}")
+            return
+        # QtWebEngine must run on the GUI thread, so the PDFs are printed here one page at a time
+        self.status_label.setText("Printing PDFs...")
+        self.progress_bar.setValue(0)
+        self.pdf_exporter = PdfExporter(self)
+        self.pdf_exporter.progress.connect(self.update_progress)
+        self.pdf_exporter.finished.connect(lambda pdfs: self.on_finished(f"{len(paths)} reports and {len(pdfs)} PDFs saved to {output_dir}"))
+        self.pdf_exporter.export(paths + [os.path.join(output_dir, "team_summary.html")])
+
+    def on_finished(self, message: str):
+        self.set_busy(False)
+        self.status_label.setText(message)
+
+    def on_failed(self, error: str):
+        self.set_busy(False)
+        self.status_label.setText("")
+        QMessageBox.critical(self, "Report Generation Failed", error)
+
+    def reject(self):
+        if self.worker and self.worker.isRunning():
+            return  # Let the pool finish rather than orphaning its processes
+        super().reject()
+
+
 class LoginDialog(ThemedDialog):
     def __init__(self, db_manager, dark_mode: bool, parent=None):
         super().__init__(dark_mode, parent)
@@ -473,8 +745,8 @@ class LoginDialog(ThemedDialog):
             return
 
         try:
-            # Assuming your db_manager has an authenticate_user method that returns a user dict or None
-            user = self.db_manager.authenticate_user(username, password)
+            # The password is checked by the database (or the server), which returns a user dict or None
+            user = self.db_manager.authenticate(username, password)
             if not user:
                 QMessageBox.warning(self, "Login Failed", "Invalid username or password.")
                 return
@@ -501,6 +773,49 @@ class SettingsDialog(ThemedDialog):
         self.dark_mode_checkbox.setChecked(self.settings.value("dark_mode", False, type=bool))
         layout.addWidget(self.dark_mode_checkbox)
 
+        layout.addWidget(QLabel("Team (uses a separate database per team, leave empty for the shared database):"))
+        self.team_edit = StyledLineEdit(self)
+        self.team_edit.setText(self.settings.value("team", "", type=str))
+        layout.addWidget(self.team_edit)
+
+        layout.addWidget(QLabel("Server URL (e.g. http://127.0.0.1:8765, leave empty to open the database file directly):"))
+        self.server_url_edit = StyledLineEdit(self)
+        self.server_url_edit.setText(self.settings.value("server_url", "", type=str))
+        layout.addWidget(self.server_url_edit)
+
+        layout.addWidget(QLabel("Server API token (the --token the server was started with):"))
+        self.api_token_edit = StyledLineEdit(self)
+        self.api_token_edit.setEchoMode(QLineEdit.Password)
+        self.api_token_edit.setText(self.settings.value("api_token", "", type=str))
+        layout.addWidget(self.api_token_edit)
+
+        self.read_replica_checkbox = QCheckBox("Serve leaderboards, audit queue and forecasts from an in-memory replica")
+        self.read_replica_checkbox.setChecked(self.settings.value("read_replica", False, type=bool))
+        layout.addWidget(self.read_replica_checkbox)
+
+        self.columnar_snapshot_checkbox = QCheckBox("Read forecast history from a columnar snapshot next to the database (takes effect after restart)")
+        self.columnar_snapshot_checkbox.setChecked(self.settings.value("columnar_snapshot", False, type=bool))
+        layout.addWidget(self.columnar_snapshot_checkbox)
+
+        self.instrumentation_checkbox = QCheckBox("Record UI latency traces (takes effect after restart)")
+        self.instrumentation_checkbox.setChecked(self.settings.value("instrumentation", False, type=bool))
+        layout.addWidget(self.instrumentation_checkbox)
+
+        layout.addWidget(QLabel("Drop folder for KPI/note CSV and JSONL files (leave empty to disable, takes effect after restart):"))
+        self.ingest_dir_edit = StyledLineEdit(self)
+        self.ingest_dir_edit.setText(self.settings.value("ingest_dir", "", type=str))
+        layout.addWidget(self.ingest_dir_edit)
+
+        layout.addWidget(QLabel("Default monthly call goal (for employees without their own):"))
+        self.call_goal_edit = StyledLineEdit(self)
+        self.call_goal_edit.setText(self.settings.value("call_goal", "", type=str))
+        layout.addWidget(self.call_goal_edit)
+
+        layout.addWidget(QLabel("Default monthly ticket goal (for employees without their own):"))
+        self.ticket_goal_edit = StyledLineEdit(self)
+        self.ticket_goal_edit.setText(self.settings.value("ticket_goal", "", type=str))
+        layout.addWidget(self.ticket_goal_edit)
+
         # Add additional settings widgets here as needed
 
         btn_layout = QHBoxLayout()
@@ -515,6 +830,15 @@ class SettingsDialog(ThemedDialog):
 
     def save_settings(self):
         self.settings.setValue("dark_mode", self.dark_mode_checkbox.isChecked())
+        self.settings.setValue("team", self.team_edit.text().strip())
+        self.settings.setValue("server_url", self.server_url_edit.text().strip())
+        self.settings.setValue("api_token", self.api_token_edit.text().strip())
+        self.settings.setValue("read_replica", self.read_replica_checkbox.isChecked())
+        self.settings.setValue("columnar_snapshot", self.columnar_snapshot_checkbox.isChecked())
+        self.settings.setValue("instrumentation", self.instrumentation_checkbox.isChecked())
+        self.settings.setValue("ingest_dir", self.ingest_dir_edit.text().strip())
+        self.settings.setValue("call_goal", self.call_goal_edit.text().strip())
+        self.settings.setValue("ticket_goal", self.ticket_goal_edit.text().strip())
         # Save additional settings as needed
         self.accept()
 
@@ -0,0 +1,207 @@
+import os
+import json
+import time
+import logging
+import inspect
+import threading
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional
+
+from PyQt5.QtCore import QObject, QEvent, QTimer
+from PyQt5.QtWidgets import QApplication
+
+from teamtrackerpro.utils.log_pipeline import log_perf
+
+TRACE_ENV_VAR = "TEAMTRACKERPRO_TRACE"
+DEFAULT_BUFFER_SIZE = 20000  # Events kept in the rolling buffer
+HEARTBEAT_INTERVAL_MS = 50
+STALL_THRESHOLD_MS = 100  # Heartbeats later than this are recorded as event-loop stalls
+SLOW_DB_CALL_MS = 50  # DB calls slower than this are also written to the perf log
+ATTRIBUTED_CATEGORIES = ("db", "model", "render")
+
+
+def _now_us() -> int:
+    return time.perf_counter_ns() // 1000
+
+
+class Tracer(QObject):
+    """Optional GUI instrumentation: event-loop stalls, per-action latency and where that time went.
+
+    Everything is recorded as Chrome trace "complete" events in a rolling buffer and can be written
+    out with export_chrome_trace() for chrome://tracing or Perfetto. Categories:
+
+    - action: a toolbar action or double click, from the click until the first dialog it opens has
+      painted (or until the handler returns when it opens none)
+    - db: DatabaseManager calls, via instrument()
+    - model: table model population, via span()
+    - render: show/polish/paint of the window an action opened
+    - stall: gaps in the heartbeat timer, i.e. time the event loop was blocked
+
+    Action events carry db_ms, model_ms, render_ms and other_ms in their args. When disabled,
+    traced() and instrument() change nothing and span() costs a single attribute check.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.enabled = False
+        self.events: deque = deque(maxlen=DEFAULT_BUFFER_SIZE)
+        self.pid = os.getpid()
+        self.gui_thread = threading.get_ident()
+        self._action: Optional[Dict[str, Any]] = None
+        self._heartbeat: Optional[QTimer] = None
+        self._last_beat = 0
+        self._depth = threading.local()  # Per thread and category, how many instrumented calls are in progress
+
+    def enable(self, buffer_size: int = DEFAULT_BUFFER_SIZE) -> None:
+        if self.enabled:
+            return
+        self.enabled = True
+        self.events = deque(self.events, maxlen=buffer_size)
+        self.gui_thread = threading.get_ident()
+        app = QApplication.instance()
+        app.installEventFilter(self)
+        self._heartbeat = QTimer(self)
+        self._heartbeat.timeout.connect(self._on_heartbeat)
+        self._last_beat = _now_us()
+        self._heartbeat.start(HEARTBEAT_INTERVAL_MS)
+        logging.info("GUI instrumentation enabled.")
+
+    def record(self, name: str, category: str, start_us: int, duration_us: int, **args) -> None:
+        event = {"name": name, "cat": category, "ph": "X", "ts": start_us, "dur": duration_us,
+                 "pid": self.pid, "tid": threading.get_ident()}
+        if args:
+            event["args"] = args
+        self.events.append(event)
+        if category == "db" and duration_us >= SLOW_DB_CALL_MS * 1000:
+            log_perf("db_timing", method=name, ms=round(duration_us / 1000, 3))
+        elif category == "stall":
+            log_perf("event_loop_stall", ms=round(duration_us / 1000, 3))
+
+    @contextmanager
+    def span(self, name: str, category: str, **args):
+        if not self.enabled:
+            yield
+            return
+        start = _now_us()
+        try:
+            yield
+        finally:
+            self.record(name, category, start, _now_us() - start, **args)
+
+    def instrument(self, target: Any, category: str = "db") -> Any:
+        """Times every public method of ``target`` (patched on the instance) as ``category`` spans.
+
+        Only the outermost instrumented call on a thread is recorded, so a method calling another one
+        (set_durability -> flush) isn't counted twice. Context managers such as transaction() and other
+        generator methods are left alone; the call only creates the generator, the work happens later.
+        """
+        if not self.enabled:
+            return target
+        for name in dir(type(target)):
+            function = getattr(type(target), name, None)
+            if name.startswith("_") or not callable(function) or inspect.isgeneratorfunction(inspect.unwrap(function)):
+                continue
+            setattr(target, name, self._timed(getattr(target, name), name, category))
+        return target
+
+    def _timed(self, method: Callable, name: str, category: str) -> Callable:
+        def timed(*args, **kwargs):
+            depth = getattr(self._depth, category, 0)
+            setattr(self._depth, category, depth + 1)
+            try:
+                if depth:
+                    return method(*args, **kwargs)
+                with self.span(name, category):
+                    return method(*args, **kwargs)
+            finally:
+                setattr(self._depth, category, depth)
+        return timed
+
+    def traced(self, handler: Callable, name: Optional[str] = None) -> Callable:
+        """Wraps a slot so each invocation is recorded as an action."""
+        if not self.enabled:
+            return handler
+        name = name or handler.__name__
+        # Qt passes signal arguments (e.g. QAction's `checked`) that the handler may not accept
+        parameters = [p for p in inspect.signature(handler).parameters.values()
+                      if p.kind in (p.POSITIONAL_ONLY, p.POSITIONAL_OR_KEYWORD) and p.default is p.empty]
+
+        def action(*args):
+            return self.run_action(name, handler, *args[:len(parameters)])
+        return action
+
+    def run_action(self, name: str, handler: Callable, *args) -> Any:
+        outer = self._action
+        current = self._action = {"name": name, "start": _now_us(), "render_start": None, "window": None, "done": False}
+        try:
+            return handler(*args)
+        finally:
+            self._action = outer
+            if current["window"] is None:
+                self._finish_action(current)
+
+    def eventFilter(self, obj, event):
+        action = self._action
+        if action is not None and not action["done"] and obj.isWidgetType() and obj.isWindow():
+            event_type = event.type()
+            if event_type in (QEvent.Show, QEvent.Polish) and action["window"] is None:
+                action["window"] = obj
+                action["render_start"] = _now_us()
+            elif event_type == QEvent.Paint and obj is action["window"]:
+                action["done"] = True
+                # Runs once this paint event (and anything queued with it) has been handled
+                QTimer.singleShot(0, lambda: self._finish_action(action))
+        return False
+
+    def _finish_action(self, action: Dict[str, Any]) -> None:
+        end = _now_us()
+        start = action["start"]
+        spans = {"db": [], "model": []}
+        for event in reversed(self.events):
+            if event["ts"] < start:
+                break
+            if event["cat"] in spans and event["tid"] == self.gui_thread and event["ts"] + event["dur"] <= end:
+                spans[event["cat"]].append(event)
+
+        def within_model(event):
+            return any(model["ts"] <= event["ts"] and event["ts"] + event["dur"] <= model["ts"] + model["dur"] for model in spans["model"])
+
+        totals = {category: 0 for category in ATTRIBUTED_CATEGORIES}
+        totals["db"] = sum(event["dur"] for event in spans["db"])
+        # Model spans include the queries they trigger, so count those only once, as db time
+        totals["model"] = max(0, sum(event["dur"] for event in spans["model"]) - sum(event["dur"] for event in spans["db"] if within_model(event)))
+        if action["render_start"] is not None:
+            totals["render"] = end - action["render_start"]
+        duration = end - start
+        other = max(0, duration - sum(totals.values()))
+        breakdown = {f"{category}_ms": round(value / 1000, 3) for category, value in totals.items()}
+        breakdown["other_ms"] = round(other / 1000, 3)
+        self.record(action["name"], "action", start, duration, **breakdown)
+        log_perf("dialog_latency" if action["window"] is not None else "action_latency",
+                 action=action["name"], ms=round(duration / 1000, 3), **breakdown)
+
+    def _on_heartbeat(self):
+        now = _now_us()
+        late = now - self._last_beat - HEARTBEAT_INTERVAL_MS * 1000
+        if late > STALL_THRESHOLD_MS * 1000:
+            self.record("event loop stall", "stall", self._last_beat + HEARTBEAT_INTERVAL_MS * 1000, late)
+        self._last_beat = now
+
+    def actions(self) -> List[Dict[str, Any]]:
+        return [event for event in self.events if event["cat"] == "action"]
+
+    def export_chrome_trace(self, path: str) -> int:
+        """Writes the buffer as Chrome trace JSON and returns the number of events written."""
+        events = list(self.events)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+        logging.info(f"Exported {len(events)} trace events to {path}.")
+        return len(events)
+
+
+tracer = Tracer()
+
+
+def instrumentation_requested(settings) -> bool:
+    return os.environ.get(TRACE_ENV_VAR, "") not in ("", "0") or settings.value("instrumentation", False, type=bool)
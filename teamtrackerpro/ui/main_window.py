@@ -1,16 +1,18 @@
 import os
 import sys
 import csv
+import html
 import shutil
 import logging
+import threading
 from datetime import datetime
 
 from PyQt5.QtWidgets import (
-    QWidget, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, QTableWidget, QTableWidgetItem,
+    QWidget, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, QTableWidget, QTableWidgetItem, QTableView,
     QHeaderView, QStackedWidget, QFileDialog, QCheckBox, QDialog, QTextEdit, QListWidget,
-    QComboBox, QToolBar, QAction, QMessageBox, QSizePolicy, QGridLayout
+    QComboBox, QToolBar, QAction, QMessageBox, QSizePolicy, QGridLayout, QSplitter, QTabWidget
 )
-from PyQt5.QtCore import Qt, QSize, QSettings
+from PyQt5.QtCore import Qt, QSize, QSettings, QTimer
 from PyQt5.QtGui import QIcon, QPixmap
 from PyQt5.QtWebEngineWidgets import QWebEngineView
 import markdown
@@ -19,13 +21,28 @@ from plotly.subplots import make_subplots
 
 from teamtrackerpro.models.database_manager import DatabaseManager, AUDIT_NOTE_TYPES
 from teamtrackerpro.models.email_generator import EmailGenerator
+from teamtrackerpro.models.backup_manager import BackupManager
+from teamtrackerpro.models.shard_router import ShardRouter
+from teamtrackerpro.models.remote_backend import RemoteDatabaseManager
+from teamtrackerpro.models.change_feed import ChangeFeed
+from teamtrackerpro.models.forecast import KpiForecaster, parse_goal
+from teamtrackerpro.models.columnar_snapshot import ColumnarSnapshot
+from teamtrackerpro.models.leaderboard import period_bounds
+from teamtrackerpro.models.read_replica import ReadReplica
+from teamtrackerpro.models.archive_manager import ArchiveManager, archive_database
+from teamtrackerpro.models.drop_folder import DropFolderIngester
+from teamtrackerpro.models.warm_cache import WarmStartCache
 from teamtrackerpro.ui.dialogs import (
     EmployeeDetailsDialog, AddEmployeeDialog, EditEmployeeDialog, AddNoteDialog,
-    AddKpiDialog, EmailDialog, ExportDialog, LoginDialog, SettingsDialog, Notification
+    AddKpiDialog, EmailDialog, ExportDialog, ReportDialog, LoginDialog, SettingsDialog, Notification
 )
 from teamtrackerpro.ui.base import ThemedWidget
 from teamtrackerpro.ui.widgets import AnimatedButton, StyledLineEdit, StyledTextEdit, StyledComboBox
 from teamtrackerpro.ui.themes import get_dark_palette, get_light_palette
+from teamtrackerpro.ui.workers import TaskWorker
+from teamtrackerpro.ui.panels import LeaderboardPanel, AuditQueuePanel, AtRiskPanel
+from teamtrackerpro.ui.table_models import EmployeeTableModel, EmployeeFilterProxyModel
+from teamtrackerpro.ui.instrumentation import tracer
 from teamtrackerpro.utils.logo import get_logo_pixmap  # Import the logo function
 
 UPLOADS_DIR = "uploads"
@@ -34,17 +51,72 @@ class EmployeeManagerUI(ThemedWidget):
     def __init__(self, current_user, parent=None):
         super().__init__(self.is_dark_mode(), parent) # Initialize with current theme mode
         self.current_user = current_user
-        self.db_manager = DatabaseManager()
         self.settings = QSettings("MyCompany", "TeamTrackerPro")
+        self.shard_router = ShardRouter()
+        self.db_manager = tracer.instrument(self.open_database())
         self.setWindowTitle("TeamTrackerPro")
         self.setWindowIcon(QIcon("teamtrackerpro/resources/icons/app_icon.png")) # Set window icon
-        self.init_ui()
-        self.load_employees()
+        # Remote databases are backed up on the server side
+        self.backup_manager = BackupManager(self.db_manager.db_name) if isinstance(self.db_manager, DatabaseManager) else None
+        self.archive_manager = ArchiveManager(self.db_manager) if isinstance(self.db_manager, DatabaseManager) else None
+        self.backup_worker = None
+        self.archive_worker = None
+        self.archive_stop = threading.Event()
+        self.open_details_dialogs = []
+        self.analytics_db = self.open_read_replica()
+        self.forecaster = KpiForecaster(self.analytics_db, snapshot=self.open_snapshot())  # Refits only when the change log has moved on
+        self.warm_cache = WarmStartCache(self.db_manager.db_name) if isinstance(self.db_manager, DatabaseManager) else None
+        cached = self.warm_cache.load(self.db_manager) if self.warm_cache else None
+        # Created before the first load so no change made in between is missed; re-applying one is harmless.
+        # Starting from a warm cache, the feed resumes where the cache was saved and its first poll reconciles the rest
+        self.change_feed = ChangeFeed(self.db_manager, cached["change_seq"] if cached else None)
+        self.init_ui(cached)
+        if cached:
+            self.load_cached_state(cached)
+            QTimer.singleShot(0, self.sync_changes)  # Once the window has been shown
+        else:
+            self.load_employees()
+        self.start_backup_schedule()
+        self.start_archival()
+        self.start_ingestion()
+        self.start_change_sync()
+        self.start_group_commit_flush()
+
+    def open_database(self):
+        server_url = self.settings.value("server_url", "", type=str)
+        if server_url:
+            return RemoteDatabaseManager(server_url, self.settings.value("api_token", "", type=str))
+        team = self.settings.value("team", "", type=str)
+        # With a team configured each lead only opens their own shard; otherwise the shared database is used
+        db_manager = self.shard_router.get_manager(team) if team else DatabaseManager()
+        db_manager.set_durability(self.settings.value("durability", "FULL", type=str))
+        db_manager.set_group_commit(self.settings.value("group_commit_ms", 0, type=int) / 1000)
+        return db_manager
+
+    def open_read_replica(self):
+        # Leaderboards, audit queue and forecasts read from an in-memory copy so they never contend with UI writes
+        if not self.settings.value("read_replica", False, type=bool) or not isinstance(self.db_manager, DatabaseManager):
+            return self.db_manager
+        self.db_manager.flush()
+        replica = ReadReplica(self.db_manager.db_name)
+        tracer.instrument(replica.replica)
+        return replica
+
+    def open_snapshot(self):
+        # Forecast history read from memory-mapped column files instead of a query over every KPI row in the window
+        if not self.settings.value("columnar_snapshot", False, type=bool) or not isinstance(self.db_manager, DatabaseManager):
+            return None
+        return ColumnarSnapshot.for_database(self.db_manager.db_name)
 
     def is_dark_mode(self):
         return self.settings.value("dark_mode", False, type=bool)
 
-    def init_ui(self):
+    def kpi_goals(self):
+        # Team-wide monthly defaults for employees without stored goals
+        return {"calls": parse_goal(self.settings.value("call_goal", "", type=str)),
+                "tickets": parse_goal(self.settings.value("ticket_goal", "", type=str))}
+
+    def init_ui(self, cached=None):
         # Apply theme based on settings
         if self.is_dark_mode():
             self.setStyleSheet("")  # Let individual widgets handle styling
@@ -59,50 +131,84 @@ class EmployeeManagerUI(ThemedWidget):
         # Toolbar
         toolbar = QToolBar(self)
         add_employee_action = QAction(QIcon("teamtrackerpro/resources/icons/add_employee.png"), "Add Employee", self) # Add employee icon
-        add_employee_action.triggered.connect(self.show_add_employee_dialog)
+        add_employee_action.triggered.connect(tracer.traced(self.show_add_employee_dialog))
         toolbar.addAction(add_employee_action)
 
         edit_employee_action = QAction(QIcon("teamtrackerpro/resources/icons/edit_employee.png"), "Edit Employee", self) # Edit employee icon
-        edit_employee_action.triggered.connect(self.show_edit_employee_dialog)
+        edit_employee_action.triggered.connect(tracer.traced(self.show_edit_employee_dialog))
         toolbar.addAction(edit_employee_action)
 
         delete_employee_action = QAction(QIcon("teamtrackerpro/resources/icons/delete_employee.png"), "Delete Employee", self) # Delete employee icon
-        delete_employee_action.triggered.connect(self.delete_selected_employee)
+        delete_employee_action.triggered.connect(tracer.traced(self.delete_selected_employee))
         toolbar.addAction(delete_employee_action)
 
         add_note_action = QAction(QIcon("teamtrackerpro/resources/icons/add_note.png"), "Add Note", self) # Add note icon
-        add_note_action.triggered.connect(self.show_add_note_dialog)
+        add_note_action.triggered.connect(tracer.traced(self.show_add_note_dialog))
         toolbar.addAction(add_note_action)
 
         add_kpi_action = QAction(QIcon("teamtrackerpro/resources/icons/add_kpi.png"), "Add KPI", self) # Add KPI icon
-        add_kpi_action.triggered.connect(self.show_add_kpi_dialog)
+        add_kpi_action.triggered.connect(tracer.traced(self.show_add_kpi_dialog))
         toolbar.addAction(add_kpi_action)
 
         email_action = QAction(QIcon("teamtrackerpro/resources/icons/email.png"), "Email Follow-up", self) # Email icon
-        email_action.triggered.connect(self.show_email_dialog)
+        email_action.triggered.connect(tracer.traced(self.show_email_dialog))
         toolbar.addAction(email_action)
 
         export_action = QAction(QIcon("teamtrackerpro/resources/icons/export.png"), "Export Data", self) # Export icon
-        export_action.triggered.connect(self.show_export_dialog)
+        export_action.triggered.connect(tracer.traced(self.show_export_dialog))
         toolbar.addAction(export_action)
 
+        report_action = QAction(QIcon("teamtrackerpro/resources/icons/report.png"), "Generate Reports", self) # Report icon
+        report_action.triggered.connect(tracer.traced(self.show_report_dialog))
+        toolbar.addAction(report_action)
+
+        backup_action = QAction(QIcon("teamtrackerpro/resources/icons/backup.png"), "Backup Now", self) # Backup icon
+        backup_action.triggered.connect(tracer.traced(lambda: self.run_backup(notify=True), "run_backup"))
+        toolbar.addAction(backup_action)
+
         settings_action = QAction(QIcon("teamtrackerpro/resources/icons/settings.png"), "Settings", self) # Settings icon
-        settings_action.triggered.connect(self.show_settings_dialog)
+        settings_action.triggered.connect(tracer.traced(self.show_settings_dialog))
         toolbar.addAction(settings_action)
 
+        if tracer.enabled:
+            trace_action = QAction(QIcon("teamtrackerpro/resources/icons/trace.png"), "Export Trace", self) # Trace icon
+            trace_action.triggered.connect(self.export_trace)
+            toolbar.addAction(trace_action)
+
         toolbar.setMovable(False)  # Prevent toolbar from being dragged around
         main_layout.addWidget(toolbar)
 
         # Employee Table
-        self.employee_table = QTableWidget(0, 6)  # 6 columns
-        self.employee_table.setHorizontalHeaderLabels([
-            "ID", "Name", "Email", "Role", "Join Date", "Info"
-        ])
+        self.employee_model = EmployeeTableModel([
+            ("ID", "id"), ("Name", "name"), ("Email", "email"), ("Role", "role"), ("Join Date", "join_date"), ("Info", "info"),
+            ("Calls vs Goal", "calls_attainment"), ("Tickets vs Goal", "tickets_attainment")
+        ], self)
+        self.employee_proxy = EmployeeFilterProxyModel(self)  # Search filtering happens in the proxy, the model is never rebuilt
+        self.employee_proxy.setSourceModel(self.employee_model)
+        self.employee_table = QTableView(self)
+        self.employee_table.setModel(self.employee_proxy)
         self.employee_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
-        self.employee_table.setSelectionBehavior(QTableWidget.SelectRows)
-        self.employee_table.setEditTriggers(QTableWidget.NoEditTriggers)  # Make table read-only
-        self.employee_table.doubleClicked.connect(self.show_employee_details) # Double click to open details
-        main_layout.addWidget(self.employee_table)
+        self.employee_table.setSelectionBehavior(QTableView.SelectRows)
+        self.employee_table.setEditTriggers(QTableView.NoEditTriggers)  # Make table read-only
+        self.employee_table.setSortingEnabled(True)
+        self.employee_table.sortByColumn(0, Qt.AscendingOrder)
+        self.employee_table.doubleClicked.connect(tracer.traced(self.show_employee_details)) # Double click to open details
+
+        # Side panels next to the employee table
+        self.side_tabs = QTabWidget(self)
+        self.leaderboard_panel = LeaderboardPanel(self.analytics_db, self, cached["leaderboard"] if cached else None)
+        self.side_tabs.addTab(self.leaderboard_panel, "Leaderboard")
+        self.audit_queue_panel = AuditQueuePanel(self.analytics_db, self)
+        self.side_tabs.addTab(self.audit_queue_panel, "Due for Audit")
+        self.at_risk_panel = AtRiskPanel(self.forecaster, self.analytics_db, self.kpi_goals, self)
+        self.side_tabs.addTab(self.at_risk_panel, "At Risk")
+
+        splitter = QSplitter(Qt.Horizontal, self)
+        splitter.addWidget(self.employee_table)
+        splitter.addWidget(self.side_tabs)
+        splitter.setStretchFactor(0, 3)
+        splitter.setStretchFactor(1, 1)
+        main_layout.addWidget(splitter)
 
         # Search Bar
         search_layout = QHBoxLayout()
@@ -112,6 +218,22 @@ class EmployeeManagerUI(ThemedWidget):
         search_layout.addWidget(self.search_bar)
         main_layout.addLayout(search_layout)
 
+        self.did_you_mean_label = QLabel(self)
+        self.did_you_mean_label.linkActivated.connect(self.search_bar.setText)
+        self.did_you_mean_label.hide()
+        main_layout.addWidget(self.did_you_mean_label)
+
+        # Org filter: only the selected manager and everyone below them
+        org_layout = QHBoxLayout()
+        self.org_combo = StyledComboBox(self)
+        self.org_combo.currentIndexChanged.connect(self.filter_subtree)
+        org_layout.addWidget(QLabel("Org:"))
+        org_layout.addWidget(self.org_combo)
+        self.org_summary_label = QLabel(self)
+        org_layout.addWidget(self.org_summary_label)
+        org_layout.addStretch(1)
+        main_layout.addLayout(org_layout)
+
         # Logo (bottom-left corner)
         logo_pixmap = get_logo_pixmap(self.is_dark_mode())  # Get the logo pixmap
         if logo_pixmap:
@@ -125,103 +247,244 @@ class EmployeeManagerUI(ThemedWidget):
         self.setLayout(main_layout)
 
     def load_employees(self):
-        self.employee_table.setRowCount(0)
-        employees = self.db_manager.get_employees()
-        for employee in employees:
-            row = self.employee_table.rowCount()
-            self.employee_table.insertRow(row)
-            for i, data in enumerate(employee):
-                self.employee_table.setItem(row, i, QTableWidgetItem(str(data)))
+        self.employee_model.set_employees(self.db_manager.get_employees())
+        self.refresh_attainment()
+        self.load_managers()
+
+    def load_cached_state(self, cached):
+        """Fills the window from the warm-start cache; sync_changes() then applies anything newer."""
+        attainment_current = cached["attainment_period_start"] == period_bounds("month")[0] and cached["default_goals"] == self.kpi_goals()
+        if attainment_current:
+            self.attainment_period_start = cached["attainment_period_start"]
+            self.employee_model.attainment = {employee_id: (calls, tickets) for employee_id, calls, tickets in cached["attainment"]}
+        self.employee_model.set_employees(cached["employees"])
+        if not attainment_current:
+            self.refresh_attainment()
+        self.load_managers(cached["managers"])
+
+    def save_cached_state(self):
+        if not self.warm_cache:
+            return
+        self.warm_cache.save(
+            self.db_manager, self.change_feed.last_seq, self.employee_model.rows, self.attainment_period_start, self.kpi_goals(),
+            [(employee_id, calls, tickets) for employee_id, (calls, tickets) in self.employee_model.attainment.items()],
+            self.managers,
+            self.leaderboard_panel.leaderboard.export_periods())
+
+    def load_managers(self, managers=None):
+        selected = self.org_combo.currentData()
+        self.org_combo.blockSignals(True)
+        self.org_combo.clear()
+        self.org_combo.addItem("Everyone", None)
+        self.managers = [tuple(row) for row in (self.analytics_db.get_managers() if managers is None else managers)]
+        for manager_id, name, reports in self.managers:
+            self.org_combo.addItem(f"{name} ({reports} below)", manager_id)
+        index = self.org_combo.findData(selected) if selected is not None else 0
+        self.org_combo.setCurrentIndex(max(index, 0))
+        self.org_combo.blockSignals(False)
+        self.filter_subtree()
+
+    def filter_subtree(self, _index=None):
+        manager_id = self.org_combo.currentData()
+        if manager_id is None:
+            self.employee_proxy.set_subtree_ids(None)
+            self.org_summary_label.clear()
+            return
+        self.employee_proxy.set_subtree_ids(set(self.analytics_db.get_subtree_ids(manager_id)))
+        people, calls, tickets, _ = self.analytics_db.get_subtree_kpis(manager_id, *period_bounds("month"))
+        audits_due = len(self.analytics_db.get_subtree_audits_due(manager_id, None, -1))
+        self.org_summary_label.setText(f"This month: {calls:,.0f} calls, {tickets:,.0f} tickets from {people} people; {audits_due} audits due")
+
+    def refresh_attainment(self, employee_ids=None):
+        """Reads this month's goal attainment from the precomputed rollups, for everyone or only `employee_ids`."""
+        self.attainment_period_start = period_bounds("month")[0]
+        self.employee_model.set_attainment(self.analytics_db.get_attainment(
+            "month", self.attainment_period_start, None if employee_ids is None else list(employee_ids), self.kpi_goals()))
 
     def filter_employees(self, text):
-        text = text.lower()
-        for row in range(self.employee_table.rowCount()):
-            match = False
-            for col in range(self.employee_table.columnCount()):
-                item = self.employee_table.item(row, col)
-                if item and text in item.text().lower():
-                    match = True
-                    break
-            self.employee_table.setRowHidden(row, not match)
+        self.employee_proxy.set_match_ids(None)
+        self.employee_proxy.setFilterFixedString(text)
+        self.did_you_mean_label.hide()
+        if self.employee_proxy.rowCount() or len(text.strip()) < 3:
+            return
+        # Nothing contains the text literally, so fall back to trigram similarity (typos, swapped letters)
+        matches = self.analytics_db.search_employees(text)
+        if not matches:
+            return
+        self.employee_proxy.set_match_ids({employee_id for employee_id, _, _ in matches})
+        best_name = html.escape(matches[0][1])
+        self.did_you_mean_label.setText(f'Did you mean <a href="{best_name}">{best_name}</a>?')
+        self.did_you_mean_label.show()
+
+    def _employee_id_at(self, index):
+        return self.employee_model.row_data(self.employee_proxy.mapToSource(index).row()).id
+
+    def selected_rows(self):
+        return self.employee_table.selectionModel().selectedRows()
+
+    def start_group_commit_flush(self):
+        if not getattr(self.db_manager, "group_commit_window", 0):
+            return
+        # Commits the tail of a burst of grouped writes once the window has passed
+        self.flush_timer = QTimer(self)
+        self.flush_timer.timeout.connect(self.db_manager.flush_if_due)
+        self.flush_timer.start(max(1, int(self.db_manager.group_commit_window * 1000)))
+
+    def closeEvent(self, event):
+        self.save_cached_state()
+        # Archival stops after its current batch; a backup in progress is left to finish so its snapshot is complete
+        self.archive_stop.set()
+        for worker in (self.archive_worker, self.backup_worker):
+            if worker:
+                worker.wait()
+        if self.ingester:
+            self.ingest_timer.stop()
+            if self.ingest_worker:
+                self.ingest_worker.wait()
+            self.ingester.db_manager.close()
+        if self.analytics_db is not self.db_manager:
+            self.analytics_db.close()
+        self.db_manager.close()
+        self.shard_router.close()
+        super().closeEvent(event)
+
+    def start_change_sync(self):
+        self.sync_timer = QTimer(self)
+        self.sync_timer.timeout.connect(self.sync_changes)
+        self.sync_timer.start(self.settings.value("sync_interval_ms", 2000, type=int))
+
+    def sync_changes(self):
+        """Applies changes made by this or any other client since the last poll."""
+        changes = self.change_feed.poll()
+        if period_bounds("month")[0] != self.attainment_period_start:
+            self.refresh_attainment()  # A new month started; everyone's totals restart from zero
+        if not changes:
+            return
+        if changes.full_reload:
+            self.load_employees()
+            self.leaderboard_panel.leaderboard.invalidate()
+        else:
+            for employee_id in changes.employees_deleted:
+                self.employee_model.remove(employee_id)
+            for employee_id in changes.employees_changed:
+                employee = self.db_manager.get_employee_by_id(employee_id)
+                if employee:
+                    self.employee_model.upsert(employee)
+        if self.analytics_db is not self.db_manager:
+            self.analytics_db.sync()  # Don't wait for the replica's own refresh before updating the panels
+        if changes.full_reload or changes.employees_changed or changes.employees_deleted:
+            self.load_managers()  # Reporting lines may have moved
+        elif changes.kpis_changed or changes.notes_changed:
+            self.filter_subtree()  # Keeps the org summary current
+        if changes.full_reload:
+            self.refresh_attainment()  # Again, now that the replica has caught up
+        elif changes.kpis_changed or changes.goals_changed or changes.employees_changed:
+            self.refresh_attainment(changes.kpis_changed | changes.goals_changed | changes.employees_changed)
+        if changes.full_reload or changes.kpis_changed or changes.employees_changed or changes.employees_deleted:
+            self.leaderboard_panel.refresh()
+        if changes.full_reload or changes.notes_changed or changes.employees_changed or changes.employees_deleted:
+            self.audit_queue_panel.refresh()
+        if changes.full_reload or changes.kpis_changed or changes.goals_changed or changes.employees_changed or changes.employees_deleted:
+            self.at_risk_panel.refresh()  # Refits once, then every employee reads from the cached fit
+        for dialog in list(self.open_details_dialogs):
+            if changes.touches_employee(dialog.employee.id):
+                dialog.apply_changes(changes)
 
     def show_employee_details(self, index):
-        row = index.row()
-        employee_id = int(self.employee_table.item(row, 0).text())
+        self.open_employee_details(self._employee_id_at(index))
+
+    def open_employee_details(self, employee_id):
         employee = self.db_manager.get_employee_by_id(employee_id)
         if employee:
-            details_dialog = EmployeeDetailsDialog(employee, self.db_manager, self.is_dark_mode(), self.current_user, self)
-            details_dialog.exec_()
+            details_dialog = EmployeeDetailsDialog(employee, self.db_manager, self.is_dark_mode(), self.current_user, self,
+                                                   forecaster=self.forecaster, goals=self.kpi_goals(), history=self.archive_manager)
+            self.open_details_dialogs.append(details_dialog)
+            try:
+                details_dialog.exec_()
+            finally:
+                self.open_details_dialogs.remove(details_dialog)
 
     def show_add_employee_dialog(self):
         add_dialog = AddEmployeeDialog(self.db_manager, self.is_dark_mode(), self)
         if add_dialog.exec_() == QDialog.Accepted:
-            self.load_employees()
+            self.sync_changes()
 
     def show_edit_employee_dialog(self):
-        selected_items = self.employee_table.selectedItems()
-        if selected_items:
-            row = selected_items[0].row()
-            employee_id = int(self.employee_table.item(row, 0).text())
+        selected_rows = self.selected_rows()
+        if selected_rows:
+            employee_id = self._employee_id_at(selected_rows[0])
             employee = self.db_manager.get_employee_by_id(employee_id)
             if employee:
                 edit_dialog = EditEmployeeDialog(employee, self.db_manager, self.is_dark_mode(), self)
                 if edit_dialog.exec_() == QDialog.Accepted:
-                    self.load_employees()
+                    self.sync_changes()
         else:
             QMessageBox.warning(self, "Warning", "No employee selected.")
 
     def delete_selected_employee(self):
-        selected_items = self.employee_table.selectedItems()
-        if selected_items:
+        selected_rows = self.selected_rows()
+        if selected_rows:
             reply = QMessageBox.question(self, "Confirm Delete", "Are you sure you want to delete the selected employee(s)?",
                                          QMessageBox.Yes | QMessageBox.No, QMessageBox.No)
             if reply == QMessageBox.Yes:
-                for item in selected_items:
-                    row = item.row()
-                    employee_id = int(self.employee_table.item(row, 0).text())
+                for employee_id in [self._employee_id_at(index) for index in selected_rows]:
                     self.db_manager.delete_employee(employee_id)
-                self.load_employees()
+                self.sync_changes()
         else:
             QMessageBox.warning(self, "Warning", "No employee selected.")
 
     def show_add_note_dialog(self):
-        selected_items = self.employee_table.selectedItems()
-        if selected_items:
-            row = selected_items[0].row()
-            employee_id = int(self.employee_table.item(row, 0).text())
+        selected_rows = self.selected_rows()
+        if selected_rows:
+            employee_id = self._employee_id_at(selected_rows[0])
             add_note_dialog = AddNoteDialog(employee_id, self.db_manager, self.is_dark_mode(), self.current_user, self)
             if add_note_dialog.exec_() == QDialog.Accepted:
-                self.show_employee_details(selected_items[0].index()) # Refresh details view
+                self.open_employee_details(employee_id) # Refresh details view
         else:
             QMessageBox.warning(self, "Warning", "No employee selected.")
 
     def show_add_kpi_dialog(self):
-        selected_items = self.employee_table.selectedItems()
-        if selected_items:
-            row = selected_items[0].row()
-            employee_id = int(self.employee_table.item(row, 0).text())
+        selected_rows = self.selected_rows()
+        if selected_rows:
+            employee_id = self._employee_id_at(selected_rows[0])
             add_kpi_dialog = AddKpiDialog(employee_id, self.db_manager, self.is_dark_mode(), self)
             if add_kpi_dialog.exec_() == QDialog.Accepted:
-                self.show_employee_details(selected_items[0].index()) # Refresh details view
+                self.open_employee_details(employee_id) # Refresh details view
         else:
             QMessageBox.warning(self, "Warning", "No employee selected.")
 
     def show_email_dialog(self):
-        selected_items = self.employee_table.selectedItems()
-        if selected_items:
-            row = selected_items[0].row()
-            employee_id = int(self.employee_table.item(row, 0).text())
+        selected_rows = self.selected_rows()
+        if selected_rows:
+            employee_id = self._employee_id_at(selected_rows[0])
             employee = self.db_manager.get_employee_by_id(employee_id)
             if employee:
-                email_dialog = EmailDialog(employee, self.db_manager, self.is_dark_mode(), self)
+                email_dialog = EmailDialog(employee, self.db_manager, self.is_dark_mode(), self,
+                                           forecaster=self.forecaster, goals=self.kpi_goals())
                 email_dialog.exec_()
         else:
             QMessageBox.warning(self, "Warning", "No employee selected.")
 
     def show_export_dialog(self):
-        export_dialog = ExportDialog(self.db_manager, self.is_dark_mode(), self)
+        # Admins may export every team's shard in one file
+        shard_router = self.shard_router if self.current_user.get("role") == "admin" else None
+        export_dialog = ExportDialog(self.db_manager, self.is_dark_mode(), self, shard_router=shard_router)
         export_dialog.exec_()
 
+    def show_report_dialog(self):
+        if isinstance(self.db_manager, RemoteDatabaseManager):
+            QMessageBox.information(self, "Reports", "Reports read the database file directly; generate them on the server with report_generator.")
+            return
+        self.db_manager.flush()  # The report reads through its own connection, so grouped writes must be visible
+        report_dialog = ReportDialog(self.db_manager.db_name, self.is_dark_mode(), self)
+        report_dialog.exec_()
+
+    def export_trace(self):
+        file_path, _ = QFileDialog.getSaveFileName(self, "Export Trace", "teamtrackerpro_trace.json", "Chrome Trace (*.json);;All Files (*)")
+        if file_path:
+            count = tracer.export_chrome_trace(file_path)
+            QMessageBox.information(self, "Trace Exported", f"{count} events written to {file_path}. Open it in chrome://tracing or Perfetto.")
+
     def show_settings_dialog(self):
         settings_dialog = SettingsDialog(self.settings, self)
         if settings_dialog.exec_() == QDialog.Accepted:
@@ -229,3 +492,59 @@ class EmployeeManagerUI(ThemedWidget):
             if self.is_dark_mode() != settings_dialog.dark_mode_changed: # Check if the theme was actually changed
                 self.settings.setValue("dark_mode", settings_dialog.dark_mode_changed)
                 QMessageBox.information(self, "Theme Change", "Please restart the application for the theme change to take effect.")
+            self.refresh_attainment()  # The default goals may have changed
+            self.at_risk_panel.refresh()
+
+    def start_backup_schedule(self):
+        interval_minutes = self.settings.value("backup_interval_minutes", 60, type=int)
+        if interval_minutes <= 0 or not self.backup_manager:
+            return
+        self.backup_timer = QTimer(self)
+        self.backup_timer.timeout.connect(self.run_backup)
+        self.backup_timer.start(interval_minutes * 60 * 1000)
+
+    def start_archival(self):
+        horizon_days = self.settings.value("archive_horizon_days", 0, type=int)
+        if horizon_days <= 0 or not self.archive_manager:
+            return
+        # One pass per start-up on a worker thread with its own connection; moved rows show up through the change feed
+        self.db_manager.flush()
+        self.archive_worker = TaskWorker(lambda: archive_database(self.db_manager.db_name, horizon_days, stop=self.archive_stop), self)
+        self.archive_worker.failed.connect(lambda error: logging.error(f"Archival failed: {error}"))
+        self.archive_worker.start()
+
+    def start_ingestion(self):
+        self.ingester = None
+        self.ingest_worker = None
+        directory = self.settings.value("ingest_dir", "", type=str)
+        if not directory or not isinstance(self.db_manager, DatabaseManager):
+            return
+        # Polls run on worker threads, one at a time, on a connection of their own (WAL, so GUI reads never wait on them)
+        self.ingester = DropFolderIngester(DatabaseManager(self.db_manager.db_name, check_same_thread=False), directory)
+        self.ingest_timer = QTimer(self)
+        self.ingest_timer.timeout.connect(self.run_ingestion)
+        self.ingest_timer.start(self.settings.value("ingest_interval_ms", 5000, type=int))
+
+    def run_ingestion(self):
+        if self.ingest_worker and self.ingest_worker.isRunning():
+            return
+        # Grouped GUI writes still hold the write lock until their window ends; commit them so the poll doesn't wait on it
+        self.db_manager.flush()
+        self.ingest_worker = TaskWorker(self.ingester.poll, self)
+        self.ingest_worker.succeeded.connect(lambda stats: stats.rows and self.sync_changes())
+        self.ingest_worker.start()
+
+    def run_backup(self, notify=False):
+        if not self.backup_manager:
+            if notify:
+                QMessageBox.information(self, "Backup", "Backups of a shared server database are taken on the server.")
+            return
+        if self.backup_worker and self.backup_worker.isRunning():
+            return  # The previous snapshot is still being copied
+        # The snapshot is copied in paged steps on a worker thread, so the UI and its writes are never blocked for long
+        self.backup_worker = TaskWorker(self.backup_manager.create_snapshot, self)
+        if notify:
+            self.backup_worker.succeeded.connect(
+                lambda path: QMessageBox.information(self, "Backup Complete", f"Snapshot saved to {path}"))
+        self.backup_worker.failed.connect(lambda error: QMessageBox.critical(self, "Backup Failed", error))
+        self.backup_worker.start()
@@ -0,0 +1,126 @@
+from PyQt5.QtWidgets import (
+    QWidget, QVBoxLayout, QHBoxLayout, QLabel, QTableWidget, QTableWidgetItem, QHeaderView, QSpinBox
+)
+
+from teamtrackerpro.models.leaderboard import Leaderboard, LEADERBOARD_METRICS, LEADERBOARD_PERIODS
+from teamtrackerpro.ui.widgets import StyledComboBox
+
+
+class LeaderboardPanel(QWidget):
+    def __init__(self, db_manager, parent=None, cached_periods=None):
+        super().__init__(parent)
+        self.leaderboard = Leaderboard(db_manager)
+        if cached_periods:
+            self.leaderboard.restore_periods(cached_periods)
+        self.init_ui()
+
+    def init_ui(self):
+        layout = QVBoxLayout(self)
+
+        controls = QHBoxLayout()
+        self.direction_combo = StyledComboBox(self)
+        self.direction_combo.addItems(["Top", "Bottom"])
+        controls.addWidget(self.direction_combo)
+
+        self.count_spin = QSpinBox(self)
+        self.count_spin.setRange(1, 100)
+        self.count_spin.setValue(10)
+        controls.addWidget(self.count_spin)
+
+        controls.addWidget(QLabel("by"))
+        self.metric_combo = StyledComboBox(self)
+        self.metric_combo.addItems(list(LEADERBOARD_METRICS))
+        controls.addWidget(self.metric_combo)
+
+        controls.addWidget(QLabel("this"))
+        self.period_combo = StyledComboBox(self)
+        self.period_combo.addItems(list(LEADERBOARD_PERIODS))
+        self.period_combo.setCurrentText("week")
+        controls.addWidget(self.period_combo)
+        layout.addLayout(controls)
+
+        self.table = QTableWidget(0, 3)
+        self.table.setHorizontalHeaderLabels(["Rank", "Name", "Value"])
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.table.setEditTriggers(QTableWidget.NoEditTriggers)
+        layout.addWidget(self.table)
+
+        for combo in (self.direction_combo, self.metric_combo, self.period_combo):
+            combo.currentIndexChanged.connect(self.show_ranking)
+        self.count_spin.valueChanged.connect(self.show_ranking)
+        self.show_ranking()
+
+    def show_ranking(self):
+        ranking = self.leaderboard.rank(
+            self.metric_combo.currentText(), self.period_combo.currentText(), self.count_spin.value(),
+            bottom=self.direction_combo.currentText() == "Bottom"
+        )
+        self.table.setRowCount(len(ranking))
+        for row, (rank, _, name, value) in enumerate(ranking):
+            self.table.setItem(row, 0, QTableWidgetItem(str(rank)))
+            self.table.setItem(row, 1, QTableWidgetItem(name))
+            self.table.setItem(row, 2, QTableWidgetItem(f"{value:.2f}" if isinstance(value, float) else str(value)))
+
+    def refresh(self):
+        # Only KPI rows added since the last refresh are read
+        self.leaderboard.refresh()
+        self.show_ranking()
+
+
+class AtRiskPanel(QWidget):
+    """Employees whose forecast says they will miss a monthly goal, worst shortfall first."""
+
+    def __init__(self, forecaster, db_manager, default_goals, parent=None):
+        super().__init__(parent)
+        self.forecaster = forecaster
+        self.db_manager = db_manager
+        self.default_goals = default_goals  # Callable returning the team-wide default goals
+        self.init_ui()
+
+    def init_ui(self):
+        layout = QVBoxLayout(self)
+        self.table = QTableWidget(0, 4)
+        self.table.setHorizontalHeaderLabels(["Name", "Metric", "Projected", "Goal"])
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.table.setEditTriggers(QTableWidget.NoEditTriggers)
+        layout.addWidget(self.table)
+        self.refresh()
+
+    def refresh(self):
+        forecasts = [forecast for metrics in self.forecaster.at_risk(self.default_goals()).values()
+                     for forecast in metrics.values() if forecast.will_miss]
+        forecasts.sort(key=lambda forecast: forecast.attainment)
+        names = self.db_manager.get_employee_names(sorted({forecast.employee_id for forecast in forecasts}))
+        self.table.setRowCount(len(forecasts))
+        for row, forecast in enumerate(forecasts):
+            self.table.setItem(row, 0, QTableWidgetItem(names.get(forecast.employee_id, str(forecast.employee_id))))
+            self.table.setItem(row, 1, QTableWidgetItem(forecast.metric))
+            self.table.setItem(row, 2, QTableWidgetItem(f"{forecast.projected:,.0f} ({forecast.attainment:.0%})"))
+            self.table.setItem(row, 3, QTableWidgetItem(f"{forecast.goal:,.0f}"))
+
+
+class AuditQueuePanel(QWidget):
+    """Employees due for an audit, answered from the audit_schedule index."""
+
+    def __init__(self, db_manager, parent=None):
+        super().__init__(parent)
+        self.db_manager = db_manager
+        self.init_ui()
+
+    def init_ui(self):
+        layout = QVBoxLayout(self)
+        self.table = QTableWidget(0, 4)
+        self.table.setHorizontalHeaderLabels(["Name", "Audit", "Last Audit", "Due"])
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.table.setEditTriggers(QTableWidget.NoEditTriggers)
+        layout.addWidget(self.table)
+        self.refresh()
+
+    def refresh(self):
+        due = self.db_manager.get_audits_due()
+        self.table.setRowCount(len(due))
+        for row, (_, name, audit_type, last_audit, next_due) in enumerate(due):
+            self.table.setItem(row, 0, QTableWidgetItem(name))
+            self.table.setItem(row, 1, QTableWidgetItem(audit_type))
+            self.table.setItem(row, 2, QTableWidgetItem(last_audit or "Never"))
+            self.table.setItem(row, 3, QTableWidgetItem(next_due[:10]))
@@ -0,0 +1,74 @@
+import os
+import sys
+import logging
+from typing import List
+
+from PyQt5.QtCore import QObject, QUrl, pyqtSignal
+from PyQt5.QtWebEngineWidgets import QWebEnginePage
+
+
+class PdfExporter(QObject):
+    """Prints HTML files to PDF one after another with a single offscreen QWebEnginePage.
+
+    Pages are never shown, so this works in the GUI and, with QT_QPA_PLATFORM=offscreen, headless.
+    Each PDF is written next to its HTML file.
+    """
+
+    progress = pyqtSignal(int, int)
+    finished = pyqtSignal(list)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.page = QWebEnginePage(self)
+        self.page.loadFinished.connect(self._on_load_finished)
+        self.page.pdfPrintingFinished.connect(self._on_pdf_finished)
+        self.queue: List[str] = []
+        self.written: List[str] = []
+        self.total = 0
+
+    def export(self, html_paths: List[str]):
+        self.queue = list(html_paths)
+        self.written = []
+        self.total = len(self.queue)
+        self._next()
+
+    def _next(self):
+        if not self.queue:
+            self.finished.emit(self.written)
+            return
+        self.page.load(QUrl.fromLocalFile(os.path.abspath(self.queue[0])))
+
+    def _on_load_finished(self, ok: bool):
+        html_path = self.queue[0]
+        if not ok:
+            logging.error(f"Could not load {html_path} for PDF export.")
+            self._advance()
+            return
+        self.page.printToPdf(os.path.splitext(os.path.abspath(html_path))[0] + ".pdf")
+
+    def _on_pdf_finished(self, pdf_path: str, ok: bool):
+        if ok:
+            self.written.append(pdf_path)
+        else:
+            logging.error(f"Failed to write {pdf_path}.")
+        self._advance()
+
+    def _advance(self):
+        self.queue.pop(0)
+        self.progress.emit(self.total - len(self.queue), self.total)
+        self._next()
+
+
+def export_pdfs_headless(html_paths: List[str]) -> List[str]:
+    """Runs a windowless Qt application just long enough to print ``html_paths`` to PDF."""
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt5.QtWidgets import QApplication
+    app = QApplication.instance() or QApplication(sys.argv)
+    exporter = PdfExporter()
+    exporter.progress.connect(lambda done, total: print(f"\r{done}/{total} PDFs", end="", flush=True))
+    exporter.finished.connect(lambda paths: app.quit())
+    exporter.export(html_paths)
+    if html_paths:
+        app.exec_()
+    print()
+    return exporter.written
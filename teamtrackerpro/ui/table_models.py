@@ -0,0 +1,192 @@
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex, QVariant, QSortFilterProxyModel
+
+from teamtrackerpro.models.records import Record, Employee
+from teamtrackerpro.ui.instrumentation import tracer
+
+PAGE_SIZE = 100
+
+
+class RecordTableModel(QAbstractTableModel):
+    """Read-only table model over a list of records.
+
+    Cells are read straight from record attributes when the view asks for them, so no
+    per-cell item objects or string copies are kept around.
+
+    Args:
+        columns: (header, attribute name) pairs describing which field each column shows.
+    """
+
+    def __init__(self, columns: Sequence[Tuple[str, str]], parent=None):
+        super().__init__(parent)
+        self.columns = list(columns)
+        self.rows: List[Record] = []
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.columns)
+
+    def data(self, index, role=Qt.DisplayRole):
+        # Qt.UserRole is the raw value, which views sort on
+        if not index.isValid() or role not in (Qt.DisplayRole, Qt.EditRole, Qt.UserRole):
+            return QVariant()
+        value = getattr(self.rows[index.row()], self.columns[index.column()][1])
+        return QVariant() if value is None else value
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.columns[section][0]
+        return QVariant()
+
+    def row_data(self, row: int) -> Record:
+        return self.rows[row]
+
+
+class PagedTableModel(RecordTableModel):
+    """RecordTableModel that pulls rows from the database one page at a time.
+
+    Views call canFetchMore/fetchMore as the user scrolls towards the bottom, so only
+    the rows that have been scrolled into reach are ever queried.
+
+    Args:
+        columns: (header, attribute name) pairs describing which field each column shows.
+        fetch_page: Callable taking (limit, offset) and returning a list of records.
+        page_size: Number of rows requested per fetch.
+    """
+
+    def __init__(self, columns: Sequence[Tuple[str, str]], fetch_page: Callable[[int, int], List[Record]],
+                 page_size: int = PAGE_SIZE, parent=None):
+        super().__init__(columns, parent)
+        self.fetch_page = fetch_page
+        self.page_size = page_size
+        self.exhausted = False
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and not self.exhausted
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid() or self.exhausted:
+            return
+        with tracer.span("PagedTableModel.fetchMore", "model"):
+            page = self.fetch_page(self.page_size, len(self.rows))
+            if len(page) < self.page_size:
+                self.exhausted = True
+            if not page:
+                return
+            self.beginInsertRows(QModelIndex(), len(self.rows), len(self.rows) + len(page) - 1)
+            self.rows.extend(page)
+            self.endInsertRows()
+
+    def reload(self):
+        self.beginResetModel()
+        self.rows = []
+        self.exhausted = False
+        self.endResetModel()
+        self.fetchMore()
+
+
+class EmployeeTableModel(RecordTableModel):
+    """Employee list with an id -> row index, so delta updates touch only the rows that changed.
+
+    Columns whose attribute is a key of ATTAINMENT_COLUMNS show goal attainment from set_attainment()
+    instead of an employee field: a percentage for display and the fraction under Qt.UserRole.
+    """
+
+    ATTAINMENT_COLUMNS = {"calls_attainment": 0, "tickets_attainment": 1}
+
+    def __init__(self, columns: Sequence[Tuple[str, str]], parent=None):
+        super().__init__(columns, parent)
+        self._row_by_id: Dict[int, int] = {}
+        self.attainment: Dict[int, Tuple[Optional[float], Optional[float]]] = {}  # employee_id -> (calls, tickets)
+
+    def data(self, index, role=Qt.DisplayRole):
+        attribute = self.columns[index.column()][1] if index.isValid() else None
+        if attribute not in self.ATTAINMENT_COLUMNS:
+            return super().data(index, role)
+        if role not in (Qt.DisplayRole, Qt.UserRole):
+            return QVariant()
+        values = self.attainment.get(self.rows[index.row()].id)
+        value = values[self.ATTAINMENT_COLUMNS[attribute]] if values else None
+        if value is None:
+            return QVariant()
+        return f"{value:.0%}" if role == Qt.DisplayRole else value
+
+    def set_attainment(self, rows: List[Tuple[Any, ...]]):
+        """Takes DatabaseManager.get_attainment rows and repaints only the attainment cells that changed."""
+        changed = []
+        for employee_id, calls, call_goal, tickets, ticket_goal in rows:
+            values = (calls / call_goal if call_goal else None, tickets / ticket_goal if ticket_goal else None)
+            if self.attainment.get(employee_id) != values:
+                self.attainment[employee_id] = values
+                if employee_id in self._row_by_id:
+                    changed.append(self._row_by_id[employee_id])
+        columns = [column for column, (_, attribute) in enumerate(self.columns) if attribute in self.ATTAINMENT_COLUMNS]
+        if changed and columns:
+            self.dataChanged.emit(self.index(min(changed), min(columns)), self.index(max(changed), max(columns)))
+
+    def set_employees(self, employees: List[Employee]):
+        with tracer.span("EmployeeTableModel.set_employees", "model", rows=len(employees)):
+            self.beginResetModel()
+            self.rows = list(employees)
+            self._row_by_id = {employee.id: row for row, employee in enumerate(self.rows)}
+            self.endResetModel()
+
+    def row_of(self, employee_id: int) -> Optional[int]:
+        return self._row_by_id.get(employee_id)
+
+    def upsert(self, employee: Employee):
+        row = self._row_by_id.get(employee.id)
+        if row is None:
+            row = len(self.rows)
+            self.beginInsertRows(QModelIndex(), row, row)
+            self.rows.append(employee)
+            self._row_by_id[employee.id] = row
+            self.endInsertRows()
+        else:
+            self.rows[row] = employee
+            self.dataChanged.emit(self.index(row, 0), self.index(row, len(self.columns) - 1))
+
+    def remove(self, employee_id: int):
+        row = self._row_by_id.get(employee_id)
+        if row is None:
+            return
+        self.beginRemoveRows(QModelIndex(), row, row)
+        del self.rows[row]
+        del self._row_by_id[employee_id]
+        for later_row in range(row, len(self.rows)):
+            self._row_by_id[self.rows[later_row].id] = later_row
+        self.endRemoveRows()
+
+
+class EmployeeFilterProxyModel(QSortFilterProxyModel):
+    """Substring filter over every column that can be switched to an explicit set of employee ids.
+
+    The id set holds fuzzy search matches when the typed text matches nothing literally.
+    A subtree id set, when given, additionally limits the rows to one part of the org.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setFilterKeyColumn(-1)  # Match against every column
+        self.setFilterCaseSensitivity(Qt.CaseInsensitive)
+        self.setSortRole(Qt.UserRole)  # Sort on raw values, e.g. attainment fractions rather than "95%" strings
+        self.match_ids: Optional[set] = None
+        self.subtree_ids: Optional[set] = None
+
+    def set_match_ids(self, match_ids: Optional[set]):
+        self.match_ids = match_ids
+        self.invalidateFilter()
+
+    def set_subtree_ids(self, subtree_ids: Optional[set]):
+        self.subtree_ids = subtree_ids
+        self.invalidateFilter()
+
+    def filterAcceptsRow(self, source_row, source_parent):
+        if self.subtree_ids is not None and self.sourceModel().row_data(source_row).id not in self.subtree_ids:
+            return False
+        if self.match_ids is not None:
+            return self.sourceModel().row_data(source_row).id in self.match_ids
+        return super().filterAcceptsRow(source_row, source_parent)
@@ -0,0 +1,29 @@
+import logging
+from typing import Any, Callable
+
+from PyQt5.QtCore import QThread, pyqtSignal
+
+
+class TaskWorker(QThread):
+    """Runs a blocking callable off the GUI thread and reports the outcome through signals.
+
+    The callable must not touch the GUI thread's sqlite3 connection; it should open its own.
+    Long tasks can pass ``worker.progress.emit`` as their progress callback.
+    """
+
+    succeeded = pyqtSignal(object)
+    failed = pyqtSignal(str)
+    progress = pyqtSignal(int, int)
+
+    def __init__(self, task: Callable[[], Any], parent=None):
+        super().__init__(parent)
+        self.task = task
+
+    def run(self):
+        try:
+            result = self.task()
+        except Exception as e:
+            logging.exception("Background task failed.")
+            self.failed.emit(str(e))
+            return
+        self.succeeded.emit(result)
@@ -0,0 +1,94 @@
+import json
+import queue
+import atexit
+import logging
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Optional
+
+LOG_FILE = "teamtrackerpro.log"
+PERF_LOG_FILE = "teamtrackerpro_perf.jsonl"
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+LOG_MAX_BYTES = 5 * 1024 * 1024
+LOG_BACKUP_COUNT = 5
+PERF_LOGGER_NAME = "teamtrackerpro.perf"
+
+perf_logger = logging.getLogger(PERF_LOGGER_NAME)
+_listener: Optional[QueueListener] = None
+
+
+def log_perf(event: str, **fields) -> None:
+    """Records a structured performance event (one JSON object per line in the perf log).
+
+    Only the record is built on the calling thread; serialising and writing happen on the
+    logging pipeline's background thread.
+    """
+    perf_logger.info(event, extra={"perf": fields})
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {"time": self.formatTime(record), "event": record.getMessage()}
+        entry.update(getattr(record, "perf", {}))
+        return json.dumps(entry, default=str)
+
+
+class PerfFilter(logging.Filter):
+    def __init__(self, perf: bool):
+        super().__init__()
+        self.perf = perf
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return hasattr(record, "perf") == self.perf
+
+
+class PerfQueueHandler(QueueHandler):
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # The default prepare() formats the message on the caller's thread; perf records keep their
+        # fields and are formatted by the listener's JSON handler instead
+        if hasattr(record, "perf"):
+            return record
+        return super().prepare(record)
+
+
+def setup_logging(log_file: str = LOG_FILE, perf_log_file: str = PERF_LOG_FILE, level: int = logging.INFO,
+                  max_bytes: int = LOG_MAX_BYTES, backup_count: int = LOG_BACKUP_COUNT) -> QueueListener:
+    """Routes all logging through a queue to a background writer thread.
+
+    Log calls on the GUI thread only enqueue a record. The listener thread writes plain records to
+    a size-rotated ``log_file`` and perf events from log_perf() as JSON lines to ``perf_log_file``.
+    Call shutdown_logging() on exit to drain the queue; it is also registered with atexit.
+    """
+    global _listener
+    if _listener is not None:
+        return _listener
+
+    text_handler = RotatingFileHandler(log_file, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8", delay=True)
+    text_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    text_handler.addFilter(PerfFilter(perf=False))
+    perf_handler = RotatingFileHandler(perf_log_file, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8", delay=True)
+    perf_handler.setFormatter(JsonFormatter())
+    perf_handler.addFilter(PerfFilter(perf=True))
+
+    log_queue = queue.SimpleQueue()
+    root = logging.getLogger()
+    root.setLevel(level)
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(PerfQueueHandler(log_queue))
+    perf_logger.setLevel(logging.INFO)
+
+    _listener = QueueListener(log_queue, text_handler, perf_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+    return _listener
+
+
+def shutdown_logging() -> None:
+    """Writes every queued record, stops the writer thread and closes the log files. Safe to call twice."""
+    global _listener
+    if _listener is None:
+        return
+    listener, _listener = _listener, None
+    listener.stop()
+    for handler in listener.handlers:
+        handler.close()
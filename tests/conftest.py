@@ -0,0 +1,22 @@
+import pytest
+
+from teamtrackerpro.models.database_manager import DatabaseManager
+
+
+@pytest.fixture
+def db(tmp_path):
+    db_manager = DatabaseManager(str(tmp_path / "teamtracker.db"))
+    yield db_manager
+    db_manager.close()
+
+
+@pytest.fixture
+def hire(db):
+    """Adds an employee and returns their id."""
+    def hire(name, manager_id=None, join_date="2024-01-01"):
+        assert db.add_employee(name, f"{name.lower()}@example.com", "employee", join_date, "")
+        employee_id = next(employee.id for employee in db.get_employees() if employee.name == name)
+        if manager_id is not None:
+            db.set_manager(employee_id, manager_id)
+        return employee_id
+    return hire
@@ -0,0 +1,19 @@
+from teamtrackerpro.models.archive_manager import ArchiveManager
+
+
+def test_paged_history_merges_hot_and_archived_rows_by_time(db, hire, tmp_path):
+    alice = hire("Alice")
+    db.add_kpis([(alice, 1, 0, None, "", "2015-01-01 10:00:00"), (alice, 2, 0, None, "", "2016-06-01 10:00:00")])
+    archive_manager = ArchiveManager(db, str(tmp_path / "archives"))
+    assert archive_manager.archive() == 2
+    # Hot rows on both sides of the archived ones: an import with an old timestamp and a current entry
+    db.add_kpis([(alice, 0, 0, None, "", "2014-01-01 10:00:00"), (alice, 3, 0, None, "", "2024-01-01 10:00:00"),
+                 (alice, 9, 0, None, "", "2016-06-01 10:00:00")])
+
+    expected = ["2024-01-01 10:00:00", "2016-06-01 10:00:00", "2016-06-01 10:00:00", "2015-01-01 10:00:00", "2014-01-01 10:00:00"]
+    full = archive_manager.get_kpis_for_employee(alice)
+    assert [kpi.timestamp for kpi in full] == expected
+    assert [kpi.calls_handled for kpi in full[1:3]] == [9, 2]  # Same time: higher id first
+    pages = [kpi for offset in range(6) for kpi in archive_manager.get_kpis_for_employee(alice, 1, offset)]
+    assert [kpi.id for kpi in pages] == [kpi.id for kpi in full]
+    assert [kpi.id for kpi in archive_manager.get_kpis_for_employee(alice, 2, 3)] == [kpi.id for kpi in full[3:5]]
@@ -0,0 +1,46 @@
+def schedule(db, employee_id):
+    db.cursor.execute("SELECT audit_type, last_audit, next_due FROM audit_schedule WHERE employee_id = ? ORDER BY audit_type", (employee_id,))
+    return db.cursor.fetchall()
+
+
+def assert_matches_rebuild(db):
+    db.cursor.execute("SELECT * FROM audit_schedule ORDER BY employee_id, audit_type")
+    maintained = db.cursor.fetchall()
+    db.rebuild_audit_schedule()
+    db.cursor.execute("SELECT * FROM audit_schedule ORDER BY employee_id, audit_type")
+    assert maintained == db.cursor.fetchall()
+
+
+def test_new_employees_are_due_from_their_join_date(db, hire):
+    alice = hire("Alice", join_date="2024-02-01")
+    assert schedule(db, alice) == [("Call Audit", None, "2024-02-01 00:00:00"), ("Ticket Audit", None, "2024-02-01 00:00:00")]
+    assert [row[2] for row in db.get_audits_due("2024-02-01 00:00:00")] == ["Call Audit", "Ticket Audit"]
+    assert db.get_audits_due("2024-01-31 23:59:59") == []
+
+
+def test_audit_notes_push_the_next_due_date(db, hire):
+    alice = hire("Alice")
+    db.add_note(alice, "Call Audit", "Checked five calls", 1, "2024-03-01 10:00:00")
+    assert schedule(db, alice)[0] == ("Call Audit", "2024-03-01 10:00:00", "2024-03-31 10:00:00")
+    assert db.get_employee_by_id(alice).last_audit_report == "2024-03-01 10:00:00"
+
+    # An older audit entered late doesn't move the schedule back; other note types don't count
+    db.add_note(alice, "Call Audit", "Backdated", 1, "2024-02-01 10:00:00")
+    db.add_note(alice, "General", "Not an audit", 1, "2024-06-01 10:00:00")
+    assert schedule(db, alice)[0] == ("Call Audit", "2024-03-01 10:00:00", "2024-03-31 10:00:00")
+    assert_matches_rebuild(db)
+
+
+def test_changing_an_interval_reschedules_audited_employees(db, hire):
+    alice, bob = hire("Alice"), hire("Bob", join_date="2024-05-01")
+    db.add_note(alice, "Ticket Audit", "Reviewed tickets", 1, "2024-03-01 10:00:00")
+    db.set_audit_interval("Ticket Audit", 7)
+    assert schedule(db, alice)[1] == ("Ticket Audit", "2024-03-01 10:00:00", "2024-03-08 10:00:00")
+    assert schedule(db, bob)[1] == ("Ticket Audit", None, "2024-05-01 00:00:00")
+    assert_matches_rebuild(db)
+
+
+def test_deleted_employees_leave_the_queue(db, hire):
+    alice = hire("Alice")
+    db.delete_employee(alice)
+    assert schedule(db, alice) == []
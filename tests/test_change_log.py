@@ -0,0 +1,53 @@
+def changes(db, since=0):
+    return [(table, row_id, employee_id, operation) for _, table, row_id, employee_id, operation in db.get_changes_since(since)]
+
+
+def test_writes_to_tracked_tables_are_logged(db, hire):
+    alice = hire("Alice")
+    _, after_hire = db.get_change_log_bounds()
+    db.add_kpi(alice, 5, 1, None, "")
+    db.add_note(alice, "General", "Hello", 1)
+    db.set_goal(alice, "calls", "month", 100)
+    db.update_employee(alice, "Alice B", "alice@example.com", "employee", "2024-01-01", "")
+    assert [(table, operation) for table, _, _, operation in changes(db, after_hire)] == [
+        ("performance", "insert"), ("notes", "insert"), ("goals", "insert"), ("employees", "update"),
+    ]
+    assert {employee_id for _, _, employee_id, _ in changes(db, after_hire)} == {alice}
+
+
+def test_deletes_are_logged_with_the_old_row(db, hire):
+    alice = hire("Alice")
+    db.add_kpi(alice, 5, 1, None, "")
+    _, before = db.get_change_log_bounds()
+    db.delete_employee(alice)
+    logged = changes(db, before)
+    assert ("performance", 1, alice, "delete") in logged
+    assert ("employees", alice, alice, "delete") in logged
+
+
+def test_bounds_and_paging(db, hire):
+    assert db.get_change_log_bounds() == (0, 0)
+    for name in ("Alice", "Bob", "Carol"):
+        hire(name)
+    oldest, newest = db.get_change_log_bounds()
+    assert len(db.get_changes_since(oldest - 1)) == newest - oldest + 1
+    assert [row[0] for row in db.get_changes_since(oldest, 2)] == [oldest + 1, oldest + 2]
+    assert db.get_changes_since(newest) == []
+
+
+def test_has_rewrites_since_ignores_inserts_and_newer_rows(db, hire):
+    alice = hire("Alice")
+    db.add_kpis([(alice, calls, 0, None, "", "2024-03-01 10:00:00") for calls in range(3)])
+    _, seq = db.get_change_log_bounds()
+    db.add_kpi(alice, 9, 0, None, "")
+    assert not db.has_rewrites_since(seq, "performance", 3)
+
+    db.cursor.execute("UPDATE performance SET calls_handled = 0 WHERE id = 4")
+    db.connection.commit()
+    assert not db.has_rewrites_since(seq, "performance", 3)
+    assert db.has_rewrites_since(seq, "performance", 4)
+
+    db.cursor.execute("DELETE FROM performance WHERE id = 2")
+    db.connection.commit()
+    assert db.has_rewrites_since(seq, "performance", 3)
+    assert not db.has_rewrites_since(seq, "notes", 3)
@@ -0,0 +1,20 @@
+from teamtrackerpro.models.drop_folder import DropFolderIngester
+
+
+def test_rows_for_unknown_employees_are_rejected(db, hire, tmp_path):
+    alice = hire("Alice")
+    drop_dir = tmp_path / "dropbox"
+    drop_dir.mkdir()
+    (drop_dir / "kpis.csv").write_text(
+        "record_id,employee_id,calls,date\n"
+        f"r1,{alice},5,2024-03-01\n"
+        "r2,999,7,2024-03-01\n"
+        "r3,,3,2024-03-01\n"
+    )
+    (drop_dir / "notes.jsonl").write_text(f'{{"employee_id": 999, "note": "Orphan"}}\n{{"email": "alice@example.com", "note": "Kept"}}\n')
+
+    stats = DropFolderIngester(db, str(drop_dir)).poll()
+    assert (stats.rows, stats.rejected) == (2, 3)
+    db.cursor.execute("SELECT COUNT(*) FROM performance WHERE employee_id IS NULL OR employee_id NOT IN (SELECT id FROM employees)")
+    assert db.cursor.fetchone() == (0,)
+    assert [note.preview for note in db.get_notes_for_employee(alice)] == ["Kept"]
@@ -0,0 +1,72 @@
+import pytest
+
+
+def rollups(db):
+    # A period whose rows were all removed keeps a zero row; a rebuild has no row at all
+    db.cursor.execute("SELECT employee_id, period, period_start, calls, tickets FROM kpi_rollups WHERE calls != 0 OR tickets != 0")
+    return sorted(db.cursor.fetchall())
+
+
+def assert_matches_rebuild(db):
+    maintained = rollups(db)
+    db.rebuild_kpi_rollups()
+    assert maintained == rollups(db)
+
+
+def month_totals(db, employee_id, month_start):
+    db.cursor.execute("SELECT calls, tickets FROM kpi_rollups WHERE employee_id = ? AND period = 'month' AND period_start = ?",
+                      (employee_id, month_start))
+    return db.cursor.fetchone()
+
+
+@pytest.fixture
+def kpis(db, hire):
+    alice, bob = hire("Alice"), hire("Bob")
+    db.add_kpis([
+        (alice, 10, 2, None, "", "2024-03-04 09:00:00"),
+        (alice, 5, None, None, "", "2024-03-31 23:59:59"),
+        (alice, 7, 1, None, "", "2024-04-01 00:00:00"),
+        (bob, 3, 3, None, "", "2024-03-10 12:00:00"),
+    ])
+    db.cursor.execute("SELECT id FROM performance ORDER BY id")
+    return alice, bob, [kpi_id for (kpi_id,) in db.cursor.fetchall()]
+
+
+def test_inserts_are_rolled_up_per_period(db, kpis):
+    alice, bob, _ = kpis
+    assert month_totals(db, alice, "2024-03-01 00:00:00") == (15, 2)
+    assert month_totals(db, alice, "2024-04-01 00:00:00") == (7, 1)
+    db.cursor.execute("SELECT calls FROM kpi_rollups WHERE employee_id = ? AND period = 'quarter' AND period_start = '2024-01-01 00:00:00'", (alice,))
+    assert db.cursor.fetchone() == (15,)
+    assert_matches_rebuild(db)
+
+
+def test_updates_move_totals_between_periods_and_employees(db, kpis):
+    alice, bob, kpi_ids = kpis
+    db.cursor.execute("UPDATE performance SET calls_handled = 20 WHERE id = ?", (kpi_ids[0],))
+    db.cursor.execute("UPDATE performance SET timestamp = '2024-04-15 10:00:00' WHERE id = ?", (kpi_ids[1],))
+    db.cursor.execute("UPDATE performance SET employee_id = ? WHERE id = ?", (bob, kpi_ids[2]))
+    db.connection.commit()
+    assert month_totals(db, alice, "2024-03-01 00:00:00") == (20, 2)
+    assert month_totals(db, alice, "2024-04-01 00:00:00") == (5, 0)
+    assert month_totals(db, bob, "2024-04-01 00:00:00") == (7, 1)
+    assert_matches_rebuild(db)
+
+
+def test_sentiment_scoring_leaves_totals_alone(db, kpis):
+    _, _, kpi_ids = kpis
+    before = rollups(db)
+    db.set_kpi_sentiments([(0.5, kpi_id) for kpi_id in kpi_ids])
+    assert rollups(db) == before
+
+
+def test_deletes_are_subtracted(db, kpis):
+    alice, bob, kpi_ids = kpis
+    db.cursor.execute("DELETE FROM performance WHERE id = ?", (kpi_ids[0],))
+    db.connection.commit()
+    assert month_totals(db, alice, "2024-03-01 00:00:00") == (5, 0)
+    assert_matches_rebuild(db)
+
+    db.delete_employee(bob)
+    assert not [row for row in rollups(db) if row[0] == bob]
+    assert_matches_rebuild(db)
@@ -0,0 +1,77 @@
+import pytest
+
+
+def closure(db):
+    db.cursor.execute("SELECT ancestor_id, descendant_id, depth FROM employee_closure")
+    return set(db.cursor.fetchall())
+
+
+def assert_matches_rebuild(db):
+    maintained = closure(db)
+    db.rebuild_org_closure()
+    assert maintained == closure(db)
+
+
+@pytest.fixture
+def org(hire):
+    # ceo <- lead <- agent, and a second lead with no reports
+    ceo = hire("Ceo")
+    lead = hire("Lead", ceo)
+    agent = hire("Agent", lead)
+    other_lead = hire("Other", ceo)
+    return ceo, lead, agent, other_lead
+
+
+def test_new_reports_are_linked_to_every_manager_above(db, org):
+    ceo, lead, agent, other_lead = org
+    assert sorted(db.get_subtree_ids(ceo)) == sorted(org)
+    assert (ceo, agent, 2) in closure(db)
+    assert_matches_rebuild(db)
+
+
+def test_reparenting_moves_the_whole_subtree(db, org):
+    ceo, lead, agent, other_lead = org
+    db.set_manager(lead, other_lead)
+    assert sorted(db.get_subtree_ids(other_lead)) == sorted([other_lead, lead, agent])
+    assert (ceo, agent, 3) in closure(db)
+    assert_matches_rebuild(db)
+
+    db.set_manager(lead, None)
+    assert sorted(db.get_subtree_ids(ceo)) == sorted([ceo, other_lead])
+    assert sorted(db.get_subtree_ids(lead)) == sorted([lead, agent])
+    assert_matches_rebuild(db)
+
+
+@pytest.mark.parametrize("new_manager", ["self", "report", "indirect report"])
+def test_cycles_are_rejected(db, org, new_manager):
+    ceo, lead, agent, other_lead = org
+    before = closure(db)
+    manager_id = {"self": ceo, "report": lead, "indirect report": agent}[new_manager]
+    with pytest.raises(ValueError):
+        db.set_manager(ceo, manager_id)
+    assert closure(db) == before
+    assert db.get_employee_by_id(ceo).manager_id is None
+
+
+def test_deleting_a_manager_moves_their_reports_up(db, org):
+    ceo, lead, agent, other_lead = org
+    db.delete_employee(lead)
+    assert db.get_employee_by_id(agent).manager_id == ceo
+    assert sorted(db.get_subtree_ids(ceo)) == sorted([ceo, agent, other_lead])
+    assert not any(lead in (ancestor, descendant) for ancestor, descendant, _ in closure(db))
+    assert_matches_rebuild(db)
+
+
+def test_rejected_manager_change_saves_nothing_else(db, org):
+    ceo, lead, agent, other_lead = org
+    with pytest.raises(ValueError):
+        db.save_employee_profile(ceo, "Renamed", "ceo@example.com", "employee", "2024-01-01", "", agent, [("calls", "month", 50)])
+    assert db.get_employee_by_id(ceo).name == "Ceo"
+    assert db.get_goals(ceo) == {}
+    assert not db.connection.in_transaction
+
+    db.save_employee_profile(agent, "Agent B", "agent@example.com", "employee", "2024-01-01", "", other_lead, [("calls", "month", 50)])
+    assert db.get_employee_by_id(agent).name == "Agent B"
+    assert db.get_employee_by_id(agent).manager_id == other_lead
+    assert db.get_goals(agent) == {"calls": 50}
+    assert_matches_rebuild(db)
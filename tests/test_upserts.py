@@ -0,0 +1,71 @@
+from datetime import datetime
+
+import pytest
+
+from teamtrackerpro.models import database_manager
+from teamtrackerpro.models.archive_manager import ArchiveManager
+
+
+@pytest.fixture
+def alice(hire):
+    return hire("Alice")
+
+
+def kpi_rows(db):
+    db.cursor.execute("SELECT employee_id, timestamp, calls_handled, tickets_triaged, source_id FROM performance ORDER BY id")
+    return db.cursor.fetchall()
+
+
+def test_keyed_kpis_are_idempotent(db, alice):
+    rows = [(alice, calls, 1, None, "", f"2024-03-0{calls} 10:00:00", f"crm-{calls}") for calls in range(1, 4)]
+    assert db.upsert_kpis(rows) == 3
+    assert db.upsert_kpis(rows) == 0
+    assert len(kpi_rows(db)) == 3
+
+
+def test_changed_keyed_kpis_replace_the_stored_row(db, alice):
+    db.upsert_kpis([(alice, 5, 1, None, "", "2024-03-01 10:00:00", "crm-1")])
+    assert db.upsert_kpis([(alice, 8, 1, None, "", "2024-03-01 10:00:00", "crm-1")]) == 1
+    assert kpi_rows(db) == [(alice, "2024-03-01 10:00:00", 8, 1, "crm-1")]
+    db.cursor.execute("SELECT calls FROM kpi_rollups WHERE employee_id = ? AND period = 'month'", (alice,))
+    assert db.cursor.fetchall() == [(8,)]
+
+
+def test_unkeyed_kpis_are_matched_by_content(db, alice):
+    rows = [(alice, 5, 1, None, "Busy day", "2024-03-01 10:00:00", None)] * 2
+    assert db.upsert_kpis(rows) == 1
+    assert db.upsert_kpis(rows) == 0
+    assert db.upsert_kpis([(alice, 6, 1, None, "Busy day", "2024-03-01 10:00:00", None)]) == 1
+    assert len(kpi_rows(db)) == 2
+
+
+def test_notes_are_idempotent(db, alice):
+    notes = [(alice, "Call Audit", "Good call", 1, "2024-03-01 10:00:00", "crm-n1"),
+             (alice, "General", "Follow up", 1, "2024-03-02 10:00:00", None)]
+    assert db.upsert_notes(notes) == 2
+    assert db.upsert_notes(notes) == 0
+    db.set_note_sentiments([(0.4, note.id) for note in db.get_notes_for_employee(alice)])
+    assert db.upsert_notes([(alice, "Call Audit", "Great call", 1, "2024-03-01 10:00:00", "crm-n1")]) == 1
+    db.cursor.execute("SELECT note, sentiment_score FROM notes WHERE source_id = 'crm-n1'")
+    assert db.cursor.fetchone() == ("Great call", None)
+
+
+def test_archived_rows_are_not_imported_again(db, alice, tmp_path):
+    kpis = [(alice, 5, 1, None, "", "2015-03-01 10:00:00", "crm-old"), (alice, 6, 1, None, "old", "2015-03-02 10:00:00", None)]
+    db.upsert_kpis(kpis)
+    assert ArchiveManager(db, str(tmp_path / "archives")).archive() == 2
+    assert kpi_rows(db) == []
+    assert db.upsert_kpis(kpis) == 0
+    assert kpi_rows(db) == []
+
+
+def test_rows_without_a_timestamp_are_not_imported_twice(db, alice, monkeypatch):
+    kpis = [(alice, 1, 2, 0.1, "s", None, None)]
+    notes = [(alice, "General", "No date", 1, None, None)]
+    for now in (datetime(2024, 3, 1, 10, 0, 0), datetime(2024, 3, 1, 10, 0, 1)):
+        # Each import stores a different "now" as the timestamp, which must not change the rows' key
+        monkeypatch.setattr(database_manager, "datetime", type("Clock", (), {"now": staticmethod(lambda: now)}))
+        db.upsert_kpis(kpis)
+        db.upsert_notes(notes)
+    assert len(kpi_rows(db)) == 1
+    assert len(db.get_notes_for_employee(alice)) == 1